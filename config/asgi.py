@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# Sob ASGI as leituras principais usam as views assíncronas (core/async_views.py)
+os.environ.setdefault('WMS_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
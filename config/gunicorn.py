@@ -0,0 +1,28 @@
+# config/gunicorn.py
+# Uso: gunicorn -c config/gunicorn.py config.wsgi
+#
+# As métricas de todos os workers são agregadas pelo /metrics a partir dos
+# arquivos em PROMETHEUS_MULTIPROC_DIR (ver core/metrics.py). O diretório é
+# limpo ao subir o master e cada worker encerrado é marcado como morto.
+import os
+import shutil
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", str(BASE_DIR / "var" / "prometheus"))
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", "4"))
+
+
+def on_starting(server):
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -41,9 +41,12 @@ INSTALLED_APPS = [
     'dashboard',
     'products',
     'reports',
+    'routing',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.QueryTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -53,6 +56,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'core.middleware.FirebaseAuthenticationMiddleware',
+    'core.middleware.SnapshotReadOnlyMiddleware',
 ]
 
 # CORS configuration
@@ -103,9 +107,98 @@ REST_FRAMEWORK = {
 # Neo4j
 NEOMODEL_NEO4J_BOLT_URL = os.getenv('NEO4J_BOLT_URL')
 
+# Driver/pool único por processo (core/neo4j_driver.py), compartilhado com o neomodel
+NEO4J = {
+    'URI': os.getenv('NEO4J_BOLT_URL') or os.getenv('NEO4J_URI', 'bolt://localhost:7687'),
+    'USER': os.getenv('NEO4J_USER', 'neo4j'),
+    'PASSWORD': os.getenv('NEO4J_PASSWORD', 'wms_password_123'),
+    'MAX_CONNECTION_POOL_SIZE': int(os.getenv('NEO4J_MAX_POOL_SIZE', '50')),
+    'CONNECTION_ACQUISITION_TIMEOUT': float(os.getenv('NEO4J_ACQUISITION_TIMEOUT', '30')),
+    'MAX_CONNECTION_LIFETIME': float(os.getenv('NEO4J_MAX_CONNECTION_LIFETIME', '3600')),
+    'FETCH_SIZE': int(os.getenv('NEO4J_FETCH_SIZE', '1000')),
+}
+
+# Cache compartilhado entre workers (ex.: django.core.cache.backends.redis.RedisCache
+# com CACHE_LOCATION=redis://...). O padrão LocMem vale apenas por processo.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Versões dos dados (core/data_version.py) ficam no grafo, valendo para todos
+# os workers; cada processo as relê no máximo a cada N segundos
+DATA_VERSION_CHECK_INTERVAL = float(os.getenv('DATA_VERSION_CHECK_INTERVAL', '1'))
+
+# Segundos que as estatísticas do dashboard ficam em cache
+DASHBOARD_STATS_TTL = int(os.getenv('DASHBOARD_STATS_TTL', '10'))
+
+# Pedidos gravados por transação no POST /api/orders/bulk/
+ORDERS_BULK_BATCH_SIZE = int(os.getenv('ORDERS_BULK_BATCH_SIZE', '500'))
+
+# Máximo de leituras de coletor por POST /api/orders/scans/ (uma transação)
+ORDERS_SCAN_MAX_EVENTS = int(os.getenv('ORDERS_SCAN_MAX_EVENTS', '2000'))
+
+# Registros puxados do Neo4j por vez na exportação em streaming de produtos
+PRODUCTS_STREAM_FETCH_SIZE = int(os.getenv('PRODUCTS_STREAM_FETCH_SIZE', '1000'))
+
+# Roteirização: intervalo (s) entre checagens de mudança do layout e número
+# máximo de slots (corredor × prateleira) com matriz de distâncias pré-calculada
+ROUTING_LAYOUT_CHECK_INTERVAL = float(os.getenv('ROUTING_LAYOUT_CHECK_INTERVAL', '30'))
+ROUTING_MATRIX_MAX_SLOTS = int(os.getenv('ROUTING_MATRIX_MAX_SLOTS', '2000'))
+
+# Planejamento de ondas: unidades por carrinho, pedidos por lote e máximo de
+# pedidos pendentes considerados por onda
+WAVE_CART_CAPACITY = int(os.getenv('WAVE_CART_CAPACITY', '200'))
+WAVE_MAX_ORDERS = int(os.getenv('WAVE_MAX_ORDERS', '10'))
+WAVE_MAX_PENDING = int(os.getenv('WAVE_MAX_PENDING', '5000'))
+
+# Putaway: recarga completa do índice de capacidade livre (segundos)
+PUTAWAY_INDEX_TTL = float(os.getenv('PUTAWAY_INDEX_TTL', '60'))
+
+# Modo snapshot: caminho de um export JSON do Neo4j (ex.: records.json). Se
+# definido, as leituras vêm do snapshot em memória e as escritas são recusadas.
+WMS_SNAPSHOT_PATH = os.getenv('WMS_SNAPSHOT_PATH', '')
+
+# Relatórios: linhas buscadas por página do cursor durante a exportação
+REPORTS_FETCH_SIZE = int(os.getenv('REPORTS_FETCH_SIZE', '2000'))
+
+# Jobs de relatório: processos de renderização por worker web, diretório dos
+# arquivos gerados, validade de um arquivo em cache, prazo de um job sem
+# progresso e retenção em disco (segundos)
+REPORT_JOBS_WORKERS = int(os.getenv('REPORT_JOBS_WORKERS', '2'))
+REPORT_JOBS_DIR = os.getenv('REPORT_JOBS_DIR', str(BASE_DIR / 'var' / 'reports'))
+REPORT_JOBS_CACHE_TTL = float(os.getenv('REPORT_JOBS_CACHE_TTL', '3600'))
+REPORT_JOBS_TIMEOUT = float(os.getenv('REPORT_JOBS_TIMEOUT', '3600'))
+REPORT_JOBS_RETENTION = float(os.getenv('REPORT_JOBS_RETENTION', '86400'))
+
+# Views assíncronas com o AsyncDriver do Neo4j (ligado por config/asgi.py;
+# sob WSGI cada requisição async criaria um event loop e um driver próprios)
+ASYNC_VIEWS = os.getenv('WMS_ASYNC_VIEWS', '0').lower() in ('1', 'true', 'yes')
+
+# GET condicional (ETag/304) nas listagens e cache das respostas por versão
+# dos dados (core/conditional.py); RESPONSE_CACHE_TTL=0 mantém só o ETag
+CONDITIONAL_GET = os.getenv('WMS_CONDITIONAL_GET', '1').lower() in ('1', 'true', 'yes')
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', '300'))
+
+# Cabeçalho Server-Timing com as consultas Cypher de cada requisição, e log
+# (core.middleware) das requisições mais lentas que SLOW_REQUEST_MS com as
+# SLOW_REQUEST_TOP_QUERIES consultas que mais tomaram tempo
+SERVER_TIMING = os.getenv('WMS_SERVER_TIMING', '1').lower() in ('1', 'true', 'yes')
+SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', '1000'))
+SLOW_REQUEST_TOP_QUERIES = int(os.getenv('SLOW_REQUEST_TOP_QUERIES', '5'))
+
 # Firebase
 FIREBASE_CREDENTIALS_PATH = os.getenv('FIREBASE_CREDENTIALS_PATH')
 
+# Cache de tokens verificados (entradas por processo e validade máxima em
+# segundos, limitada também pelo `exp` do token) e intervalo de atualização
+# das chaves públicas de assinatura (0 desliga a atualização em segundo plano)
+FIREBASE_TOKEN_CACHE_SIZE = int(os.getenv('FIREBASE_TOKEN_CACHE_SIZE', '10000'))
+FIREBASE_TOKEN_CACHE_TTL = float(os.getenv('FIREBASE_TOKEN_CACHE_TTL', '300'))
+FIREBASE_KEYS_REFRESH = float(os.getenv('FIREBASE_KEYS_REFRESH', '3600'))
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
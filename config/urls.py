@@ -2,6 +2,9 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from core.health import health_check
+from core.metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
 
@@ -11,6 +14,9 @@ urlpatterns = [
     path('api/dashboard/', include('dashboard.urls')),
     path('api/products/', include('products.urls')),
     path('api/reports/', include('reports.urls')),
+    path('api/routes/', include('routing.urls')),
+    path('api/health/', health_check, name='health-check'),
+    path('metrics', metrics_view, name='metrics'),
 
     # Rotas sem prefixo
     path('warehouses/', include('warehouse.urls')),
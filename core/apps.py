@@ -4,3 +4,20 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from .data_version import bump_versions
+        from .metrics import install as install_metrics
+        from .neo4j_driver import bind_neomodel
+        from .query_log import instrument_neomodel
+        from .signals import graph_changed
+
+        # O neomodel passa a usar o mesmo driver/pool das demais apps (também
+        # nos processos filhos, ver core/neo4j_driver.py). Criar o driver não
+        # abre conexões; elas só surgem na primeira consulta.
+        bind_neomodel()
+        # Consultas do neomodel entram no registro por requisição (core/query_log.py)
+        instrument_neomodel()
+        install_metrics()
+
+        graph_changed.connect(bump_versions, dispatch_uid="core-data-versions")
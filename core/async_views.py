@@ -0,0 +1,75 @@
+# core/async_views.py
+"""
+Views assíncronas para o deploy ASGI (config/asgi.py liga WMS_ASYNC_VIEWS).
+
+As leituras mais acessadas têm uma versão `async` que consulta o Neo4j pelo
+AsyncDriver (core.neo4j_driver.afetch). Enquanto o Bolt responde, o worker
+atende outras requisições em vez de ficar com uma thread bloqueada. As
+escritas e o modo snapshot (leituras em memória, sem I/O) continuam nas
+views síncronas de sempre.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework.exceptions import APIException
+
+from .snapshot import snapshot_enabled
+
+
+def with_async_get(sync_view, async_get):
+    """
+    Com settings.ASYNC_VIEWS, devolve uma view async que atende GET com
+    `async_get` e repassa os demais métodos à `sync_view` (numa thread). Sem
+    ASYNC_VIEWS (deploy WSGI), devolve a própria `sync_view`.
+    """
+    if not settings.ASYNC_VIEWS:
+        return sync_view
+
+    sync_handler = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method == "GET" and not snapshot_enabled():
+            try:
+                return await async_get(request, *args, **kwargs)
+            except APIException as exc:
+                # Mesmo formato de erro do exception handler do DRF
+                detail = exc.detail if isinstance(exc.detail, (dict, list)) else {"detail": exc.detail}
+                return JsonResponse(detail, status=exc.status_code, safe=False)
+        return await sync_handler(request, *args, **kwargs)
+
+    view.csrf_exempt = getattr(sync_view, "csrf_exempt", False)
+    view.__name__ = getattr(sync_view, "__name__", "view")
+    return view
+
+
+def streaming_content(chunks):
+    """
+    Conteúdo para StreamingHttpResponse que continua sob demanda no ASGI.
+
+    O Django 5.0 serve um iterador síncrono no ASGI com sync_to_async(list),
+    ou seja, lê o arquivo inteiro para a memória antes do primeiro byte. Com
+    settings.ASYNC_VIEWS, `chunks` é envolvido num iterador assíncrono que
+    puxa um pedaço por vez numa thread (a mesma durante toda a resposta, pois
+    o gerador segura a sessão do Neo4j). No WSGI, devolve `chunks` como está.
+    """
+    if not settings.ASYNC_VIEWS:
+        return chunks
+    return _pull_chunks(iter(chunks))
+
+
+_DONE = object()
+
+
+async def _pull_chunks(iterator):
+    pull = sync_to_async(next, thread_sensitive=True)
+    try:
+        while True:
+            chunk = await pull(iterator, _DONE)
+            if chunk is _DONE:
+                return
+            yield chunk
+    finally:
+        # Cliente desconectado no meio: fecha o gerador (e a sessão) na mesma thread
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await sync_to_async(close, thread_sensitive=True)()
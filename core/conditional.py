@@ -0,0 +1,130 @@
+# core/conditional.py
+"""
+GET condicional (ETag / 304) e cache de respostas pela versão dos dados.
+
+O ETag de uma leitura é o hash de (versão dos tipos de entidade que ela lê,
+caminho com query string, Accept). A versão vem de core.data_version: fica
+no grafo, vale para todos os workers e cada processo a relê no máximo a
+cada DATA_VERSION_CHECK_INTERVAL segundos. Calcular o ETag, portanto,
+quase nunca consulta o Neo4j: um cliente com If-None-Match atual recebe 304
+sem que a leitura seja feita. A resposta completa fica no cache do Django
+(RESPONSE_CACHE_TTL) sob a mesma chave, e outros clientes com a mesma versão
+a recebem sem consulta; com um cache por processo cada worker guarda a sua
+cópia, mas nenhum serve uma versão antiga.
+"""
+import hashlib
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+
+from .data_version import adata_version, data_version
+from .metrics import cache_lookup
+
+SAFE_METHODS = ("GET", "HEAD")
+
+_KEY = "response:{}"
+
+
+def _tag(request, version):
+    material = "|".join((
+        version,
+        request.get_full_path(),
+        request.META.get("HTTP_ACCEPT", ""),
+    ))
+    return hashlib.sha256(material.encode()).hexdigest()[:32]
+
+
+def _matches(request, etag):
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return False
+    # Comparação fraca: W/"x" e "x" são a mesma versão
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def _headers(response, etag):
+    response["ETag"] = etag
+    # O cliente pode guardar a resposta, mas revalida a cada uso
+    response["Cache-Control"] = "no-cache"
+    patch_vary_headers(response, ("Accept",))
+    return response
+
+
+def _not_modified(etag):
+    return _headers(HttpResponseNotModified(), etag)
+
+
+def _hit(entry, etag):
+    """Resposta montada a partir da entrada em cache, ou None."""
+    cache_lookup("responses", entry is not None)
+    if entry is None:
+        return None
+    content, content_type = entry
+    response = HttpResponse(content, content_type=content_type)
+    response["X-Cache"] = "HIT"
+    return _headers(response, etag)
+
+
+def _finish(response, etag):
+    """Renderiza e marca a resposta; devolve (resposta, entrada a guardar ou None)."""
+    if response.status_code != 200 or getattr(response, "streaming", False):
+        return response, None
+    if hasattr(response, "render") and not getattr(response, "is_rendered", True):
+        response.render()
+    _headers(response, etag)
+    if settings.RESPONSE_CACHE_TTL <= 0:
+        return response, None
+    return response, (response.content, response["Content-Type"])
+
+
+def versioned_get(view, kinds):
+    """
+    Envolve `view` (síncrona ou assíncrona): GET/HEAD passam a ter ETag
+    derivado da versão de `kinds` (ex.: ("orders",)), respondem 304 a um
+    If-None-Match atual e reaproveitam a resposta em cache da mesma versão.
+    Os demais métodos vão direto para `view`. Sem settings.CONDITIONAL_GET,
+    devolve a própria `view`.
+    """
+    if not settings.CONDITIONAL_GET:
+        return view
+
+    if iscoroutinefunction(view):
+        async def wrapped(request, *args, **kwargs):
+            if request.method not in SAFE_METHODS:
+                return await view(request, *args, **kwargs)
+            tag = _tag(request, await adata_version(kinds))
+            etag = f'W/"{tag}"'
+            if _matches(request, etag):
+                return _not_modified(etag)
+            if settings.RESPONSE_CACHE_TTL > 0:
+                response = _hit(await cache.aget(_KEY.format(tag)), etag)
+                if response is not None:
+                    return response
+            response, entry = _finish(await view(request, *args, **kwargs), etag)
+            if entry is not None:
+                await cache.aset(_KEY.format(tag), entry, settings.RESPONSE_CACHE_TTL)
+            return response
+    else:
+        def wrapped(request, *args, **kwargs):
+            if request.method not in SAFE_METHODS:
+                return view(request, *args, **kwargs)
+            tag = _tag(request, data_version(kinds))
+            etag = f'W/"{tag}"'
+            if _matches(request, etag):
+                return _not_modified(etag)
+            if settings.RESPONSE_CACHE_TTL > 0:
+                response = _hit(cache.get(_KEY.format(tag)), etag)
+                if response is not None:
+                    return response
+            response, entry = _finish(view(request, *args, **kwargs), etag)
+            if entry is not None:
+                cache.set(_KEY.format(tag), entry, settings.RESPONSE_CACHE_TTL)
+            return response
+
+    wrapped.csrf_exempt = getattr(view, "csrf_exempt", False)
+    wrapped.__name__ = getattr(view, "__name__", "view")
+    return wrapped
@@ -0,0 +1,21 @@
+# core/cursors.py
+import base64
+import json
+
+
+def encode_cursor(key):
+    """Codifica uma chave de paginação (tupla de valores JSON) em um token opaco."""
+    raw = json.dumps(list(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token, size):
+    """Inverso de `encode_cursor`. Levanta ValueError se o token for inválido."""
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        key = json.loads(base64.urlsafe_b64decode(padded))
+    except (TypeError, ValueError) as exc:
+        raise ValueError("cursor inválido") from exc
+    if not isinstance(key, list) or len(key) != size:
+        raise ValueError("cursor inválido")
+    return tuple(key)
@@ -0,0 +1,113 @@
+# core/data_version.py
+"""
+Versões dos dados por tipo de entidade ("warehouses", "orders", "products",
+"bins", "layout"), usadas como parte de chaves de cache derivadas do grafo.
+
+Cada tipo tem um token aleatório guardado no próprio grafo, num nó
+(:DataVersion {kind}), trocado a cada core.signals.graph_changed que o cite.
+Assim todos os workers enxergam a mesma versão, inclusive depois de escritas
+feitas por comandos (generate_warehouse, slotting, rebuild_occupancy), que
+rodam em outro processo. Cada processo relê os tokens (uma consulta pequena,
+todos os tipos de uma vez) no máximo a cada DATA_VERSION_CHECK_INTERVAL
+segundos; as escritas do próprio processo atualizam a cópia local na hora.
+Tokens (e não contadores) garantem que um banco recriado nunca reproduza uma
+versão antiga.
+"""
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from neomodel import db
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("warehouses", "orders", "products", "bins", "layout")
+
+READ_VERSIONS_QUERY = "MATCH (v:DataVersion) RETURN v.kind, v.token"
+
+# Cria os tipos que ainda não têm nó (primeiro uso de um banco novo)
+INIT_VERSIONS_QUERY = """
+    UNWIND $kinds AS kind
+    MERGE (v:DataVersion {kind: kind})
+    ON CREATE SET v.token = randomUUID()
+    RETURN v.kind, v.token
+"""
+
+BUMP_VERSIONS_QUERY = """
+    UNWIND $kinds AS kind
+    MERGE (v:DataVersion {kind: kind})
+    SET v.token = randomUUID()
+    RETURN v.kind, v.token
+"""
+
+_lock = threading.Lock()
+# {kind: token} lidos do grafo, substituído por inteiro a cada releitura
+_tokens = {}
+_checked_at = None
+
+
+def _stale():
+    return _checked_at is None or time.monotonic() - _checked_at >= settings.DATA_VERSION_CHECK_INTERVAL
+
+
+def _store(rows, missing_rows=()):
+    global _tokens, _checked_at
+    with _lock:
+        _tokens = {kind: token for kind, token in (*rows, *missing_rows)}
+        _checked_at = time.monotonic()
+
+
+def _missing(rows):
+    found = {kind for kind, _ in rows}
+    return [kind for kind in KINDS if kind not in found]
+
+
+def _format(kinds):
+    return ";".join(f"{kind}={_tokens.get(kind, '')}" for kind in sorted(set(kinds)))
+
+
+def _snapshot_version():
+    # No modo snapshot os dados só mudam quando o arquivo muda
+    return f"snapshot={os.stat(settings.WMS_SNAPSHOT_PATH).st_mtime_ns}"
+
+
+def data_version(kinds=KINDS):
+    """Versão combinada de `kinds`, ex.: "orders=3f2a...;products=9b1c..."."""
+    if settings.WMS_SNAPSHOT_PATH:
+        return _snapshot_version()
+    if _stale():
+        rows, _ = db.cypher_query(READ_VERSIONS_QUERY)
+        missing = _missing(rows)
+        created = db.cypher_query(INIT_VERSIONS_QUERY, {"kinds": missing})[0] if missing else ()
+        _store(rows, created)
+    return _format(kinds)
+
+
+async def adata_version(kinds=KINDS):
+    """data_version para views assíncronas (relê os tokens pelo AsyncDriver)."""
+    from .neo4j_driver import afetch
+
+    if settings.WMS_SNAPSHOT_PATH:
+        return _snapshot_version()
+    if _stale():
+        rows = [tuple(record) for record in await afetch(READ_VERSIONS_QUERY)]
+        missing = _missing(rows)
+        created = [tuple(record) for record in await afetch(INIT_VERSIONS_QUERY, kinds=missing)] if missing else ()
+        _store(rows, created)
+    return _format(kinds)
+
+
+def bump_versions(sender=None, kinds=(), **kwargs):
+    """Receiver de core.signals.graph_changed: troca no grafo o token dos tipos alterados."""
+    kinds = sorted(set(kinds) & set(KINDS))
+    if not kinds or settings.WMS_SNAPSHOT_PATH:
+        return
+    try:
+        rows, _ = db.cypher_query(BUMP_VERSIONS_QUERY, {"kinds": kinds})
+    except Exception as exc:  # a escrita já foi feita; a versão se corrige na próxima troca
+        logger.warning("Não foi possível trocar a versão de %s: %s", kinds, exc)
+        return
+    with _lock:
+        _tokens.update({kind: token for kind, token in rows})
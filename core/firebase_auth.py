@@ -1,8 +1,13 @@
 # core/firebase_auth.py
 import os
+import hashlib
 import logging
+import threading
+import time
+from collections import OrderedDict
 from typing import Optional
 from functools import wraps
+from django.conf import settings
 from django.http import JsonResponse
 
 logger = logging.getLogger(__name__)
@@ -11,59 +16,225 @@ logger = logging.getLogger(__name__)
 # Inicialização e verificação de token Firebase
 # ==============================================================
 
-try:
-    import firebase_admin
-    from firebase_admin import auth as firebase_auth
-    from firebase_admin import credentials
+# firebase_admin (e toda a pilha google-cloud) é importado só na primeira
+# verificação de token, não no boot do worker.
+_firebase_admin = None
+_FIREBASE_INITIALIZED = False
+FIREBASE_CRED_PATH = os.getenv("FIREBASE_CREDENTIALS_JSON")  # caminho do JSON de credenciais
 
-    _FIREBASE_INITIALIZED = False
-    FIREBASE_CRED_PATH = os.getenv("FIREBASE_CREDENTIALS_JSON")  # caminho do JSON de credenciais
 
-    def _init_firebase_app():
-        """Inicializa o app Firebase uma única vez."""
-        global _FIREBASE_INITIALIZED
-        if _FIREBASE_INITIALIZED:
+def _load_firebase_admin():
+    """Importa firebase_admin sob demanda. Retorna None se não estiver disponível (modo dev)."""
+    global _firebase_admin
+    if _firebase_admin is None:
+        try:
+            import firebase_admin
+            from firebase_admin import auth as _auth  # noqa: F401
+            from firebase_admin import credentials as _credentials  # noqa: F401
+            _firebase_admin = firebase_admin
+        except Exception as import_exc:
+            logger.warning("firebase_admin não disponível: %s", import_exc)
+            _firebase_admin = False
+    return _firebase_admin or None
+
+
+def _init_firebase_app():
+    """Inicializa o app Firebase uma única vez."""
+    global _FIREBASE_INITIALIZED
+    if _FIREBASE_INITIALIZED:
+        return
+
+    firebase_admin = _load_firebase_admin()
+    if firebase_admin is None:
+        return
+
+    try:
+        if FIREBASE_CRED_PATH and os.path.exists(FIREBASE_CRED_PATH):
+            cred = firebase_admin.credentials.Certificate(FIREBASE_CRED_PATH)
+            firebase_admin.initialize_app(cred)
+        else:
+            firebase_admin.initialize_app()
+        _FIREBASE_INITIALIZED = True
+        logger.info("Firebase app inicializado com sucesso.")
+    except Exception as e:
+        logger.warning("Não foi possível inicializar firebase_admin: %s", e)
+        _FIREBASE_INITIALIZED = False
+
+
+# ==============================================================
+# Cache de tokens verificados
+# ==============================================================
+
+class TokenCache:
+    """
+    LRU com TTL de tokens já verificados, indexado pelo SHA-256 do token (o
+    token em si não fica na memória). Cada entrada vale até o menor entre o
+    `exp` do token e FIREBASE_TOKEN_CACHE_TTL, então um token expirado nunca é
+    aceito pelo cache. Tokens revogados continuam válidos até expirar, como
+    já acontecia com verify_id_token(check_revoked=False).
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expired = 0
+
+    @staticmethod
+    def _key(token):
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token):
+        key = self._key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            decoded, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return decoded
+
+    def put(self, token, decoded):
+        exp = decoded.get("exp")
+        if not isinstance(exp, (int, float)) or self.maxsize <= 0:
             return
+        key = self._key(token)
+        expires_at = min(float(exp), time.time() + self.ttl)
+        with self._lock:
+            self._entries[key] = (decoded, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxSize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expired": self.expired,
+            }
+
+
+_token_cache = None
+_token_cache_lock = threading.Lock()
+
+
+def get_token_cache():
+    global _token_cache
+    if _token_cache is None:
+        with _token_cache_lock:
+            if _token_cache is None:
+                _token_cache = TokenCache(
+                    settings.FIREBASE_TOKEN_CACHE_SIZE, settings.FIREBASE_TOKEN_CACHE_TTL
+                )
+    return _token_cache
 
-        try:
-            if FIREBASE_CRED_PATH and os.path.exists(FIREBASE_CRED_PATH):
-                cred = credentials.Certificate(FIREBASE_CRED_PATH)
-                firebase_admin.initialize_app(cred)
-            else:
-                firebase_admin.initialize_app()
-            _FIREBASE_INITIALIZED = True
-            logger.info("Firebase app inicializado com sucesso.")
-        except Exception as e:
-            logger.warning("Não foi possível inicializar firebase_admin: %s", e)
-            _FIREBASE_INITIALIZED = False
-
-    def verify_firebase_token(id_token: str) -> Optional[dict]:
-        """
-        Verifica um ID token do Firebase e retorna o token decodificado (dict) se for válido.
-        Retorna None se o token for inválido ou se o Firebase não estiver configurado.
-        """
-        if not id_token:
-            return None
-
-        _init_firebase_app()
-        if not _FIREBASE_INITIALIZED:
-            logger.debug("Firebase não inicializado — retornando None (modo dev).")
-            return None
 
+def token_cache_stats():
+    """Contadores do cache de tokens deste processo (para o health check)."""
+    return get_token_cache().stats()
+
+
+# ==============================================================
+# Atualização proativa das chaves públicas
+# ==============================================================
+
+# O SDK baixa os certificados de assinatura sob demanda e os guarda conforme o
+# Cache-Control da resposta; quando expiram, a próxima verificação espera o
+# download. Uma thread por processo os rebaixa antes disso (no-cache força a
+# revalidação e atualiza o cache do próprio SDK).
+_refresher_pid = None
+
+
+def _refresh_public_keys():
+    from firebase_admin import _token_gen, auth
+
+    # API interna do firebase_admin 6.x: a sessão com cache usada pelo verificador
+    request = auth._get_client(None)._token_verifier.request
+    response = request(_token_gen.ID_TOKEN_CERT_URI, headers={"Cache-Control": "no-cache"})
+    if response.status != 200:
+        raise RuntimeError(f"HTTP {response.status}")
+
+
+def _refresh_loop(interval):
+    while True:
         try:
-            decoded = firebase_auth.verify_id_token(id_token)
-            return decoded
+            _refresh_public_keys()
+            logger.debug("Chaves públicas do Firebase atualizadas.")
         except Exception as e:
-            logger.info("Token inválido ou erro ao verificar token firebase: %s", e)
-            return None
+            logger.warning("Falha ao atualizar as chaves públicas do Firebase: %s", e)
+        time.sleep(interval)
+
 
-except Exception as import_exc:
-    # Fallback caso o firebase_admin não esteja disponível (modo dev)
-    logging.getLogger(__name__).warning("firebase_admin não disponível: %s", import_exc)
+def _start_key_refresher():
+    """Inicia (uma vez por processo, também após fork) a thread de atualização das chaves."""
+    global _refresher_pid
+    interval = settings.FIREBASE_KEYS_REFRESH
+    if interval <= 0 or _refresher_pid == os.getpid():
+        return
+    with _token_cache_lock:
+        if _refresher_pid == os.getpid():
+            return
+        _refresher_pid = os.getpid()
+    threading.Thread(
+        target=_refresh_loop, args=(interval,), name="firebase-keys-refresh", daemon=True
+    ).start()
 
-    def verify_firebase_token(id_token: str):
-        """Stub: em ambiente sem firebase, retorna None (não autenticado)."""
+
+def cached_firebase_token(id_token: str) -> Optional[dict]:
+    """Token decodificado, se já verificado e ainda válido no cache; senão None."""
+    if not id_token:
+        return None
+    return get_token_cache().get(id_token)
+
+
+def verify_uncached_firebase_token(id_token: str) -> Optional[dict]:
+    """Verificação completa (assinatura e claims) pelo firebase_admin; o resultado entra no cache."""
+    if not id_token:
+        return None
+
+    _init_firebase_app()
+    if not _FIREBASE_INITIALIZED:
+        logger.debug("Firebase não inicializado — retornando None (modo dev).")
         return None
+    _start_key_refresher()
+
+    try:
+        decoded = _firebase_admin.auth.verify_id_token(id_token)
+    except Exception as e:
+        logger.info("Token inválido ou erro ao verificar token firebase: %s", e)
+        return None
+    get_token_cache().put(id_token, decoded)
+    return decoded
+
+
+def verify_firebase_token(id_token: str) -> Optional[dict]:
+    """
+    Verifica um ID token do Firebase e retorna o token decodificado (dict) se for válido.
+    Retorna None se o token for inválido ou se o Firebase não estiver configurado.
+    Tokens já verificados vêm do cache em memória (TokenCache), sem nova
+    verificação de assinatura.
+    """
+    return cached_firebase_token(id_token) or verify_uncached_firebase_token(id_token)
 
 
 # ==============================================================
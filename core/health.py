@@ -0,0 +1,22 @@
+# core/health.py
+from django.http import JsonResponse
+
+from .firebase_auth import token_cache_stats
+from .neo4j_driver import pool_stats
+from .snapshot import get_snapshot
+
+
+def health_check(request):
+    """
+    GET /api/health/ -> status do processo e do pool de conexões Neo4j.
+    Público (o FirebaseAuthenticationMiddleware ignora rotas /health/).
+    """
+    payload = {
+        "status": "ok",
+        "neo4jPool": pool_stats(),
+        "firebaseTokenCache": token_cache_stats(),
+    }
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        payload["snapshot"] = snapshot.stats()
+    return JsonResponse(payload)
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.schema import await_indexes, check_query, declarations, install
+
+
+class Command(BaseCommand):
+    help = (
+        "Cria (se faltarem) os índices e constraints declarados em <app>/schema.py "
+        "e verifica que as consultas quentes não varrem labels inteiros."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check", action="store_true",
+            help="Não cria nada; só verifica os planos das consultas.",
+        )
+        parser.add_argument(
+            "--profile", action="store_true",
+            help="Usa PROFILE (executa cada consulta numa transação desfeita) e mostra os db hits.",
+        )
+        parser.add_argument("--skip-plans", action="store_true", help="Só cria o schema, sem verificar planos.")
+        parser.add_argument(
+            "--timeout", type=int, default=300,
+            help="Segundos de espera pelos índices ficarem ONLINE (padrão: 300).",
+        )
+
+    def handle(self, *args, check, profile, skip_plans, timeout, **options):
+        if check and skip_plans:
+            raise CommandError("Use --check ou --skip-plans, não os dois.")
+
+        constraints, indexes, backfills, queries = declarations()
+
+        if not check:
+            failed = 0
+            for statement, error in install([c.statement() for c in constraints] + [i.statement() for i in indexes]):
+                if error:
+                    failed += 1
+                    self.stdout.write(f"❌ {statement}\n   {error}")
+                elif options["verbosity"] > 1:
+                    self.stdout.write(f"   {statement}")
+            self.stdout.write(
+                f"🗂️  {len(constraints)} constraints e {len(indexes)} índices declarados"
+                + (f", {failed} com erro" if failed else "")
+            )
+            await_indexes(timeout)
+            if failed:
+                raise CommandError("Schema incompleto; corrija os itens acima (ex.: índice comum onde se pede constraint).")
+
+            for statement, error in install(backfills):
+                if error:
+                    raise CommandError(f"Falha ao completar os dados:\n{statement}\n{error}")
+            if backfills:
+                self.stdout.write(f"🧩 {len(backfills)} backfills aplicados")
+
+        if skip_plans:
+            self.stdout.write(self.style.SUCCESS("✅ Schema instalado."))
+            return
+
+        offenders = 0
+        for app_label, hot in queries:
+            result = check_query(hot, profile=profile)
+            hits = f" ({result['dbHits']} db hits)" if result["dbHits"] is not None else ""
+            if result["scans"]:
+                offenders += 1
+                self.stdout.write(f"❌ {app_label}.{hot.name}{hits}: {', '.join(result['scans'])}")
+            else:
+                self.stdout.write(f"✅ {app_label}.{hot.name}{hits}")
+
+        if offenders:
+            raise CommandError(f"{offenders} consulta(s) quente(s) com varredura completa de label.")
+        self.stdout.write(self.style.SUCCESS(f"✅ {len(queries)} consultas quentes usando índices."))
@@ -0,0 +1,157 @@
+# core/metrics.py
+"""
+Métricas no formato Prometheus, expostas em GET /metrics.
+
+Com PROMETHEUS_MULTIPROC_DIR definido (config/gunicorn.py define um padrão)
+cada worker grava seus valores em arquivos mmap nesse diretório e o
+/metrics agrega todos os processos (prometheus_client.multiprocess), então
+qualquer worker que atenda o scrape devolve o total. Sem a variável o
+registro é o do próprio processo (runserver, testes).
+
+- wms_http_request_duration_seconds{view, method, status}: histograma (e
+  contagem) por rota; `view` é o padrão da URL, não o caminho concreto.
+- wms_neo4j_query_duration_seconds: histograma de todas as consultas
+  Cypher (via core.query_log.listeners).
+- wms_neo4j_pool_*: conexões do pool e espera por conexão, somadas entre os
+  processos vivos.
+- wms_cache_requests_total{cache, result}: acertos/erros dos caches; a taxa
+  de acerto é hit / (hit + miss) na consulta PromQL.
+- wms_orders_pending, wms_warehouse_occupancy_percent: indicadores do
+  dashboard, atualizados a cada scrape.
+"""
+import logging
+import os
+import threading
+import time
+
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+
+from . import query_log
+
+logger = logging.getLogger(__name__)
+
+# Intervalo mínimo (s) entre atualizações dos gauges do pool por processo
+GAUGE_REFRESH_INTERVAL = 1.0
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+REQUEST_LATENCY = Histogram(
+    "wms_http_request_duration_seconds", "Duração das requisições HTTP",
+    ["view", "method", "status"], buckets=LATENCY_BUCKETS,
+)
+QUERY_LATENCY = Histogram(
+    "wms_neo4j_query_duration_seconds", "Duração das consultas Cypher",
+    buckets=QUERY_BUCKETS,
+)
+POOL_CONNECTIONS = Gauge(
+    "wms_neo4j_pool_connections", "Conexões do pool Neo4j por estado",
+    ["state"], multiprocess_mode="livesum",
+)
+POOL_MAX_SIZE = Gauge(
+    "wms_neo4j_pool_max_size", "Tamanho máximo do pool Neo4j (soma dos processos)",
+    multiprocess_mode="livesum",
+)
+POOL_WAIT = Counter("wms_neo4j_pool_wait_seconds", "Tempo de espera por conexão do pool")
+POOL_ACQUISITIONS = Counter("wms_neo4j_pool_acquisitions", "Conexões obtidas do pool")
+CACHE_REQUESTS = Counter("wms_cache_requests", "Consultas aos caches", ["cache", "result"])
+PENDING_ORDERS = Gauge("wms_orders_pending", "Pedidos pendentes", multiprocess_mode="mostrecent")
+AVERAGE_OCCUPANCY = Gauge(
+    "wms_warehouse_occupancy_percent", "Ocupação média dos galpões (%)",
+    multiprocess_mode="mostrecent",
+)
+
+_lock = threading.Lock()
+_last_refresh = 0.0
+# Últimos totais cumulativos já repassados aos contadores (por processo)
+_exported = {}
+
+
+def multiprocess_enabled():
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def cache_lookup(cache, hit):
+    """Conta um acesso ao cache `cache` (ex.: "dashboard_stats")."""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def observe_request(view, method, status, seconds):
+    REQUEST_LATENCY.labels(view, method, str(status)).observe(seconds)
+    refresh_process_gauges()
+
+
+def _observe_query(query, seconds):
+    QUERY_LATENCY.observe(seconds)
+
+
+def install():
+    """Liga o histograma de consultas ao core.query_log (chamado em CoreConfig.ready)."""
+    if _observe_query not in query_log.listeners:
+        query_log.listeners.append(_observe_query)
+
+
+def _export_total(name, counter, total):
+    """Repassa ao contador o quanto o total cumulativo `total` cresceu desde a última vez."""
+    delta = total - _exported.get(name, 0)
+    if delta > 0:
+        counter.inc(delta)
+        _exported[name] = total
+
+
+def refresh_process_gauges(force=False):
+    """Atualiza os valores deste processo: pool de conexões e cache de tokens Firebase."""
+    global _last_refresh
+    now = time.monotonic()
+    if not force and now - _last_refresh < GAUGE_REFRESH_INTERVAL:
+        return
+    with _lock:
+        if not force and now - _last_refresh < GAUGE_REFRESH_INTERVAL:
+            return
+        _last_refresh = now
+
+        from .firebase_auth import token_cache_stats
+        from .neo4j_driver import pool_stats
+
+        pool = pool_stats()
+        POOL_CONNECTIONS.labels("in_use").set(pool["in_use"])
+        POOL_CONNECTIONS.labels("idle").set(pool["idle"])
+        POOL_MAX_SIZE.set(pool["max_size"])
+        _export_total("pool_wait", POOL_WAIT, pool["wait_time_total"])
+        _export_total("pool_acquisitions", POOL_ACQUISITIONS, pool["acquisitions"])
+
+        tokens = token_cache_stats()
+        _export_total("token_hits", CACHE_REQUESTS.labels("firebase_token", "hit"), tokens["hits"])
+        _export_total("token_misses", CACHE_REQUESTS.labels("firebase_token", "miss"), tokens["misses"])
+
+
+def _refresh_business_gauges():
+    from dashboard.stats import get_stats
+
+    try:
+        stats = get_stats()
+    except Exception as exc:  # Neo4j fora do ar não derruba o scrape
+        logger.warning("Não foi possível atualizar as métricas do dashboard: %s", exc)
+        return
+    PENDING_ORDERS.set(stats["pendingOrders"])
+    AVERAGE_OCCUPANCY.set(stats["averageOccupancy"])
+
+
+def render():
+    """Texto de exposição do Prometheus, agregando os processos no modo multiprocess."""
+    refresh_process_gauges(force=True)
+    _refresh_business_gauges()
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+
+def metrics_view(request):
+    """GET /metrics (público, como /health/: o FirebaseAuthenticationMiddleware ignora a rota)."""
+    return HttpResponse(render(), content_type=CONTENT_TYPE_LATEST)
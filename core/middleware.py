@@ -1,63 +1,239 @@
 # core/middleware.py
 import logging
-from django.utils.deprecation import MiddlewareMixin
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
 from django.http import JsonResponse
 
+from . import metrics, query_log
+from .snapshot import snapshot_enabled
+
 logger = logging.getLogger(__name__)
 
-class FirebaseAuthenticationMiddleware(MiddlewareMixin):
+class FirebaseAuthenticationMiddleware:
     """
     Middleware para autenticação via Firebase.
     - Verifica o header Authorization: Bearer <token>.
     - Anexa o usuário Firebase decodificado em request.firebase_user.
-    - Ignora rotas /admin/, /health/ e /reports/.
+    - Ignora rotas /admin/, /health/, /metrics e /reports/.
+    - Funciona nas cadeias síncrona (WSGI) e assíncrona (ASGI). No modo
+      assíncrono, tokens já em cache são resolvidos no próprio loop e só a
+      verificação completa (que pode baixar chaves) vai para uma thread.
     """
 
+    sync_capable = True
+    async_capable = True
+
     def _get_verifier(self):
-        """Importa verify_firebase_token dinamicamente (evita erro em tempo de boot)."""
+        """Importa as funções de verificação dinamicamente (evita erro em tempo de boot)."""
         try:
-            from .firebase_auth import verify_firebase_token
-            return verify_firebase_token
+            from .firebase_auth import cached_firebase_token, verify_uncached_firebase_token
+            return cached_firebase_token, verify_uncached_firebase_token
         except Exception as e:
             logger.warning("Não foi possível importar verify_firebase_token: %s", e)
             return None
 
     def __init__(self, get_response=None):
         self.get_response = get_response
-        super().__init__(get_response)
+        # Resolvido uma vez por processo, não a cada requisição
+        self.verifier = self._get_verifier()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            if self.verifier is not None:
+                self.averify = sync_to_async(self.verifier[1], thread_sensitive=False)
 
-    def __call__(self, request):
+    def _get_token(self, request):
+        """Token Bearer da requisição, ou None (rota pública, sem token ou modo dev)."""
         # 🔹 ignora autenticação para rotas públicas
         if (
             request.path.startswith("/admin/")
             or request.path.endswith("/health/")
+            or request.path == "/metrics"
             or request.path.startswith("/reports/")
         ):
-            return self.get_response(request)
+            return None
 
         request.firebase_user = None
-        verifier = self._get_verifier()
-        if verifier is None:
+        if self.verifier is None:
             logger.debug("Firebase verifier indisponível (modo dev).")
-            return self.get_response(request)
+            return None
 
         # Extrair token do cabeçalho Authorization
         auth_header = request.META.get("HTTP_AUTHORIZATION", "")
-        token = None
         if auth_header and auth_header.lower().startswith("bearer "):
-            token = auth_header.split(" ", 1)[1].strip()
+            return auth_header.split(" ", 1)[1].strip() or None
+        # Nenhum token fornecido — segue sem autenticação
+        return None
 
-        if not token:
-            # Nenhum token fornecido — segue sem autenticação
-            return self.get_response(request)
+    def _authenticate(self, request, decoded):
+        if decoded:
+            request.firebase_user = decoded
+            logger.debug("Usuário Firebase autenticado: %s", decoded.get("uid"))
 
-        # Verificar token Firebase
-        try:
-            decoded = verifier(token)
-            if decoded:
-                request.firebase_user = decoded
-                logger.debug("Usuário Firebase autenticado: %s", decoded.get("uid"))
-        except Exception as e:
-            logger.warning("Erro ao verificar token Firebase: %s", e)
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
 
+        token = self._get_token(request)
+        if token:
+            cached, verify = self.verifier
+            try:
+                self._authenticate(request, cached(token) or verify(token))
+            except Exception as e:
+                logger.warning("Erro ao verificar token Firebase: %s", e)
         return self.get_response(request)
+
+    async def __acall__(self, request):
+        token = self._get_token(request)
+        if token:
+            cached, _ = self.verifier
+            try:
+                self._authenticate(request, cached(token) or await self.averify(token))
+            except Exception as e:
+                logger.warning("Erro ao verificar token Firebase: %s", e)
+        return await self.get_response(request)
+
+
+class SnapshotReadOnlyMiddleware:
+    """
+    Com WMS_SNAPSHOT_PATH definido a API serve leituras do snapshot em memória
+    (core/snapshot.py) e não tem onde gravar: métodos de escrita recebem 503.
+    POSTs que não gravam no grafo (ex.: jobs de relatório) ficam liberados.
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+    READ_ONLY_POSTS = ("/api/reports/jobs/", "/reports/jobs/")
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _refuse(self, request):
+        if (
+            request.method not in self.SAFE_METHODS
+            and request.path not in self.READ_ONLY_POSTS
+            and snapshot_enabled()
+        ):
+            return JsonResponse(
+                {"error": "API em modo snapshot (somente leitura)"},
+                status=503,
+            )
+        return None
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self._refuse(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self._refuse(request) or await self.get_response(request)
+
+
+class QueryTimingMiddleware:
+    """
+    Conta as consultas Cypher de cada requisição (core/query_log.py) e as
+    expõe no cabeçalho Server-Timing (`db` com o tempo total no banco,
+    número de consultas e de linhas; `app` com o tempo total da view).
+    Requisições acima de SLOW_REQUEST_MS são logadas com as consultas que
+    mais tomaram tempo.
+
+    Em respostas em streaming o cabeçalho só cobre o que rodou antes do
+    primeiro byte.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _finish(self, request, response, log, started):
+        elapsed = time.perf_counter() - started
+        if settings.SERVER_TIMING and log.count:
+            response["Server-Timing"] = (
+                f'db;dur={log.seconds * 1000:.1f};desc="{log.count} queries, {log.rows} rows", '
+                f"app;dur={elapsed * 1000:.1f}"
+            )
+        if elapsed * 1000 >= settings.SLOW_REQUEST_MS:
+            top = "".join(
+                f"\n  {seconds * 1000:8.1f} ms  {calls:4d}x  {rows:6d} linhas  {query[:200]}"
+                for query, calls, seconds, rows in log.top(settings.SLOW_REQUEST_TOP_QUERIES)
+            )
+            logger.warning(
+                "Requisição lenta: %s %s -> %s em %.0f ms (%d consultas, %.0f ms no banco, %d linhas)%s",
+                request.method, request.path, response.status_code, elapsed * 1000,
+                log.count, log.seconds * 1000, log.rows, top,
+            )
+        return response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        token = query_log.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            log = query_log.stop(token)
+        return self._finish(request, response, log, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        token = query_log.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            log = query_log.stop(token)
+        return self._finish(request, response, log, started)
+
+
+class MetricsMiddleware:
+    """Observa a duração de cada requisição por rota, método e status (core/metrics.py)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _observe(request, status, started):
+        match = getattr(request, "resolver_match", None)
+        # Padrão da rota (ex.: api/orders/<str:pk>/), não o caminho: cardinalidade baixa
+        view = match.route if match is not None else "unmatched"
+        metrics.observe_request(view, request.method, status, time.perf_counter() - started)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            self._observe(request, status, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            self._observe(request, status, started)
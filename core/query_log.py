@@ -0,0 +1,225 @@
+# core/query_log.py
+"""
+Registro das consultas Cypher de cada requisição.
+
+core.middleware.QueryTimingMiddleware abre um QueryLog por requisição
+(guardado num ContextVar, então vale também para views assíncronas e para
+o código chamado via sync_to_async). Todas as consultas passam por
+`record`:
+    - Database.cypher_query do neomodel (envolvido em `instrument_neomodel`);
+    - sessões "cruas" de core.neo4j_driver.session (run, execute_read,
+      execute_write), via os proxies abaixo;
+    - core.neo4j_driver.afetch.
+
+O tempo de uma consulta é o do envio até a primeira resposta, somado ao
+tempo gasto lendo as páginas seguintes de registros. Fora de uma requisição
+(comandos, jobs) nada é registrado e as sessões não são envolvidas.
+"""
+import re
+import threading
+import time
+from contextvars import ContextVar
+
+_current = ContextVar("wms_query_log", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Funções chamadas a cada consulta registrada: listener(query, seconds)
+listeners = []
+
+
+class QueryLog:
+    """Consultas de uma requisição: lista de [texto, segundos, linhas]."""
+
+    __slots__ = ("entries",)
+
+    def __init__(self):
+        self.entries = []
+
+    def add(self, query, seconds, rows=0):
+        entry = [query, seconds, rows]
+        self.entries.append(entry)
+        return entry
+
+    @property
+    def count(self):
+        return len(self.entries)
+
+    @property
+    def seconds(self):
+        return sum(entry[1] for entry in self.entries)
+
+    @property
+    def rows(self):
+        return sum(entry[2] for entry in self.entries)
+
+    def top(self, n=5):
+        """
+        As `n` consultas que mais tomaram tempo, agrupadas pelo texto (um N+1
+        aparece como uma linha com `calls` alto): [(texto, calls, segundos, linhas)].
+        """
+        grouped = {}
+        for query, seconds, rows in self.entries:
+            key = _WHITESPACE.sub(" ", query).strip()
+            calls, total, total_rows = grouped.get(key, (0, 0.0, 0))
+            grouped[key] = (calls + 1, total + seconds, total_rows + rows)
+        ranked = sorted(grouped.items(), key=lambda item: item[1][1], reverse=True)
+        return [(query, *stats) for query, stats in ranked[:n]]
+
+
+def start():
+    """Abre o registro da requisição atual. Devolve o token para `stop`."""
+    return _current.set(QueryLog())
+
+
+def stop(token):
+    log = _current.get()
+    _current.reset(token)
+    return log
+
+
+def current():
+    return _current.get()
+
+
+def record(query, seconds, rows=0):
+    """Registra uma consulta no log da requisição (se houver). Devolve a entrada, para somar linhas depois."""
+    for listener in listeners:
+        listener(query, seconds)
+    log = _current.get()
+    if log is None:
+        return None
+    return log.add(query, seconds, rows)
+
+
+# ----------------------------------------------------------
+# neomodel
+# ----------------------------------------------------------
+
+_neomodel_lock = threading.Lock()
+
+
+def instrument_neomodel():
+    """
+    Envolve Database.cypher_query do neomodel (uma vez por processo). O `db`
+    do neomodel é thread-local, então a troca é feita na classe: vale para as
+    threads de requisição e as do sync_to_async, não só para a que chamou.
+    """
+    from neomodel.util import Database
+
+    with _neomodel_lock:
+        if getattr(Database.cypher_query, "_wms_instrumented", False):
+            return
+        original = Database.cypher_query
+
+        def cypher_query(self, query, params=None, *args, **kwargs):
+            started = time.perf_counter()
+            results, meta = original(self, query, params, *args, **kwargs)
+            record(query, time.perf_counter() - started, len(results) if results else 0)
+            return results, meta
+
+        cypher_query._wms_instrumented = True
+        Database.cypher_query = cypher_query
+
+
+# ----------------------------------------------------------
+# Driver "cru"
+# ----------------------------------------------------------
+
+class _Result:
+    """Result que soma as linhas lidas (e o tempo de leitura) na entrada da consulta."""
+
+    def __init__(self, result, entry):
+        self._result = result
+        self._entry = entry
+
+    def __getattr__(self, name):
+        return getattr(self._result, name)
+
+    def __iter__(self):
+        iterator = iter(self._result)
+        entry = self._entry
+        while True:
+            started = time.perf_counter()
+            try:
+                record_ = next(iterator)
+            except StopIteration:
+                entry[1] += time.perf_counter() - started
+                return
+            entry[1] += time.perf_counter() - started
+            entry[2] += 1
+            yield record_
+
+    def _timed(self, method, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return getattr(self._result, method)(*args, **kwargs)
+        finally:
+            self._entry[1] += time.perf_counter() - started
+
+    def single(self, *args, **kwargs):
+        found = self._timed("single", *args, **kwargs)
+        self._entry[2] += found is not None
+        return found
+
+    def data(self, *args, **kwargs):
+        rows = self._timed("data", *args, **kwargs)
+        self._entry[2] += len(rows)
+        return rows
+
+    def values(self, *args, **kwargs):
+        rows = self._timed("values", *args, **kwargs)
+        self._entry[2] += len(rows)
+        return rows
+
+    def consume(self):
+        return self._timed("consume")
+
+
+def _run(target, query, parameters=None, **kwargs):
+    started = time.perf_counter()
+    result = target.run(query, parameters, **kwargs)
+    entry = record(query, time.perf_counter() - started)
+    return _Result(result, entry) if entry is not None else result
+
+
+class _Transaction:
+    def __init__(self, tx):
+        self._tx = tx
+
+    def __getattr__(self, name):
+        return getattr(self._tx, name)
+
+    def run(self, query, parameters=None, **kwargs):
+        return _run(self._tx, query, parameters, **kwargs)
+
+
+class Session:
+    """Proxy de neo4j.Session que registra as consultas no QueryLog da requisição."""
+
+    def __init__(self, session):
+        self._session = session
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def __enter__(self):
+        self._session.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._session.__exit__(*exc)
+
+    def run(self, query, parameters=None, **kwargs):
+        return _run(self._session, query, parameters, **kwargs)
+
+    def execute_read(self, work, *args, **kwargs):
+        return self._session.execute_read(lambda tx, *a, **k: work(_Transaction(tx), *a, **k), *args, **kwargs)
+
+    def execute_write(self, work, *args, **kwargs):
+        return self._session.execute_write(lambda tx, *a, **k: work(_Transaction(tx), *a, **k), *args, **kwargs)
+
+
+def instrument_session(session):
+    """Envolve `session` se houver uma requisição sendo registrada."""
+    return Session(session) if _current.get() is not None else session
@@ -0,0 +1,157 @@
+# core/schema.py
+"""
+Índices e constraints do grafo, declarados por app em `<app>/schema.py`.
+
+Cada módulo pode definir:
+    CONSTRAINTS  lista de Unique(label, propriedade)
+    INDEXES      lista de Index(label, propriedade, ...)
+    BACKFILLS    lista de statements idempotentes que completam propriedades
+                 exigidas pelos índices (ex.: chave de um índice composto)
+    HOT_QUERIES  lista de HotQuery: statements quentes da app, que devem usar
+                 índice (o plano não pode ter varredura completa de label)
+
+O comando `manage.py install_schema` cria o que falta (CREATE ... IF NOT
+EXISTS, idempotente; constraints e índices equivalentes criados pelo
+neomodel com outro nome também são reconhecidos) e depois verifica o plano
+de cada HotQuery com EXPLAIN (ou PROFILE, numa transação desfeita). Os
+BACKFILLS rodam depois dos índices, em transações automáticas (podem usar
+CALL { ... } IN TRANSACTIONS).
+"""
+from dataclasses import dataclass, field
+from importlib import import_module
+
+from django.apps import apps
+from django.utils.module_loading import module_has_submodule
+
+from core.neo4j_driver import session as neo4j_session
+
+# Operadores que leem todos os nós (de um label ou do grafo)
+SCAN_OPERATORS = {
+    "AllNodesScan",
+    "NodeByLabelScan",
+    "IntersectionNodeByLabelsScan",
+    "UnionNodeByLabelsScan",
+    "PartitionedAllNodesScan",
+    "PartitionedNodeByLabelScan",
+}
+
+
+@dataclass(frozen=True)
+class Unique:
+    label: str
+    property: str
+
+    @property
+    def name(self):
+        return f"{self.label.lower()}_{self.property}_unique"
+
+    def statement(self):
+        return (
+            f"CREATE CONSTRAINT {self.name} IF NOT EXISTS "
+            f"FOR (n:{self.label}) REQUIRE n.{self.property} IS UNIQUE"
+        )
+
+
+@dataclass(frozen=True, init=False)
+class Index:
+    label: str
+    properties: tuple
+
+    def __init__(self, label, *properties):
+        object.__setattr__(self, "label", label)
+        object.__setattr__(self, "properties", properties)
+
+    @property
+    def name(self):
+        return f"{self.label.lower()}_{'_'.join(self.properties)}"
+
+    def statement(self):
+        columns = ", ".join(f"n.{prop}" for prop in self.properties)
+        return f"CREATE INDEX {self.name} IF NOT EXISTS FOR (n:{self.label}) ON ({columns})"
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    name: str
+    query: str
+    # Valores de exemplo (o EXPLAIN não executa a consulta)
+    params: dict = field(default_factory=dict)
+    # Labels que podem ser varridos por inteiro (ex.: poucos galpões)
+    allow_scans: tuple = ()
+
+
+# Versões dos dados por tipo de entidade (core/data_version.py)
+CONSTRAINTS = [Unique("DataVersion", "kind")]
+
+
+def declarations():
+    """(constraints, índices, backfills, hot queries) de todas as apps, com o label da app em cada hot query."""
+    constraints, indexes, backfills, queries = [], [], [], []
+    for app in apps.get_app_configs():
+        if not module_has_submodule(app.module, "schema"):
+            continue
+        module = import_module(f"{app.name}.schema")
+        constraints.extend(getattr(module, "CONSTRAINTS", ()))
+        indexes.extend(getattr(module, "INDEXES", ()))
+        backfills.extend(getattr(module, "BACKFILLS", ()))
+        queries.extend((app.label, query) for query in getattr(module, "HOT_QUERIES", ()))
+    return constraints, indexes, backfills, queries
+
+
+def install(statements):
+    """Executa os statements (CREATE ... IF NOT EXISTS, backfills). Gera (statement, erro ou None)."""
+    with neo4j_session() as session:
+        for statement in statements:
+            try:
+                session.run(statement).consume()
+            except Exception as exc:  # ex.: índice comum já existente onde se pede constraint
+                yield statement, getattr(exc, "message", None) or str(exc)
+            else:
+                yield statement, None
+
+
+def await_indexes(timeout=300):
+    """Espera os índices recém-criados ficarem ONLINE (o planejador ignora os que estão populando)."""
+    with neo4j_session() as session:
+        session.run("CALL db.awaitIndexes($timeout)", timeout=timeout).consume()
+
+
+def _scans(plan):
+    """Gera (operador, detalhes) de cada varredura completa no plano."""
+    operator = plan.get("operatorType", "").split("@", 1)[0]
+    if operator in SCAN_OPERATORS:
+        yield operator, str(plan.get("args", {}).get("Details", ""))
+    for child in plan.get("children", ()):
+        yield from _scans(child)
+
+
+def _scanned_label(details):
+    # Detalhes do tipo "o:Order"; AllNodesScan não tem label
+    return details.rsplit(":", 1)[1].strip() if ":" in details else None
+
+
+def check_query(hot, profile=False):
+    """
+    Planeja `hot` e devolve {"scans": [...], "dbHits": int | None}. Com
+    `profile` a consulta é executada (PROFILE) numa transação desfeita em
+    seguida, para que escritas não sejam gravadas.
+    """
+    with neo4j_session() as session:
+        tx = session.begin_transaction()
+        try:
+            result = tx.run(f"{'PROFILE' if profile else 'EXPLAIN'} {hot.query}", hot.params)
+            summary = result.consume()
+        finally:
+            tx.rollback()
+
+    plan = (summary.profile if profile else summary.plan) or {}
+    scans = []
+    for operator, details in _scans(plan):
+        label = _scanned_label(details)
+        if label is None or label not in hot.allow_scans:
+            scans.append(f"{operator}({details})")
+    return {"scans": scans, "dbHits": _db_hits(plan) if profile else None}
+
+
+def _db_hits(plan):
+    return plan.get("dbHits", 0) + sum(_db_hits(child) for child in plan.get("children", ()))
@@ -0,0 +1,24 @@
+# core/signals.py
+from django.dispatch import Signal
+
+# Enviado depois de escritas no grafo. `kinds` é uma tupla com os tipos de
+# entidade afetados: "warehouses", "orders", "products", "bins" e/ou "layout"
+# (estrutura Zone/Aisle/Shelf/Bin, usada pela roteirização).
+graph_changed = Signal()
+
+
+def notify_graph_change(*kinds):
+    """Avisa caches e contadores de versão de que `kinds` mudaram."""
+    graph_changed.send(sender=None, kinds=kinds)
+
+
+# Enviado depois de escritas que mudam capacidade/ocupação de bins, com
+# `bins` = lista de (code, capacity, occupied) já gravados. Mantém índices em
+# processo (ex.: warehouse.putaway) atualizados sem reler o grafo.
+bin_levels_changed = Signal()
+
+
+def notify_bin_levels(bins):
+    bins = [tuple(row) for row in bins if row and row[0] is not None]
+    if bins:
+        bin_levels_changed.send(sender=None, bins=bins)
@@ -0,0 +1,408 @@
+# core/snapshot.py
+"""
+Snapshot somente leitura do grafo, carregado de um export JSON do Neo4j.
+
+Com settings.WMS_SNAPSHOT_PATH definido, os endpoints de leitura (galpões,
+pedidos, produtos e dashboard) respondem a partir deste snapshot em memória,
+sem consultar o Neo4j. Escritas são recusadas (core.middleware).
+
+Formato aceito: o export do Neo4j Browser/APOC (um array JSON, ou NDJSON, de
+registros `{"n": {identity, labels, properties}}`). Cada registro pode trazer
+nós, relacionamentos (`{identity, start, end, type}`) e caminhos
+(`{segments: [...]}`). O arquivo é lido em streaming, registro a registro.
+
+Armazenamento compacto:
+- uma tabela por label, com as propriedades em colunas (array('q') para
+  inteiros, array('d') para números reais, listas de strings internadas para
+  o resto);
+- relacionamentos em listas de adjacência CSR (offsets + alvos em array('q'))
+  por tipo e direção.
+
+Os contadores capacity_sum/occupied_sum (warehouse/counters.py) são
+recalculados na carga a partir dos próprios bins do snapshot.
+"""
+import bisect
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from array import array
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Sentinela de "sem valor" nas colunas array('q')
+_MISSING_INT = -(2 ** 63)
+_READ_SIZE = 1 << 20
+
+
+def _iter_records(path):
+    """Lê um array JSON (ou NDJSON) de registros sem carregar o arquivo inteiro."""
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8-sig") as fh:
+        buffer = ""
+        pos = 0
+        eof = False
+        while True:
+            # Pula espaços e a pontuação do array de topo
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,[]":
+                pos += 1
+            if pos >= len(buffer):
+                if eof:
+                    return
+                buffer, pos = fh.read(_READ_SIZE), 0
+                eof = not buffer
+                continue
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                chunk = fh.read(_READ_SIZE)
+                if not chunk:
+                    raise
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            yield record
+            pos = end
+
+
+def _entities(value):
+    """Nós e relacionamentos contidos em um valor de registro (nó, rel., caminho ou lista)."""
+    if isinstance(value, list):
+        for item in value:
+            yield from _entities(item)
+    elif isinstance(value, dict):
+        if "segments" in value:
+            for segment in value["segments"]:
+                yield from _entities([segment.get("start"), segment.get("relationship"), segment.get("end")])
+        elif "labels" in value and "identity" in value:
+            yield "node", value
+        elif "type" in value and "start" in value and "end" in value:
+            yield "relationship", value
+
+
+class SnapshotNode:
+    """Nó do snapshot com a mesma interface de leitura de neo4j.graph.Node."""
+
+    __slots__ = ("ordinal", "element_id", "labels", "_properties")
+
+    def __init__(self, ordinal, element_id, labels, properties):
+        self.ordinal = ordinal
+        self.element_id = element_id
+        self.labels = frozenset(labels)
+        self._properties = properties
+
+    def __getitem__(self, key):
+        return self._properties[key]
+
+    def __iter__(self):
+        return iter(self._properties)
+
+    def __len__(self):
+        return len(self._properties)
+
+    def get(self, key, default=None):
+        return self._properties.get(key, default)
+
+    def keys(self):
+        return self._properties.keys()
+
+    def values(self):
+        return self._properties.values()
+
+    def items(self):
+        return self._properties.items()
+
+
+class Table:
+    """Nós de um label, com as propriedades em colunas."""
+
+    def __init__(self, label):
+        self.label = label
+        self.ordinals = array("q")
+        self.element_ids = []
+        self.columns = {}
+        self._indexes = {}
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def append(self, ordinal, element_id, properties):
+        row = len(self.ordinals)
+        self.ordinals.append(ordinal)
+        self.element_ids.append(element_id)
+        for key, value in properties.items():
+            column = self.columns.get(key)
+            if column is None:
+                column = self.columns[key] = []
+            if len(column) < row:
+                # Propriedade ausente nos nós anteriores
+                column.extend([None] * (row - len(column)))
+            column.append(sys.intern(value) if isinstance(value, str) else value)
+
+    def freeze(self):
+        """Completa as colunas e converte as numéricas homogêneas em arrays compactos."""
+        size = len(self.ordinals)
+        for key, column in self.columns.items():
+            column.extend([None] * (size - len(column)))
+            present = [v for v in column if v is not None]
+            if not present or any(isinstance(v, bool) or not isinstance(v, (int, float)) for v in present):
+                continue
+            if all(isinstance(v, int) for v in present):
+                self.columns[key] = array("q", (_MISSING_INT if v is None else v for v in column))
+            else:
+                self.columns[key] = array("d", (math.nan if v is None else float(v) for v in column))
+
+    def value(self, key, row):
+        column = self.columns.get(key)
+        if column is None:
+            return None
+        value = column[row]
+        if isinstance(column, array):
+            if column.typecode == "q":
+                return None if value == _MISSING_INT else value
+            return None if math.isnan(value) else value
+        return value
+
+    def set_column(self, key, values):
+        self.columns[key] = array("d", values)
+
+    def properties(self, row):
+        props = {}
+        for key in self.columns:
+            value = self.value(key, row)
+            if value is not None:
+                props[key] = value
+        return props
+
+    def lookup(self, key, value):
+        """Linhas com `key == value` (índice criado no primeiro uso)."""
+        index = self._indexes.get(key)
+        if index is None:
+            index = {}
+            for row in range(len(self)):
+                index.setdefault(self.value(key, row), []).append(row)
+            self._indexes[key] = index
+        return index.get(value, ())
+
+
+class Adjacency:
+    """Lista de adjacência CSR: vizinhos de `ordinal` em targets[offsets[o]:offsets[o+1]]."""
+
+    def __init__(self, size, pairs):
+        counts = array("q", [0]) * (size + 1)
+        for source, _ in pairs:
+            counts[source + 1] += 1
+        for i in range(size):
+            counts[i + 1] += counts[i]
+        self.offsets = counts
+        self.targets = array("q", [0]) * len(pairs)
+        fill = array("q", counts[:-1])
+        for source, target in pairs:
+            self.targets[fill[source]] = target
+            fill[source] += 1
+
+    def neighbors(self, ordinal):
+        return self.targets[self.offsets[ordinal]:self.offsets[ordinal + 1]]
+
+
+class Snapshot:
+    def __init__(self, path):
+        self.path = path
+        self.tables = {}
+        self.node_table = []    # ordinal -> Table
+        self.node_row = array("q")
+        self.adjacency = {}     # (tipo, "out"|"in") -> Adjacency
+        self.relationship_count = 0
+        self.cache = {}         # estruturas derivadas (ordenações etc.) por consumidor
+        self._cache_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        start = time.perf_counter()
+        snapshot = cls(path)
+        ordinals = {}
+        raw_relationships = {}
+        seen_relationships = set()
+
+        for record in _iter_records(path):
+            values = record.values() if isinstance(record, dict) and not _is_entity(record) else [record]
+            for kind, entity in _entities(list(values)):
+                if kind == "node":
+                    identity = entity["identity"]
+                    if identity in ordinals:
+                        continue
+                    labels = entity.get("labels") or ["_"]
+                    table = snapshot.tables.get(labels[0])
+                    if table is None:
+                        table = snapshot.tables[labels[0]] = Table(labels[0])
+                    ordinal = len(snapshot.node_table)
+                    ordinals[identity] = ordinal
+                    snapshot.node_table.append(table)
+                    snapshot.node_row.append(len(table))
+                    table.append(ordinal, str(entity.get("elementId", identity)), entity.get("properties") or {})
+                else:
+                    identity = entity.get("identity")
+                    if identity is not None:
+                        if identity in seen_relationships:
+                            continue
+                        seen_relationships.add(identity)
+                    raw_relationships.setdefault(entity["type"], []).append((entity["start"], entity["end"]))
+
+        for table in snapshot.tables.values():
+            table.freeze()
+
+        size = len(snapshot.node_table)
+        for rel_type, raw in raw_relationships.items():
+            pairs = [
+                (ordinals[s], ordinals[e]) for s, e in raw
+                if s in ordinals and e in ordinals
+            ]
+            snapshot.relationship_count += len(pairs)
+            snapshot.adjacency[(rel_type, "out")] = Adjacency(size, pairs)
+            snapshot.adjacency[(rel_type, "in")] = Adjacency(size, [(e, s) for s, e in pairs])
+
+        snapshot._rollup_counters()
+        snapshot.loaded_at = time.time()
+        logger.info(
+            "Snapshot %s carregado: %d nós, %d relacionamentos em %.0f ms",
+            path, size, snapshot.relationship_count, (time.perf_counter() - start) * 1000,
+        )
+        return snapshot
+
+    # ----------------------------------------------------------
+    # Leitura
+    # ----------------------------------------------------------
+
+    def count(self, label):
+        table = self.tables.get(label)
+        return len(table) if table else 0
+
+    def node(self, ordinal):
+        table = self.node_table[ordinal]
+        row = self.node_row[ordinal]
+        return SnapshotNode(ordinal, table.element_ids[row], [table.label], table.properties(row))
+
+    def nodes(self, label):
+        table = self.tables.get(label)
+        if table is None:
+            return
+        for ordinal in table.ordinals:
+            yield self.node(ordinal)
+
+    def find(self, label, key, value):
+        """Primeiro nó de `label` com `key == value`, ou None."""
+        table = self.tables.get(label)
+        rows = table.lookup(key, value) if table else ()
+        return self.node(table.ordinals[rows[0]]) if rows else None
+
+    def neighbors(self, ordinal, rel_type, direction="out", label=None):
+        """Ordinais vizinhos por `rel_type` na direção dada, opcionalmente filtrados por label."""
+        adjacency = self.adjacency.get((rel_type, direction))
+        if adjacency is None:
+            return []
+        targets = adjacency.neighbors(ordinal)
+        if label is None:
+            return list(targets)
+        return [t for t in targets if self.node_table[t].label == label]
+
+    def related(self, node, rel_type, direction="out", label=None):
+        return [self.node(o) for o in self.neighbors(node.ordinal, rel_type, direction, label)]
+
+    def value(self, ordinal, key):
+        return self.node_table[ordinal].value(key, self.node_row[ordinal])
+
+    def derived(self, key, build):
+        """Estrutura derivada do snapshot (ex.: ordenação para paginação), construída uma vez."""
+        value = self.cache.get(key)
+        if value is None:
+            with self._cache_lock:
+                value = self.cache.get(key)
+                if value is None:
+                    value = self.cache[key] = build(self)
+        return value
+
+    # ----------------------------------------------------------
+    # Contadores de ocupação
+    # ----------------------------------------------------------
+
+    def _rollup_counters(self):
+        # (label, relacionamento até os filhos, direção, propriedades dos filhos)
+        levels = (
+            ("Shelf", "CONTAINS", "in", "Bin", "capacity", "occupied"),
+            ("Aisle", "CONTAINS", "in", "Shelf", "capacity_sum", "occupied_sum"),
+            ("Zone", "CONTAINS", "out", "Aisle", "capacity_sum", "occupied_sum"),
+            ("Warehouse", "CONTAINS", "out", "Zone", "capacity_sum", "occupied_sum"),
+        )
+        for label, rel_type, direction, child_label, capacity_key, occupied_key in levels:
+            table = self.tables.get(label)
+            if table is None:
+                continue
+            capacities, occupieds = [], []
+            for ordinal in table.ordinals:
+                capacity = occupied = 0.0
+                for child in self.neighbors(ordinal, rel_type, direction, child_label):
+                    capacity += self.value(child, capacity_key) or 0.0
+                    occupied += self.value(child, occupied_key) or 0.0
+                capacities.append(capacity)
+                occupieds.append(occupied)
+            table.set_column("capacity_sum", capacities)
+            table.set_column("occupied_sum", occupieds)
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "loadedAt": self.loaded_at,
+            "nodes": {label: len(table) for label, table in sorted(self.tables.items())},
+            "relationships": self.relationship_count,
+        }
+
+
+def _is_entity(record):
+    return "labels" in record or "segments" in record or ("type" in record and "start" in record)
+
+
+# --------------------------------------------------------------
+# Snapshot do processo
+# --------------------------------------------------------------
+
+_lock = threading.Lock()
+_snapshot = None
+_snapshot_mtime = None
+
+
+def get_snapshot():
+    """
+    Snapshot configurado em settings.WMS_SNAPSHOT_PATH (None se o modo
+    snapshot estiver desligado). Recarregado quando o arquivo muda.
+    """
+    global _snapshot, _snapshot_mtime
+    path = settings.WMS_SNAPSHOT_PATH
+    if not path:
+        return None
+    mtime = os.stat(path).st_mtime
+    if _snapshot is not None and _snapshot.path == path and _snapshot_mtime == mtime:
+        return _snapshot
+    with _lock:
+        if _snapshot is None or _snapshot.path != path or _snapshot_mtime != mtime:
+            _snapshot = Snapshot.load(path)
+            _snapshot_mtime = mtime
+        return _snapshot
+
+
+def snapshot_enabled():
+    return bool(settings.WMS_SNAPSHOT_PATH)
+
+
+def keyset_after(keys, after, descending=False):
+    """
+    Posição de início de uma página numa lista de chaves ordenada de forma
+    crescente. Com `descending`, a página anda do fim para o começo e o valor
+    retornado é o índice exclusivo do fim.
+    """
+    if after is None:
+        return len(keys) if descending else 0
+    return bisect.bisect_left(keys, after) if descending else bisect.bisect_right(keys, after)
@@ -0,0 +1,70 @@
+import os
+import threading
+import unittest
+from unittest import mock
+
+from django.test import SimpleTestCase
+from neomodel import db
+from neomodel.util import Database
+
+from . import neo4j_driver, query_log
+
+
+class InstrumentNeomodelTests(SimpleTestCase):
+    def test_query_from_new_thread_is_logged(self):
+        # O `db` do neomodel é thread-local: a consulta precisa ser registrada
+        # também fora da thread que rodou CoreConfig.ready()
+        seen = []
+        outcome = {}
+
+        def worker():
+            token = query_log.start()
+            db.cypher_query("RETURN 1")
+            outcome["log"] = query_log.stop(token)
+
+        query_log.listeners.append(lambda query, seconds: seen.append(query))
+        try:
+            # Conexão falsa só para a thread nova (o `db` dela começa sem driver)
+            connect = lambda self, **kwargs: setattr(self, "driver", mock.MagicMock())
+            with mock.patch.object(Database, "set_connection", autospec=True, side_effect=connect), \
+                    mock.patch.object(Database, "_run_cypher_query", return_value=([[1]], ["1"])):
+                thread = threading.Thread(target=worker)
+                thread.start()
+                thread.join()
+        finally:
+            query_log.listeners.pop()
+
+        self.assertEqual(outcome["log"].count, 1)
+        self.assertEqual(outcome["log"].rows, 1)
+        self.assertEqual(seen, ["RETURN 1"])
+
+    def test_instrumented_once(self):
+        wrapped = Database.cypher_query
+        query_log.instrument_neomodel()
+        self.assertIs(Database.cypher_query, wrapped)
+        self.assertTrue(getattr(wrapped, "_wms_instrumented", False))
+
+
+class ForkTests(SimpleTestCase):
+    @unittest.skipUnless(hasattr(os, "fork"), "requer fork")
+    def test_child_binds_neomodel_to_its_own_driver(self):
+        from neomodel import config as neomodel_config
+
+        parent = neo4j_driver.get_driver()
+        self.assertIs(neomodel_config.DRIVER, parent)
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # filho
+            ok = (
+                neomodel_config.DRIVER is neo4j_driver.get_driver()
+                and neomodel_config.DRIVER is not parent
+                and db.driver is None
+                and not parent._closed
+            )
+            os.write(write_end, b"1" if ok else b"0")
+            os._exit(0)
+        os.close(write_end)
+        os.waitpid(pid, 0)
+        self.assertEqual(os.read(read_end, 1), b"1")
+        os.close(read_end)
+        self.assertIs(neomodel_config.DRIVER, parent)
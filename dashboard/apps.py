@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class DashboardConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "dashboard"
+
+    def ready(self):
+        from core.signals import graph_changed
+        from .stats import invalidate_stats
+
+        graph_changed.connect(invalidate_stats, dispatch_uid="dashboard-stats-invalidation")
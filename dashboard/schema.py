@@ -0,0 +1,11 @@
+# dashboard/schema.py
+"""Consultas do dashboard que dependem dos índices de Order.status e Product.quantity (ver core/schema.py)."""
+from core.schema import HotQuery
+from .stats import STATS_PART_QUERIES, STATS_QUERY
+
+HOT_QUERIES = [
+    # Poucos galpões: a soma dos contadores varre Warehouse
+    HotQuery("stats", STATS_QUERY, allow_scans=("Warehouse",)),
+    HotQuery("pending_orders", STATS_PART_QUERIES["pending"]),
+    HotQuery("critical_stock", STATS_PART_QUERIES["critical"]),
+]
@@ -0,0 +1,138 @@
+# dashboard/stats.py
+import asyncio
+
+from django.conf import settings
+from django.core.cache import cache
+from neomodel import db
+
+from core.metrics import cache_lookup
+from core.neo4j_driver import afetch
+from core.snapshot import get_snapshot
+
+STATS_CACHE_KEY = "dashboard:stats"
+
+# Os seis indicadores em um único round trip. As contagens por label usam o
+# count store do Neo4j; a ocupação vem dos contadores pré-agregados dos
+# galpões (warehouse/counters.py).
+STATS_QUERY = """
+    CALL {
+        MATCH (w:Warehouse)
+        RETURN count(w) AS total_warehouses,
+               sum(w.occupied_sum) AS occupied,
+               sum(w.capacity_sum) AS capacity
+    }
+    CALL { MATCH (p:Product) RETURN count(p) AS total_products }
+    CALL { MATCH (o:Order) RETURN count(o) AS total_orders }
+    CALL { MATCH (o:Order {status: 'pending'}) RETURN count(o) AS pending_orders }
+    CALL { MATCH (p:Product) WHERE p.quantity < 10 RETURN count(p) AS critical_stock }
+    RETURN total_warehouses, total_products, total_orders, pending_orders,
+           CASE WHEN capacity > 0
+                THEN round((occupied / capacity) * 100, 1)
+                ELSE 0.0 END AS average_occupancy,
+           critical_stock
+"""
+
+# Os mesmos indicadores em consultas independentes, executadas em paralelo
+# (asyncio.gather) pela versão assíncrona, cada uma em sua sessão.
+STATS_PART_QUERIES = {
+    "warehouses": """
+        MATCH (w:Warehouse)
+        RETURN count(w), sum(w.occupied_sum), sum(w.capacity_sum)
+    """,
+    "products": "MATCH (p:Product) RETURN count(p)",
+    "orders": "MATCH (o:Order) RETURN count(o)",
+    "pending": "MATCH (o:Order {status: 'pending'}) RETURN count(o)",
+    "critical": "MATCH (p:Product) WHERE p.quantity < 10 RETURN count(p)",
+}
+
+# Escritas que alteram algum dos indicadores
+STATS_KINDS = {"warehouses", "orders", "products", "bins"}
+
+
+def compute_stats():
+    """Consulta o Neo4j (ou o snapshot, se ativo) e monta o payload do dashboard."""
+    snapshot = get_snapshot()
+    rows = [_snapshot_stats(snapshot)] if snapshot is not None else db.cypher_query(STATS_QUERY)[0]
+    return _payload(rows[0])
+
+
+async def acompute_stats():
+    """Versão assíncrona de compute_stats: as cinco contagens rodam em paralelo."""
+    names = list(STATS_PART_QUERIES)
+    results = await asyncio.gather(*(afetch(STATS_PART_QUERIES[name]) for name in names))
+    parts = {name: records[0].values() for name, records in zip(names, results)}
+
+    total_warehouses, occupied, capacity = parts["warehouses"]
+    occupied, capacity = occupied or 0, capacity or 0
+    return _payload((
+        total_warehouses,
+        parts["products"][0],
+        parts["orders"][0],
+        parts["pending"][0],
+        round((occupied / capacity) * 100, 1) if capacity > 0 else 0.0,
+        parts["critical"][0],
+    ))
+
+
+def _payload(row):
+    (
+        total_warehouses,
+        total_products,
+        total_orders,
+        pending_orders,
+        average_occupancy,
+        critical_stock,
+    ) = row
+
+    return {
+        "totalWarehouses": total_warehouses,
+        "totalProducts": total_products,
+        "totalOrders": total_orders,
+        "pendingOrders": pending_orders,
+        "averageOccupancy": average_occupancy,
+        "criticalStock": critical_stock,
+    }
+
+
+def _snapshot_stats(snapshot):
+    """Mesma linha de STATS_QUERY, calculada sobre as colunas do snapshot."""
+    def column(label, key):
+        table = snapshot.tables.get(label)
+        return [table.value(key, row) for row in range(len(table))] if table else []
+
+    capacity = sum(v or 0 for v in column("Warehouse", "capacity_sum"))
+    occupied = sum(v or 0 for v in column("Warehouse", "occupied_sum"))
+    return (
+        snapshot.count("Warehouse"),
+        snapshot.count("Product"),
+        snapshot.count("Order"),
+        sum(1 for status in column("Order", "status") if status == "pending"),
+        round((occupied / capacity) * 100, 1) if capacity > 0 else 0.0,
+        sum(1 for quantity in column("Product", "quantity") if quantity is not None and quantity < 10),
+    )
+
+
+def get_stats():
+    """Retorna as estatísticas do cache, recalculando-as quando expiradas."""
+    stats = cache.get(STATS_CACHE_KEY)
+    cache_lookup("dashboard_stats", stats is not None)
+    if stats is None:
+        stats = compute_stats()
+        cache.set(STATS_CACHE_KEY, stats, settings.DASHBOARD_STATS_TTL)
+    return stats
+
+
+async def aget_stats():
+    """Versão assíncrona de get_stats (mesmo cache)."""
+    stats = await cache.aget(STATS_CACHE_KEY)
+    cache_lookup("dashboard_stats", stats is not None)
+    if stats is None:
+        stats = await acompute_stats()
+        await cache.aset(STATS_CACHE_KEY, stats, settings.DASHBOARD_STATS_TTL)
+    return stats
+
+
+def invalidate_stats(sender=None, kinds=(), **kwargs):
+    """Receiver de core.signals.graph_changed: descarta o cache se algo relevante mudou."""
+    if STATS_KINDS.intersection(kinds):
+        cache.delete(STATS_CACHE_KEY)
@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import dashboard_stats
+from core.async_views import with_async_get
+from .views import adashboard_stats, dashboard_stats
 
 urlpatterns = [
-    path('stats/', dashboard_stats, name='dashboard-stats'),
+    path('stats/', with_async_get(dashboard_stats, adashboard_stats), name='dashboard-stats'),
 ]
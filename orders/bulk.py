@@ -0,0 +1,166 @@
+# orders/bulk.py
+import time
+import uuid
+from itertools import islice
+
+from neomodel import db
+from neomodel.exceptions import ConstraintValidationFailed
+
+# Escrita de pedidos em lote: cada transação grava `batch_size` pedidos e todos
+# os seus itens com um único UNWIND, em vez de 1 + 2×itens round trips por
+# pedido como em OrderSerializer.create.
+CREATE_ORDERS_QUERY = """
+    UNWIND $orders AS row
+    CREATE (o:Order {
+        uid: row.uid,
+        order_number: row.order_number,
+        status: 'pending',
+        created_at: row.created_at
+    })
+    WITH o, row
+    UNWIND row.items AS item
+    CREATE (i:OrderItem {
+        uid: item.uid,
+        product_sku: item.product_sku,
+        quantity: item.quantity,
+        picked_quantity: 0
+    })
+    CREATE (o)-[:HAS_ITEM]->(i)
+"""
+
+EXISTING_NUMBERS_QUERY = """
+    MATCH (o:Order) WHERE o.order_number IN $numbers
+    RETURN o.order_number
+"""
+
+
+def _normalize_item(raw):
+    """Aceita o formato do frontend (sku/qty) e o interno (product_sku/quantity)."""
+    if not isinstance(raw, dict):
+        return None, "item deve ser um objeto"
+    sku = raw.get("sku", raw.get("product_sku"))
+    qty = raw.get("qty", raw.get("quantity"))
+    if not isinstance(sku, str) or not sku.strip():
+        return None, "sku obrigatório"
+    if isinstance(qty, bool) or not isinstance(qty, int) or qty < 1:
+        return None, f"qty inválida para {sku}: deve ser inteiro >= 1"
+    return {"uid": uuid.uuid4().hex, "product_sku": sku.strip(), "quantity": qty}, None
+
+
+def validate_order(raw):
+    """
+    Valida um pedido no formato externalId/items[sku, qty].
+    Retorna (pedido normalizado, None) ou (None, lista de erros).
+    """
+    if not isinstance(raw, dict):
+        return None, ["pedido deve ser um objeto JSON"]
+
+    errors = []
+    number = raw.get("externalId", raw.get("order_number"))
+    if not isinstance(number, str) or not number.strip():
+        errors.append("externalId obrigatório")
+
+    raw_items = raw.get("items", [])
+    if not isinstance(raw_items, list):
+        errors.append("items deve ser uma lista")
+        raw_items = []
+
+    items = []
+    for raw_item in raw_items:
+        item, error = _normalize_item(raw_item)
+        if error:
+            errors.append(error)
+        else:
+            items.append(item)
+
+    if errors:
+        return None, errors
+    return {
+        "uid": uuid.uuid4().hex,
+        "order_number": number.strip(),
+        "created_at": time.time(),
+        "items": items,
+    }, None
+
+
+def _existing_numbers(numbers):
+    rows, _ = db.cypher_query(EXISTING_NUMBERS_QUERY, {"numbers": numbers})
+    return {row[0] for row in rows}
+
+
+def _write(orders):
+    with db.transaction:
+        db.cypher_query(CREATE_ORDERS_QUERY, {"orders": orders})
+
+
+def _write_batch(orders):
+    """
+    Grava o lote em uma transação. Se outro processo inserir o mesmo
+    externalId no meio tempo, o lote falha inteiro pela constraint única; nesse
+    caso cada pedido é regravado isoladamente para apontar só os conflitantes.
+    """
+    try:
+        _write(orders)
+        return {order["uid"]: None for order in orders}
+    except ConstraintValidationFailed:
+        outcome = {}
+        for order in orders:
+            try:
+                _write([order])
+                outcome[order["uid"]] = None
+            except ConstraintValidationFailed as exc:
+                outcome[order["uid"]] = exc.message
+        return outcome
+
+
+def ingest_orders(records, batch_size=500):
+    """
+    Valida e grava `records` (qualquer iterável, inclusive um gerador NDJSON)
+    em lotes de `batch_size`. Gera um resultado por registro, na ordem de
+    entrada: {"index", "externalId", "status", "id" | "errors"}.
+    """
+    seen = set()
+    index = 0
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, batch_size))
+        if not chunk:
+            return
+
+        results = []
+        valid = []
+        for raw in chunk:
+            order, errors = validate_order(raw)
+            external_id = order["order_number"] if order else (
+                raw.get("externalId") if isinstance(raw, dict) else None
+            )
+            result = {"index": index, "externalId": external_id}
+            index += 1
+
+            if order and order["order_number"] in seen:
+                errors = ["externalId repetido na requisição"]
+            if errors:
+                result.update(status="error", errors=errors)
+            else:
+                seen.add(order["order_number"])
+                valid.append((order, result))
+            results.append(result)
+
+        existing = _existing_numbers([order["order_number"] for order, _ in valid]) if valid else set()
+        to_write = []
+        for order, result in valid:
+            if order["order_number"] in existing:
+                result.update(status="error", errors=["externalId já cadastrado"])
+            else:
+                to_write.append((order, result))
+
+        if to_write:
+            outcome = _write_batch([order for order, _ in to_write])
+            for order, result in to_write:
+                error = outcome[order["uid"]]
+                if error:
+                    result.update(status="error", errors=[error])
+                else:
+                    result.update(status="created", id=order["uid"])
+
+        yield from results
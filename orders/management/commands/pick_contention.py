@@ -0,0 +1,143 @@
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from neomodel import db
+
+from orders.models import OrderItem
+from orders.picking import PickRefused, confirm_pick
+from warehouse.models import Product
+
+SETUP_QUERY = """
+    CREATE (p:Product {uid: $prefix + '-p', id: $prefix + '-p', sku: $prefix, name: 'Benchmark de coleta',
+                       quantity: $stock, reserved: 0, unit: 'UN'})
+    CREATE (b:Bin {uid: $prefix + '-b', code: $prefix, capacity: toFloat($stock),
+                   occupied: toFloat($stock)})
+    CREATE (o:Order {uid: $prefix + '-o', order_number: $prefix, status: 'pending',
+                     stock_reserved: false, created_at: datetime().epochMillis / 1000.0})
+    CREATE (i:OrderItem {uid: $prefix + '-i', product_sku: $prefix, quantity: $ordered,
+                         picked_quantity: 0, bin_code: $prefix})
+    CREATE (p)-[:STORED_IN]->(b)
+    CREATE (o)-[:HAS_ITEM]->(i)
+"""
+
+STATE_QUERY = """
+    MATCH (p:Product {sku: $prefix}), (b:Bin {code: $prefix}),
+          (o:Order {uid: $prefix + '-o'})-[:HAS_ITEM]->(i:OrderItem)
+    RETURN p.quantity, b.occupied, i.picked_quantity, o.status
+"""
+
+CLEANUP_QUERY = """
+    MATCH (n) WHERE n.uid STARTS WITH $prefix
+    DETACH DELETE n
+"""
+
+
+def _naive_pick(prefix):
+    """Leitura-modificação-escrita pelo neomodel, como os fluxos antigos (para comparação)."""
+    product = Product.nodes.get(sku=prefix)
+    item = OrderItem.nodes.get(uid=f"{prefix}-i")
+    if product.quantity < 1 or item.picked_quantity >= item.quantity:
+        raise PickRefused("insufficient_stock")
+    product.quantity -= 1
+    product.save()
+    item.picked_quantity += 1
+    item.save()
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede coletas concorrentes do mesmo item (orders/picking.py) e verifica "
+        "que nenhuma atualização se perde e nenhum estoque fica negativo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pickers", type=int, default=16, help="Coletores simultâneos (padrão: 16).")
+        parser.add_argument("--picks", type=int, default=50, help="Coletas de 1 unidade por coletor (padrão: 50).")
+        parser.add_argument(
+            "--stock", type=int,
+            help="Estoque inicial do produto (padrão: metade das coletas, para forçar recusas).",
+        )
+        parser.add_argument(
+            "--naive", action="store_true",
+            help="Usa leitura-modificação-escrita pelo neomodel no lugar do statement único.",
+        )
+        parser.add_argument("--keep", action="store_true", help="Não apaga os nós criados para o teste.")
+
+    def handle(self, *args, pickers, picks, stock, naive, keep, **options):
+        if pickers < 1 or picks < 1:
+            raise CommandError("--pickers e --picks devem ser maiores que zero.")
+        attempts = pickers * picks
+        stock = attempts // 2 if stock is None else stock
+        if stock < 0:
+            raise CommandError("--stock não pode ser negativo.")
+
+        prefix = f"bench-pick-{uuid.uuid4().hex[:8]}"
+        db.cypher_query(SETUP_QUERY, {"prefix": prefix, "stock": stock, "ordered": attempts})
+
+        latencies = []
+        counts = {"ok": 0, "refused": 0}
+        lock = threading.Lock()
+
+        def picker(_):
+            mine = []
+            ok = refused = 0
+            for _ in range(picks):
+                started = time.perf_counter()
+                try:
+                    if naive:
+                        _naive_pick(prefix)
+                    else:
+                        confirm_pick(f"{prefix}-o", f"{prefix}-i", 1)
+                    ok += 1
+                except PickRefused:
+                    refused += 1
+                mine.append(time.perf_counter() - started)
+            with lock:
+                latencies.extend(mine)
+                counts["ok"] += ok
+                counts["refused"] += refused
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=pickers) as pool:
+                list(pool.map(picker, range(pickers)))
+            elapsed = time.perf_counter() - started
+
+            rows, _ = db.cypher_query(STATE_QUERY, {"prefix": prefix})
+            quantity, occupied, picked, order_status = rows[0]
+        finally:
+            if not keep:
+                db.cypher_query(CLEANUP_QUERY, {"prefix": prefix})
+
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+        mode = "neomodel (leitura-modificação-escrita)" if naive else "statement único"
+        self.stdout.write(f"🏁 {mode}: {pickers} coletores × {picks} coletas, estoque inicial {stock}")
+        self.stdout.write(
+            f"⏱️  {attempts / elapsed:.0f} coletas/s; latência mediana "
+            f"{statistics.median(latencies) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms"
+        )
+        self.stdout.write(f"📦 {counts['ok']} aceitas, {counts['refused']} recusadas; pedido {order_status}")
+        self.stdout.write(f"   estoque final {quantity}, coletado {picked}, ocupação do bin {occupied}")
+
+        problems = []
+        if quantity < 0:
+            problems.append(f"estoque negativo ({quantity})")
+        if stock - quantity != counts["ok"]:
+            problems.append(f"estoque baixado {stock - quantity} ≠ coletas aceitas {counts['ok']}")
+        if picked != counts["ok"]:
+            problems.append(f"coletado {picked} ≠ coletas aceitas {counts['ok']}")
+        if not naive and occupied != stock - counts["ok"]:
+            problems.append(f"ocupação do bin {occupied} ≠ {stock - counts['ok']}")
+        if counts["ok"] != min(stock, attempts):
+            problems.append(f"{counts['ok']} coletas aceitas, esperado {min(stock, attempts)}")
+
+        if problems:
+            for problem in problems:
+                self.stdout.write(f"❌ {problem}")
+            raise CommandError("Resultado inconsistente sob concorrência.")
+        self.stdout.write(self.style.SUCCESS("✅ Nenhuma atualização perdida, nenhum estoque negativo."))
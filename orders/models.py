@@ -3,6 +3,7 @@ from neomodel import (
     StringProperty,
     IntegerProperty,
     DateTimeProperty,
+    BooleanProperty,
     RelationshipTo,
     UniqueIdProperty
 )
@@ -23,9 +24,17 @@ class Order(StructuredNode):
         default='pending'
     )
 
-    created_at = DateTimeProperty(default=datetime.utcnow)
+    # Indexado também pelo neomodel (install_all_labels): ordem da listagem
+    created_at = DateTimeProperty(default=datetime.utcnow, index=True)
     completed_at = DateTimeProperty()
 
+    # Onda/lote de separação (routing/waves.py)
+    wave_id = StringProperty(index=True)
+    batch_number = IntegerProperty()
+
+    # Estoque das linhas pendentes reservado em Product.reserved (orders/picking.py)
+    stock_reserved = BooleanProperty(default=False)
+
     items = RelationshipTo('OrderItem', 'HAS_ITEM')
 
 
@@ -36,3 +45,18 @@ class OrderItem(StructuredNode):
     picked_quantity = IntegerProperty(default=0)
     bin_code = StringProperty()
     order = RelationshipTo('Order', 'BELONGS_TO')
+
+
+class ScanEvent(StructuredNode):
+    """Leitura de coletor já recebida (orders/scans.py); garante a idempotência por event_id."""
+    event_id = StringProperty(required=True, unique_index=True)
+    type = StringProperty(choices={'pick': 'Coleta', 'putaway': 'Armazenagem'})
+    order_uid = StringProperty()
+    sku = StringProperty()
+    bin_code = StringProperty()
+    quantity = IntegerProperty()
+    device_id = StringProperty()
+    scanned_at = DateTimeProperty()
+    received_at = DateTimeProperty()
+    # applied ou o motivo da recusa (ex.: insufficient_stock)
+    outcome = StringProperty()
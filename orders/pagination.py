@@ -0,0 +1,73 @@
+# orders/pagination.py
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from core.cursors import decode_cursor, encode_cursor
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por cursor (keyset) sobre uma chave de ordenação composta.
+
+    Diferente do PageNumberPagination, não usa OFFSET: o cursor guarda a chave
+    do último item da página e a próxima consulta continua a partir dela, então
+    o custo de cada página independe da profundidade no histórico.
+    """
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 500
+    key_size = 2
+    invalid_cursor_message = "Cursor inválido."
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_cursor_key(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            return decode_cursor(encoded, self.key_size)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate(self, fetch, request, key):
+        """
+        `fetch(after, limit)` devolve os itens seguintes à chave `after` (ou do
+        início quando None); `key(item)` extrai a chave de ordenação de um item.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        items = fetch(self.get_cursor_key(request), page_size + 1)
+        return self._page(items, page_size, key)
+
+    async def apaginate(self, fetch, request, key):
+        """Como `paginate`, com `fetch` assíncrono (coroutine)."""
+        self.request = request
+        page_size = self.get_page_size(request)
+        items = await fetch(self.get_cursor_key(request), page_size + 1)
+        return self._page(items, page_size, key)
+
+    def _page(self, items, page_size, key):
+        self.next_key = key(items[page_size - 1]) if len(items) > page_size else None
+        return items[:page_size]
+
+    def get_next_link(self):
+        if self.next_key is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encode_cursor(self.next_key))
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "results": data,
+        })
@@ -0,0 +1,34 @@
+# orders/parsers.py
+import codecs
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Lê um corpo application/x-ndjson (um objeto JSON por linha).
+
+    Devolve um gerador preguiçoso: as linhas são decodificadas conforme o
+    consumidor avança, sem carregar o corpo inteiro em memória.
+    """
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if stream is None:
+            return iter(())
+        return self._records(codecs.getreader(encoding)(stream))
+
+    def _records(self, reader):
+        for number, line in enumerate(reader, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                raise ParseError(f"NDJSON inválido na linha {number}: {exc}")
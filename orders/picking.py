@@ -0,0 +1,266 @@
+# orders/picking.py
+"""
+Reserva de estoque e confirmação de coleta, cada uma em um único statement
+Cypher condicional.
+
+Os statements travam os nós envolvidos (escrevendo a própria propriedade)
+antes de ler os valores. A ordem é sempre pedido → item → produto → bin, a
+mesma em todas as operações, o que evita deadlocks entre coletas
+concorrentes. As condições são verificadas e as escritas aplicadas na mesma
+transação: não há leitura-modificação-escrita em Python, então coletores
+concorrentes nunca perdem atualizações nem vendem estoque que já não existe.
+Uma transação que ainda assim esbarre num deadlock é repetida pelo driver
+(execute_write).
+
+`Product.reserved` guarda as unidades reservadas para pedidos ainda não
+coletados. Coletas de pedidos sem reserva só usam o estoque livre
+(quantity - reserved).
+"""
+from core.neo4j_driver import session as neo4j_session
+from core.signals import notify_bin_levels, notify_graph_change
+from warehouse.counters import rollup_clause
+
+# Epoch em segundos, o formato de DateTimeProperty
+NOW = "datetime().epochMillis / 1000.0"
+
+def pick_clause(*carry, checks=()):
+    """
+    Trecho Cypher que coleta `qty` unidades do item `i` do pedido `o`, do bin
+    `bin_code` (ou do bin do item), que precisa existir e guardar o produto
+    (STORED_IN). Espera `o`, `i`, `qty` e `bin_code` no escopo e deixa `o`,
+    `i`, `p`, `b` e `refusal` (null se aplicada).
+    `carry` lista variáveis extras a manter no escopo; `checks` são pares
+    (condição, motivo) avaliados antes das verificações de saldo.
+    """
+    scope = ", ".join(("o", "i", "qty", "bin_code") + carry)
+    extra = "".join(f"\n             WHEN {condition} THEN '{reason}'" for condition, reason in checks)
+    return f"""
+    WITH {scope}
+    SET o.status = o.status
+    SET i.picked_quantity = coalesce(i.picked_quantity, 0)
+    WITH {scope}
+    OPTIONAL MATCH (p:Product {{sku: i.product_sku}})
+    SET p.quantity = coalesce(p.quantity, 0)
+    WITH p, {scope}
+    OPTIONAL MATCH (b:Bin {{code: coalesce(bin_code, i.bin_code)}})
+    SET b.occupied = coalesce(b.occupied, 0.0)
+    WITH p, b, {scope},
+         CASE WHEN coalesce(o.stock_reserved, false)
+              THEN p.quantity
+              ELSE p.quantity - coalesce(p.reserved, 0) END AS available
+    WITH p, b, {scope},
+         CASE{extra}
+             WHEN o.status IN ['completed', 'cancelled'] THEN 'order_closed'
+             WHEN qty > i.quantity - i.picked_quantity THEN 'over_pick'
+             WHEN p IS NULL THEN 'unknown_product'
+             WHEN available < qty THEN 'insufficient_stock'
+             WHEN b IS NULL AND coalesce(bin_code, i.bin_code) IS NOT NULL THEN 'unknown_bin'
+             WHEN b IS NOT NULL AND NOT EXISTS {{ (p)-[:STORED_IN]->(b) }} THEN 'wrong_bin'
+             WHEN b IS NOT NULL AND b.occupied < qty THEN 'insufficient_bin'
+         END AS refusal
+    CALL {{
+        WITH o, i, p, b, qty, refusal
+        WITH o, i, p, b, qty WHERE refusal IS NULL
+        SET p.quantity = p.quantity - qty,
+            p.reserved = CASE WHEN coalesce(o.stock_reserved, false)
+                              THEN coalesce(p.reserved, 0) - qty
+                              ELSE p.reserved END,
+            i.picked_quantity = i.picked_quantity + qty,
+            o.status = 'picking'
+        WITH o, b, 0.0 AS d_capacity, -toFloat(qty) AS d_occupied
+        SET b.occupied = b.occupied + d_occupied
+        {rollup_clause("o")}
+        WITH DISTINCT o
+        WHERE NOT EXISTS {{
+            MATCH (o)-[:HAS_ITEM]->(x:OrderItem)
+            WHERE coalesce(x.picked_quantity, 0) < x.quantity
+        }}
+        SET o.status = 'completed',
+            o.completed_at = {NOW},
+            o.stock_reserved = false
+    }}
+    """
+
+
+PICK_QUERY = f"""
+    MATCH (o:Order {{uid: $order_uid}})-[:HAS_ITEM]->(i:OrderItem {{uid: $item_uid}})
+    WITH o, i, $quantity AS qty, $bin_code AS bin_code
+    {pick_clause()}
+    RETURN refusal, o.status, i.quantity, i.picked_quantity,
+           p.quantity, p.reserved, b.code, b.capacity, b.occupied
+"""
+
+# Reserva todas as linhas pendentes do pedido, ou nenhuma. Produtos são
+# travados em ordem de SKU (mesma ordem em qualquer reserva concorrente).
+RESERVE_QUERY = """
+    MATCH (o:Order {uid: $order_uid})
+    SET o.status = o.status
+    WITH o
+    OPTIONAL MATCH (o)-[:HAS_ITEM]->(i:OrderItem)
+    WITH o, i.product_sku AS sku,
+         sum(i.quantity - coalesce(i.picked_quantity, 0)) AS needed
+    ORDER BY sku
+    OPTIONAL MATCH (p:Product {sku: sku})
+    SET p.reserved = coalesce(p.reserved, 0)
+    WITH o, collect({sku: sku, product: p, needed: needed}) AS lines
+    WITH o, lines,
+         [line IN lines WHERE line.sku IS NOT NULL AND line.needed > 0 AND (
+             line.product IS NULL
+             OR coalesce(line.product.quantity, 0) - line.product.reserved < line.needed
+         ) | line.sku] AS short,
+         CASE
+             WHEN o.status IN ['completed', 'cancelled'] THEN 'order_closed'
+             WHEN coalesce(o.stock_reserved, false) THEN 'already_reserved'
+         END AS closed
+    WITH o, lines, short,
+         coalesce(closed, CASE WHEN size(short) > 0 THEN 'insufficient_stock' END) AS refusal
+    CALL {
+        WITH o, lines, refusal
+        WITH o, lines WHERE refusal IS NULL
+        UNWIND lines AS line
+        WITH o, line WHERE line.product IS NOT NULL AND line.needed > 0
+        WITH o, line.product AS p, line.needed AS needed
+        SET p.reserved = p.reserved + needed
+        WITH DISTINCT o
+        SET o.stock_reserved = true
+    }
+    RETURN refusal, short, o.status, coalesce(o.stock_reserved, false)
+"""
+
+# Devolve ao estoque livre o que o pedido `o` ainda tinha reservado, se
+# `release` for verdadeiro (espera `o` e `release` no escopo)
+_RELEASE_CLAUSE = """
+    CALL {
+        WITH o, release
+        WITH o WHERE release
+        MATCH (o)-[:HAS_ITEM]->(i:OrderItem)
+        WITH o, i.product_sku AS sku,
+             sum(i.quantity - coalesce(i.picked_quantity, 0)) AS needed
+        ORDER BY sku
+        MATCH (p:Product {sku: sku})
+        SET p.reserved = coalesce(p.reserved, 0) - needed
+    }
+"""
+
+# Libera a reserva (ex.: DELETE /reserve/ ou exclusão do pedido)
+RELEASE_QUERY = f"""
+    MATCH (o:Order {{uid: $order_uid}})
+    SET o.status = o.status
+    WITH o, coalesce(o.stock_reserved, false) AS release
+    {_RELEASE_CLAUSE}
+    SET o.stock_reserved = false
+    RETURN release, o.status
+"""
+
+# Troca o status do pedido; ao concluir ou cancelar, libera a reserva no
+# mesmo statement
+SET_STATUS_QUERY = f"""
+    MATCH (o:Order {{uid: $order_uid}})
+    SET o.status = o.status
+    WITH o, o.status AS previous,
+         $status IN ['completed', 'cancelled'] AND coalesce(o.stock_reserved, false) AS release
+    {_RELEASE_CLAUSE}
+    SET o.status = $status,
+        o.completed_at = CASE WHEN $status = 'completed' AND previous <> 'completed'
+                              THEN {NOW} ELSE o.completed_at END,
+        o.stock_reserved = CASE WHEN release THEN false ELSE o.stock_reserved END
+    RETURN release, o.status
+"""
+
+
+class PickRefused(Exception):
+    """A operação foi recusada pelo banco; `reason` diz o motivo (ex.: insufficient_stock)."""
+
+    def __init__(self, reason, detail=None):
+        super().__init__(reason)
+        self.reason = reason
+        self.detail = detail or {}
+
+
+def _write(query, params):
+    with neo4j_session() as session:
+        return session.execute_write(lambda tx: tx.run(query, params).single())
+
+
+def confirm_pick(order_uid, item_uid, quantity, bin_code=None):
+    """
+    Confirma a coleta de `quantity` unidades do item `item_uid` (do bin
+    `bin_code` ou do bin do item). Em um único statement: baixa o estoque do
+    produto e a ocupação do bin (com os contadores dos ancestrais), soma em
+    `picked_quantity` e conclui o pedido quando todas as linhas foram
+    coletadas.
+
+    Retorna o estado resultante, None se o pedido/item não existir, ou levanta
+    PickRefused se a coleta não couber.
+    """
+    record = _write(PICK_QUERY, {
+        "order_uid": order_uid,
+        "item_uid": item_uid,
+        "quantity": quantity,
+        "bin_code": bin_code,
+    })
+    if record is None:
+        return None
+
+    refusal, status, ordered, picked, stock, reserved, code, capacity, occupied = record.values()
+    result = {
+        "orderStatus": status,
+        "quantity": ordered,
+        "pickedQuantity": picked,
+        "productStock": stock,
+        "productReserved": reserved or 0,
+        "binCode": code,
+        "binOccupied": occupied,
+    }
+    if refusal is not None:
+        raise PickRefused(refusal, result)
+
+    if code is not None:
+        notify_bin_levels([(code, capacity, occupied)])
+    notify_graph_change("orders", "products", "bins")
+    return result
+
+
+def reserve_order(order_uid):
+    """
+    Reserva o estoque de todas as linhas pendentes do pedido, tudo ou nada.
+    Retorna o estado, None se o pedido não existir, ou levanta PickRefused
+    (com os SKUs sem estoque em detail["skus"]).
+    """
+    record = _write(RESERVE_QUERY, {"order_uid": order_uid})
+    if record is None:
+        return None
+
+    refusal, short, status, reserved = record.values()
+    if refusal is not None:
+        raise PickRefused(refusal, {"orderStatus": status, "skus": short})
+    notify_graph_change("products")
+    return {"orderStatus": status, "stockReserved": reserved}
+
+
+def release_order(order_uid):
+    """Libera a reserva do pedido (sem efeito se não houver). None se o pedido não existir."""
+    record = _write(RELEASE_QUERY, {"order_uid": order_uid})
+    if record is None:
+        return None
+
+    released, status = record.values()
+    if released:
+        notify_graph_change("products")
+    return {"orderStatus": status, "released": released}
+
+
+def set_order_status(order_uid, status):
+    """
+    Grava o status do pedido. Ao concluir ou cancelar, a reserva que ainda
+    restava volta ao estoque livre no mesmo statement. None se o pedido não
+    existir.
+    """
+    record = _write(SET_STATUS_QUERY, {"order_uid": order_uid, "status": status})
+    if record is None:
+        return None
+
+    released, status = record.values()
+    if released:
+        notify_graph_change("products")
+    return {"orderStatus": status, "released": released}
@@ -0,0 +1,132 @@
+# orders/queries.py
+from neomodel import db
+
+from core.neo4j_driver import afetch
+from core.snapshot import get_snapshot, keyset_after
+from .models import Order, OrderItem
+
+# Página de pedidos (mais recentes primeiro) já com os itens de cada pedido:
+# um único round trip por página, sem N+1 em `order.items`.
+#
+# Há uma variante por caso (com/sem cursor, com/sem filtro de status), sem
+# predicados do tipo `$x IS NULL OR ...`: assim o planejador percorre o índice
+# Order(created_at) já na ordem da listagem e para no LIMIT, e o custo de uma
+# página não cresce com o histórico. O desempate por uid é só um PartialTop
+# dentro do mesmo created_at. Sem hint de índice: um USING INDEX falha se o
+# índice não existir (banco criado antes de install_schema), e o plano de cada
+# variante é conferido por `install_schema --check` (orders/schema.py).
+def order_page_query(cursor=False, statuses=False):
+    """Texto da consulta de página para o caso (com cursor?, com filtro de status?)."""
+    if cursor:
+        conditions = [
+            "o.created_at <= $after_created",
+            "(o.created_at < $after_created OR o.uid < $after_uid)",
+        ]
+    else:
+        conditions = ["o.created_at IS NOT NULL"]
+    if statuses:
+        conditions.append("o.status IN $statuses")
+    where = "\n      AND ".join(conditions)
+    return f"""
+    MATCH (o:Order)
+    WHERE {where}
+    WITH o ORDER BY o.created_at DESC, o.uid DESC LIMIT $limit
+    OPTIONAL MATCH (o)-[:HAS_ITEM]->(i:OrderItem)
+    WITH o, collect(i) AS items
+    RETURN o, items
+    ORDER BY o.created_at DESC, o.uid DESC
+    """
+
+
+# {(cursor, statuses): query}
+ORDER_PAGE_QUERIES = {
+    (cursor, statuses): order_page_query(cursor, statuses)
+    for cursor in (False, True)
+    for statuses in (False, True)
+}
+
+
+def _page_query(after, limit, statuses):
+    after_created, after_uid = after if after else (None, None)
+    query = ORDER_PAGE_QUERIES[(after is not None, statuses is not None)]
+    return query, {
+        "statuses": statuses,
+        "after_created": after_created,
+        "after_uid": after_uid,
+        "limit": limit,
+    }
+
+
+def order_page_key(order):
+    """Chave de ordenação usada pelo cursor: (created_at em epoch, uid)."""
+    return (order.created_at.timestamp(), order.uid)
+
+
+def fetch_order_page(after=None, limit=50, statuses=None):
+    """
+    Retorna até `limit` pedidos após a chave `after` (ver `order_page_key`),
+    cada um com `_prefetched_items` preenchido.
+    """
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        return _snapshot_order_page(snapshot, after, limit, statuses)
+
+    rows, _ = db.cypher_query(*_page_query(after, limit, statuses))
+    return _inflate_page(rows)
+
+
+async def afetch_order_page(after=None, limit=50, statuses=None):
+    """Versão assíncrona de fetch_order_page (AsyncDriver; sem modo snapshot)."""
+    query, params = _page_query(after, limit, statuses)
+    records = await afetch(query, **params)
+    return _inflate_page(record.values() for record in records)
+
+
+def _inflate_page(rows):
+    orders = []
+    for order_node, item_nodes in rows:
+        order = Order.inflate(order_node)
+        order._prefetched_items = [OrderItem.inflate(node) for node in item_nodes]
+        orders.append(order)
+    return orders
+
+
+def fetch_order(uid):
+    """Pedido `uid` (com os itens já carregados no modo snapshot), ou None."""
+    snapshot = get_snapshot()
+    if snapshot is None:
+        return Order.nodes.get_or_none(uid=uid)
+    node = snapshot.find("Order", "uid", uid)
+    return _snapshot_order(snapshot, node) if node is not None else None
+
+
+def _snapshot_order(snapshot, node):
+    order = Order.inflate(node)
+    order._prefetched_items = [
+        OrderItem.inflate(item) for item in snapshot.related(node, "HAS_ITEM", "out", "OrderItem")
+    ]
+    return order
+
+
+def _order_keys(snapshot):
+    """Ordinais dos pedidos e suas chaves (created_at, uid), em ordem crescente."""
+    keyed = sorted(
+        ((snapshot.value(o, "created_at") or 0.0, snapshot.value(o, "uid") or ""), o)
+        for o in snapshot.tables["Order"].ordinals
+    ) if "Order" in snapshot.tables else []
+    return [key for key, _ in keyed], [o for _, o in keyed]
+
+
+def _snapshot_order_page(snapshot, after, limit, statuses):
+    keys, ordinals = snapshot.derived("orders:by_created", _order_keys)
+    end = keyset_after(keys, tuple(after) if after else None, descending=True)
+
+    orders = []
+    for position in range(end - 1, -1, -1):
+        ordinal = ordinals[position]
+        if statuses is not None and snapshot.value(ordinal, "status") not in statuses:
+            continue
+        orders.append(_snapshot_order(snapshot, snapshot.node(ordinal)))
+        if len(orders) >= limit:
+            break
+    return orders
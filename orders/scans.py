@@ -0,0 +1,249 @@
+# orders/scans.py
+"""
+Eventos de leitura dos coletores (pick e putaway) aplicados em lote.
+
+Um lote inteiro é gravado em uma transação, com um UNWIND por tipo de
+evento. Cada evento é aplicado numa subconsulta própria, então eventos do
+mesmo lote que tocam o mesmo item ou produto enxergam as escritas dos
+anteriores. As coletas usam a mesma lógica condicional de orders/picking.py.
+
+Idempotência: cada evento vira um nó ScanEvent (event_id único) criado com
+MERGE antes de ser aplicado. Um evento já visto não é reaplicado; a resposta
+traz o resultado gravado da primeira vez, então reenviar um lote inteiro
+após uma falha de rede é seguro. Com a constraint única em
+ScanEvent.event_id o MERGE trava a chave, e dois envios simultâneos do mesmo
+evento também só o aplicam uma vez.
+
+Os putaways do lote são aplicados antes das coletas.
+"""
+from datetime import datetime, timezone
+from itertools import islice
+
+from core.neo4j_driver import session as neo4j_session
+from core.signals import notify_bin_levels, notify_graph_change
+from warehouse.counters import rollup_clause
+from .picking import NOW, pick_clause
+
+EVENT_TYPES = ("pick", "putaway")
+
+# Grava o ScanEvent; `fresh` é falso se o evento já tinha sido recebido
+_MERGE_EVENT = f"""
+    MERGE (e:ScanEvent {{event_id: ev.event_id}})
+    ON CREATE SET e += ev.props, e.outcome = 'new', e.received_at = {NOW}
+    WITH ev, e, e.outcome = 'new' AS fresh
+"""
+
+_RECORD_OUTCOME = """
+    SET e.outcome = CASE WHEN fresh THEN coalesce(refusal, 'applied') ELSE e.outcome END
+"""
+
+PICK_SCANS_QUERY = f"""
+    UNWIND $events AS ev
+    CALL {{
+        WITH ev
+        {_MERGE_EVENT}
+        OPTIONAL MATCH (o:Order {{uid: ev.order_uid}})-[:HAS_ITEM]->(x:OrderItem {{product_sku: ev.sku}})
+        WITH ev, e, fresh, o, x
+        ORDER BY coalesce(x.picked_quantity, 0) >= x.quantity, x.uid
+        WITH ev, e, fresh, head(collect({{o: o, i: x}})) AS line
+        WITH ev, e, fresh, line.o AS o, line.i AS i, ev.quantity AS qty, ev.bin_code AS bin_code
+        {pick_clause("ev", "e", "fresh", checks=[("NOT fresh", "duplicate"), ("i IS NULL", "unknown_item")])}
+        {_RECORD_OUTCOME}
+        RETURN fresh, e.outcome AS outcome, o.status AS order_status,
+               i.picked_quantity AS picked, b.code AS code, b.capacity AS capacity, b.occupied AS occupied
+    }}
+    RETURN ev.event_id, fresh, outcome, order_status, picked, code, capacity, occupied
+"""
+
+# Entrada de mercadoria no bin. Com `reserved` o espaço já foi reservado pelo
+# POST /api/warehouses/putaway/, então a ocupação do bin não muda de novo.
+PUTAWAY_SCANS_QUERY = f"""
+    UNWIND $events AS ev
+    CALL {{
+        WITH ev
+        {_MERGE_EVENT}
+        OPTIONAL MATCH (p:Product {{sku: ev.sku}})
+        SET p.quantity = coalesce(p.quantity, 0)
+        WITH ev, e, fresh, p
+        OPTIONAL MATCH (b:Bin {{code: ev.bin_code}})
+        SET b.occupied = coalesce(b.occupied, 0.0)
+        WITH ev, e, fresh, p, b,
+             CASE
+                 WHEN NOT fresh THEN 'duplicate'
+                 WHEN p IS NULL THEN 'unknown_product'
+                 WHEN b IS NULL THEN 'unknown_bin'
+                 WHEN NOT ev.reserved AND coalesce(b.capacity, 0.0) - b.occupied < ev.quantity
+                     THEN 'insufficient_capacity'
+             END AS refusal
+        CALL {{
+            WITH ev, p, b, refusal
+            WITH ev, p, b WHERE refusal IS NULL
+            SET p.quantity = p.quantity + ev.quantity
+            MERGE (p)-[:STORED_IN]->(b)
+            WITH b, 0.0 AS d_capacity,
+                 CASE WHEN ev.reserved THEN 0.0 ELSE toFloat(ev.quantity) END AS d_occupied
+            SET b.occupied = b.occupied + d_occupied
+            {rollup_clause()}
+        }}
+        {_RECORD_OUTCOME}
+        RETURN fresh, e.outcome AS outcome, b.code AS code, b.capacity AS capacity, b.occupied AS occupied
+    }}
+    RETURN ev.event_id, fresh, outcome, null, null, code, capacity, occupied
+"""
+
+
+def _timestamp(value):
+    """Horário do coletor: epoch (s) ou ISO 8601. Retorna epoch (float) ou None se inválido."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if parsed.tzinfo is None:
+            # Sem fuso: o coletor envia UTC
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    return None
+
+
+def validate_event(raw):
+    """
+    Valida um evento {eventId, type, orderId, sku, binCode, qty, scannedAt,
+    deviceId, reserved}. Retorna (evento normalizado, None) ou (None, erros).
+    """
+    if not isinstance(raw, dict):
+        return None, ["evento deve ser um objeto JSON"]
+
+    errors = []
+    event_id = raw.get("eventId")
+    if not isinstance(event_id, str) or not event_id.strip():
+        errors.append("eventId obrigatório")
+
+    kind = raw.get("type", "pick")
+    if kind not in EVENT_TYPES:
+        errors.append(f"type inválido: use {' ou '.join(EVENT_TYPES)}")
+
+    order_uid = raw.get("orderId")
+    if kind == "pick" and (not isinstance(order_uid, str) or not order_uid.strip()):
+        errors.append("orderId obrigatório para pick")
+
+    sku = raw.get("sku")
+    if not isinstance(sku, str) or not sku.strip():
+        errors.append("sku obrigatório")
+
+    bin_code = raw.get("binCode")
+    if bin_code is not None and not isinstance(bin_code, str):
+        errors.append("binCode deve ser texto")
+    elif kind == "putaway" and not bin_code:
+        errors.append("binCode obrigatório para putaway")
+
+    qty = raw.get("qty", raw.get("quantity"))
+    if isinstance(qty, bool) or not isinstance(qty, int) or qty < 1:
+        errors.append("qty deve ser inteiro >= 1")
+
+    reserved = raw.get("reserved", False)
+    if not isinstance(reserved, bool):
+        errors.append("reserved deve ser booleano (true/false)")
+
+    scanned_at = None
+    if raw.get("scannedAt") is not None:
+        scanned_at = _timestamp(raw["scannedAt"])
+        if scanned_at is None:
+            errors.append("scannedAt deve ser ISO 8601 ou epoch em segundos")
+
+    if errors:
+        return None, errors
+
+    event_id = event_id.strip()
+    props = {
+        "event_id": event_id,
+        "type": kind,
+        "order_uid": order_uid.strip() if kind == "pick" else None,
+        "sku": sku.strip(),
+        "bin_code": bin_code or None,
+        "quantity": qty,
+        "scanned_at": scanned_at,
+        "device_id": str(raw["deviceId"]) if raw.get("deviceId") is not None else None,
+    }
+    return {
+        **props,
+        "reserved": reserved,
+        "props": {key: value for key, value in props.items() if value is not None},
+    }, None
+
+
+def _apply(picks, putaways):
+    def work(tx):
+        rows = []
+        if putaways:
+            rows.extend(record.values() for record in tx.run(PUTAWAY_SCANS_QUERY, events=putaways))
+        if picks:
+            rows.extend(record.values() for record in tx.run(PICK_SCANS_QUERY, events=picks))
+        return rows
+
+    with neo4j_session() as session:
+        return session.execute_write(work)
+
+
+def apply_scans(records, max_events):
+    """
+    Valida e aplica até `max_events` eventos (qualquer iterável, inclusive um
+    gerador NDJSON) em uma transação. Retorna um resultado por evento, na
+    ordem de entrada: {"index", "eventId", "status", ...}, com status
+    "applied", "refused" (com "reason"), "duplicate" (com o "outcome" da
+    primeira vez) ou "error" (com "errors"). Levanta ValueError se houver
+    mais de `max_events` eventos.
+    """
+    records = list(islice(iter(records), max_events + 1))
+    if len(records) > max_events:
+        raise ValueError(f"Máximo de {max_events} eventos por requisição.")
+
+    results = []
+    pending = {}
+    batches = {"pick": [], "putaway": []}
+    for index, raw in enumerate(records):
+        event, errors = validate_event(raw)
+        event_id = event["event_id"] if event else (raw.get("eventId") if isinstance(raw, dict) else None)
+        result = {"index": index, "eventId": event_id}
+        results.append(result)
+
+        if errors:
+            result.update(status="error", errors=errors)
+        elif event_id in pending:
+            # Mesmo evento repetido no lote (reenvio do coletor): aplicado uma vez só
+            result.update(status="duplicate", outcome=None)
+            pending[event_id].append(result)
+        else:
+            pending[event_id] = [result]
+            batches[event["type"]].append(event)
+
+    if not pending:
+        return results
+
+    bins = {}
+    applied = 0
+    for event_id, fresh, outcome, order_status, picked, code, capacity, occupied in _apply(
+        batches["pick"], batches["putaway"],
+    ):
+        first, *repeats = pending[event_id]
+        if not fresh:
+            first.update(status="duplicate", outcome=outcome)
+        elif outcome == "applied":
+            applied += 1
+            first["status"] = "applied"
+            if code is not None:
+                bins[code] = (code, capacity, occupied)
+        else:
+            first.update(status="refused", reason=outcome)
+        if order_status is not None:
+            first.update(orderStatus=order_status, pickedQuantity=picked)
+        for result in repeats:
+            result["outcome"] = outcome
+
+    if applied:
+        if bins:
+            notify_bin_levels(list(bins.values()))
+        notify_graph_change("orders", "products", "bins")
+    return results
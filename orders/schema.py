@@ -0,0 +1,52 @@
+# orders/schema.py
+"""Índices e constraints de pedidos, itens e leituras de coletor (ver core/schema.py)."""
+from core.schema import HotQuery, Index, Unique
+from .bulk import EXISTING_NUMBERS_QUERY
+from .picking import PICK_QUERY, RELEASE_QUERY, RESERVE_QUERY, SET_STATUS_QUERY
+from .queries import ORDER_PAGE_QUERIES
+from .scans import PICK_SCANS_QUERY, PUTAWAY_SCANS_QUERY
+
+CONSTRAINTS = [
+    Unique("Order", "uid"),
+    Unique("Order", "order_number"),
+    Unique("OrderItem", "uid"),
+    # Também serializa envios simultâneos do mesmo evento (MERGE em orders/scans.py)
+    Unique("ScanEvent", "event_id"),
+]
+
+INDEXES = [
+    Index("Order", "status"),
+    Index("Order", "created_at"),
+    Index("Order", "wave_id"),
+    Index("OrderItem", "product_sku"),
+]
+
+_EVENT = {
+    "event_id": "e-1", "order_uid": "o-1", "sku": "SKU-1", "bin_code": None,
+    "quantity": 1, "reserved": False, "props": {"event_id": "e-1"},
+}
+
+_PAGE = {"limit": 51, "statuses": None, "after_created": None, "after_uid": None}
+
+HOT_QUERIES = [
+    # Listagem: uma variante por caso (cursor, filtro de status), ver orders/queries.py
+    *(
+        HotQuery(
+            "order_page" + ("_after" if cursor else "") + ("_status" if statuses else ""),
+            query,
+            {
+                **_PAGE,
+                **({"after_created": 1.7e9, "after_uid": "o-1"} if cursor else {}),
+                **({"statuses": ["pending"]} if statuses else {}),
+            },
+        )
+        for (cursor, statuses), query in ORDER_PAGE_QUERIES.items()
+    ),
+    HotQuery("existing_order_numbers", EXISTING_NUMBERS_QUERY, {"numbers": ["PED-1"]}),
+    HotQuery("pick", PICK_QUERY, {"order_uid": "o-1", "item_uid": "i-1", "quantity": 1, "bin_code": None}),
+    HotQuery("reserve_order", RESERVE_QUERY, {"order_uid": "o-1"}),
+    HotQuery("release_order", RELEASE_QUERY, {"order_uid": "o-1"}),
+    HotQuery("set_order_status", SET_STATUS_QUERY, {"order_uid": "o-1", "status": "cancelled"}),
+    HotQuery("pick_scans", PICK_SCANS_QUERY, {"events": [_EVENT]}),
+    HotQuery("putaway_scans", PUTAWAY_SCANS_QUERY, {"events": [{**_EVENT, "bin_code": "A-01-01-A"}]}),
+]
@@ -1,6 +1,15 @@
 from rest_framework import serializers
 from .models import Order, OrderItem
-from datetime import datetime
+from .picking import set_order_status
+
+
+class OrderItemListSerializer(serializers.ListSerializer):
+    def get_attribute(self, instance):
+        # Itens já carregados junto com o pedido (ver orders/queries.py)
+        prefetched = getattr(instance, "_prefetched_items", None)
+        if prefetched is not None:
+            return prefetched
+        return super().get_attribute(instance)
 
 
 class OrderItemSerializer(serializers.Serializer):
@@ -10,12 +19,17 @@ class OrderItemSerializer(serializers.Serializer):
     picked_quantity = serializers.IntegerField(read_only=True)
     bin_code = serializers.CharField(read_only=True, allow_null=True)
 
+    class Meta:
+        list_serializer_class = OrderItemListSerializer
+
 class OrderSerializer(serializers.Serializer):
     id = serializers.CharField(source="uid", read_only=True)
     externalId = serializers.CharField(source="order_number", required=False, allow_blank=True)
-    status = serializers.CharField(read_only=True)
+    status = serializers.ChoiceField(choices=list(Order.status.choices), required=False)
     createdAt = serializers.DateTimeField(source="created_at", read_only=True)
     completedAt = serializers.DateTimeField(source="completed_at", read_only=True, allow_null=True)
+    waveId = serializers.CharField(source="wave_id", read_only=True, allow_null=True)
+    batchNumber = serializers.IntegerField(source="batch_number", read_only=True, allow_null=True)
 
     items = OrderItemSerializer(many=True, required=False)
 
@@ -65,9 +79,15 @@ class OrderSerializer(serializers.Serializer):
 
     def update(self, instance, validated_data):
         if "status" in validated_data:
-            instance.status = validated_data["status"]
-            if instance.status == "completed":
-                instance.completed_at = datetime.utcnow()
-
-        instance.save()
+            # Status, completed_at e a liberação da reserva (ao concluir ou
+            # cancelar) mudam num único statement (orders/picking.py)
+            set_order_status(instance.uid, validated_data["status"])
+            instance.refresh()
         return instance
+
+
+class PickSerializer(serializers.Serializer):
+    """Confirmação de coleta: POST /api/orders/<id>/pick/"""
+    itemId = serializers.CharField()
+    quantity = serializers.IntegerField(min_value=1)
+    binCode = serializers.CharField(required=False, allow_null=True, default=None)
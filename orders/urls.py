@@ -1,7 +1,13 @@
 from django.urls import path
-from .views import OrderListCreateView, OrderDetailView
+from core.async_views import with_async_get
+from core.conditional import versioned_get
+from .views import OrderListCreateView, OrderBulkCreateView, OrderDetailView, OrderScanView, OrderPickView, OrderReserveView, aorder_list
 
 urlpatterns = [
-    path('', OrderListCreateView.as_view(), name='order-list'),
+    path('', versioned_get(with_async_get(OrderListCreateView.as_view(), aorder_list), ("orders",)), name='order-list'),
+    path('bulk/', OrderBulkCreateView.as_view(), name='order-bulk-create'),
+    path('scans/', OrderScanView.as_view(), name='order-scans'),
     path('<str:pk>/', OrderDetailView.as_view(), name='order-detail'),
+    path('<str:pk>/pick/', OrderPickView.as_view(), name='order-pick'),
+    path('<str:pk>/reserve/', OrderReserveView.as_view(), name='order-reserve'),
 ]
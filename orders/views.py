@@ -1,32 +1,181 @@
+from collections.abc import Iterator
+
+from django.conf import settings
 from rest_framework import status, generics, permissions
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
-from django.http import Http404
+from rest_framework.views import APIView
+from django.http import Http404, JsonResponse
+from rest_framework.request import Request
+from core.signals import notify_graph_change
+from .bulk import ingest_orders
 from .models import Order
-from .serializers import OrderSerializer
+from .pagination import KeysetPagination
+from .parsers import NDJSONParser
+from .picking import PickRefused, confirm_pick, release_order, reserve_order
+from .queries import afetch_order_page, fetch_order, fetch_order_page, order_page_key
+from .scans import apply_scans
+from .serializers import OrderSerializer, PickSerializer
+
+
+def parse_statuses(query_params):
+    """Filtro opcional: ?status=pending,picking (ou ?status= repetido)."""
+    values = []
+    for raw in query_params.getlist("status"):
+        values.extend(v.strip() for v in raw.split(",") if v.strip())
+    if not values:
+        return None
+
+    invalid = [v for v in values if v not in Order.status.choices]
+    if invalid:
+        raise ValidationError({"status": f"Status inválido: {', '.join(invalid)}"})
+    return values
 
 
 class OrderListCreateView(generics.ListCreateAPIView):
     serializer_class = OrderSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         return Order.nodes.all()
 
+    def get_statuses(self):
+        return parse_statuses(self.request.query_params)
+
     def list(self, request, *args, **kwargs):
-        orders = self.get_queryset()
+        statuses = self.get_statuses()
+        orders = self.paginator.paginate(
+            lambda after, limit: fetch_order_page(after, limit, statuses),
+            request,
+            key=order_page_key,
+        )
         serializer = self.serializer_class(orders, many=True)
-        return Response(serializer.data)
+        return self.paginator.get_paginated_response(serializer.data)
 
     def create(self, request, *args, **kwargs):
         serializer = OrderSerializer(data=request.data)
         if serializer.is_valid():
             order = serializer.save()
+            notify_graph_change("orders")
             return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
 
         print("Serializer errors on create:", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+async def aorder_list(request):
+    """GET de OrderListCreateView para ASGI (ver core/async_views.py)."""
+    request = Request(request)
+    statuses = parse_statuses(request.query_params)
+    paginator = KeysetPagination()
+    orders = await paginator.apaginate(
+        lambda after, limit: afetch_order_page(after, limit, statuses),
+        request,
+        key=order_page_key,
+    )
+    return JsonResponse({
+        "next": paginator.get_next_link(),
+        "results": OrderSerializer(orders, many=True).data,
+    })
+
+
+BATCH_BODY_ERROR = "O corpo deve ser um objeto JSON, um array de objetos ou NDJSON."
+
+
+def _batch_records(data):
+    """Registros de um POST em lote (objeto, array ou gerador NDJSON); None se o corpo for escalar."""
+    if isinstance(data, dict):
+        return [data]
+    if isinstance(data, (list, Iterator)):
+        return data
+    return None
+
+
+class OrderBulkCreateView(APIView):
+    """
+    POST /api/orders/bulk/ -> cria vários pedidos de uma vez.
+
+    Aceita um array JSON ou um stream NDJSON (Content-Type: application/x-ndjson)
+    de pedidos no mesmo formato do POST unitário (externalId, items[sku, qty]).
+    Os pedidos são gravados em transações de ORDERS_BULK_BATCH_SIZE com UNWIND
+    e a resposta traz o resultado de cada registro, na ordem de entrada: 200
+    se ao menos um pedido foi criado, 400 se nenhum.
+    """
+    permission_classes = [permissions.AllowAny]
+    parser_classes = [JSONParser, NDJSONParser]
+
+    def post(self, request, *args, **kwargs):
+        records = _batch_records(request.data)
+        if records is None:
+            return Response({"error": BATCH_BODY_ERROR}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = []
+        parse_error = None
+        try:
+            for result in ingest_orders(records, batch_size=settings.ORDERS_BULK_BATCH_SIZE):
+                results.append(result)
+        except ParseError as exc:
+            # Linha NDJSON inválida no meio do stream: os lotes anteriores já
+            # foram gravados, então os resultados deles ainda são devolvidos.
+            parse_error = str(exc.detail)
+
+        created = sum(1 for r in results if r["status"] == "created")
+        if created:
+            notify_graph_change("orders")
+
+        payload = {
+            "created": created,
+            "failed": len(results) - created,
+            "results": results,
+        }
+        if parse_error:
+            payload["error"] = parse_error
+            return Response(payload, status=status.HTTP_400_BAD_REQUEST)
+        if not created:
+            # Nada gravado (lote vazio ou todos os registros com erro)
+            payload["error"] = "Nenhum pedido foi criado."
+            return Response(payload, status=status.HTTP_400_BAD_REQUEST)
+        return Response(payload, status=status.HTTP_200_OK)
+
+
+class OrderScanView(APIView):
+    """
+    POST /api/orders/scans/ -> aplica um lote de leituras dos coletores.
+
+    Aceita um array JSON ou NDJSON de eventos {eventId, type (pick|putaway),
+    orderId, sku, binCode, qty, scannedAt, deviceId}. O lote é gravado em uma
+    transação (orders/scans.py) e a resposta traz o resultado de cada evento,
+    na ordem de entrada. Reenviar eventos já recebidos não os reaplica.
+    """
+    permission_classes = [permissions.AllowAny]
+    parser_classes = [JSONParser, NDJSONParser]
+
+    def post(self, request, *args, **kwargs):
+        records = _batch_records(request.data)
+        if records is None:
+            return Response({"error": BATCH_BODY_ERROR}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            results = apply_scans(records, max_events=settings.ORDERS_SCAN_MAX_EVENTS)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        except ParseError as exc:
+            return Response({"error": str(exc.detail)}, status=status.HTTP_400_BAD_REQUEST)
+
+        counts = {}
+        for result in results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        return Response({
+            "applied": counts.get("applied", 0),
+            "refused": counts.get("refused", 0),
+            "duplicates": counts.get("duplicate", 0),
+            "errors": counts.get("error", 0),
+            "results": results,
+        }, status=status.HTTP_200_OK)
+
+
 class OrderDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = OrderSerializer
     permission_classes = [permissions.AllowAny]
@@ -38,7 +187,9 @@ class OrderDetailView(generics.RetrieveUpdateDestroyAPIView):
         return obj
 
     def retrieve(self, request, *args, **kwargs):
-        order = self.get_object()
+        order = fetch_order(self.kwargs.get("pk"))
+        if order is None:
+            raise Http404("Pedido não encontrado.")
         return Response(OrderSerializer(order).data)
 
     def update(self, request, *args, **kwargs):
@@ -46,6 +197,7 @@ class OrderDetailView(generics.RetrieveUpdateDestroyAPIView):
         serializer = OrderSerializer(order, data=request.data, partial=True)
         if serializer.is_valid():
             updated = serializer.save()
+            notify_graph_change("orders")
             return Response(OrderSerializer(updated).data)
 
         print("Serializer errors on update:", serializer.errors)
@@ -53,5 +205,55 @@ class OrderDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def destroy(self, request, *args, **kwargs):
         order = self.get_object()
+        release_order(order.uid)
         order.delete()
+        notify_graph_change("orders")
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class OrderPickView(APIView):
+    """
+    POST /api/orders/<id>/pick/ -> confirma a coleta de `quantity` unidades de
+    um item (itemId), opcionalmente de outro bin (binCode). Estoque, ocupação
+    do bin, quantidade coletada e status do pedido mudam num único statement
+    (orders/picking.py); se não houver saldo a coleta é recusada com 409.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request, pk):
+        serializer = PickSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        try:
+            result = confirm_pick(pk, data["itemId"], data["quantity"], data["binCode"])
+        except PickRefused as exc:
+            return Response({"error": exc.reason, **exc.detail}, status=status.HTTP_409_CONFLICT)
+        if result is None:
+            raise Http404("Pedido ou item não encontrado.")
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class OrderReserveView(APIView):
+    """
+    POST /api/orders/<id>/reserve/ -> reserva o estoque das linhas pendentes
+    (tudo ou nada; 409 com os SKUs sem saldo).
+    DELETE /api/orders/<id>/reserve/ -> libera a reserva.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request, pk):
+        try:
+            result = reserve_order(pk)
+        except PickRefused as exc:
+            return Response({"error": exc.reason, **exc.detail}, status=status.HTTP_409_CONFLICT)
+        if result is None:
+            raise Http404("Pedido não encontrado.")
+        return Response(result, status=status.HTTP_200_OK)
+
+    def delete(self, request, pk):
+        result = release_order(pk)
+        if result is None:
+            raise Http404("Pedido não encontrado.")
+        return Response(result, status=status.HTTP_200_OK)
@@ -0,0 +1,31 @@
+# products/schema.py
+"""Índices das consultas da API de produtos (ver core/schema.py)."""
+from core.schema import HotQuery, Index
+from .views import (
+    PRODUCT_DETAIL_QUERY, PRODUCT_EXPORT_QUERIES, PRODUCT_PAGE_AFTER_QUERY, PRODUCT_PAGE_QUERY, UNNAMED_PAGE_QUERY,
+)
+
+INDEXES = [
+    # A API de produtos identifica o produto por `id`, não pelo `uid` do neomodel
+    Index("Product", "id"),
+    # Ordem da listagem paginada (products/views.py)
+    Index("Product", "name", "id"),
+]
+
+# Produtos gravados pelo neomodel antes de Product.api_id só têm `uid`; sem
+# `id` ficariam fora do índice composto e, portanto, da listagem
+BACKFILLS = [
+    """
+    MATCH (p:Product) WHERE p.id IS NULL
+    CALL { WITH p SET p.id = coalesce(p.uid, randomUUID()) } IN TRANSACTIONS OF 10000 ROWS
+    """,
+]
+
+HOT_QUERIES = [
+    HotQuery("product_detail", PRODUCT_DETAIL_QUERY, {"id": "p-1"}),
+    HotQuery("product_page", PRODUCT_PAGE_QUERY, {"limit": 51}),
+    HotQuery("product_page_after", PRODUCT_PAGE_AFTER_QUERY, {"after_name": "Mouse", "after_key": "p-1", "limit": 51}),
+    HotQuery("product_page_unnamed", UNNAMED_PAGE_QUERY, {"after_key": "", "limit": 51}),
+    HotQuery("product_export", PRODUCT_EXPORT_QUERIES[0]),
+    HotQuery("product_export_unnamed", PRODUCT_EXPORT_QUERIES[1]),
+]
@@ -1,8 +1,10 @@
 # products/urls.py
 from django.urls import path
-from .views import ProductListCreateView, ProductDetailView
+from core.async_views import with_async_get
+from core.conditional import versioned_get
+from .views import ProductListCreateView, ProductDetailView, aproduct_detail, aproduct_list
 
 urlpatterns = [
-    path('', ProductListCreateView.as_view(), name='product-list-create'),
-    path('<str:product_id>/', ProductDetailView.as_view(), name='product-detail'),
+    path('', versioned_get(with_async_get(ProductListCreateView.as_view(), aproduct_list), ("products",)), name='product-list-create'),
+    path('<str:product_id>/', with_async_get(ProductDetailView.as_view(), aproduct_detail), name='product-detail'),
 ]
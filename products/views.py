@@ -1,29 +1,226 @@
 #products/views
-from django.http import JsonResponse
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 import json
-from neo4j import GraphDatabase
+from core.async_views import streaming_content
+from core.cursors import decode_cursor, encode_cursor
+from core.neo4j_driver import afetch, session as neo4j_session
+from core.signals import notify_graph_change
+from core.snapshot import get_snapshot, keyset_after
 
-# Configure sua conexão com Neo4j
-URI = "bolt://localhost:7687"
-AUTH = ("neo4j", "wms_password_123")  # substitua pela sua senha
-driver = GraphDatabase.driver(URI, auth=AUTH)
+# Listagem ordenada por (nome, id) com paginação keyset: cada página continua
+# a partir da chave do último produto, sem SKIP. As consultas usam as
+# propriedades cruas, então o índice Product(name, id) entrega os produtos já
+# na ordem e o LIMIT encerra a leitura. Produtos sem nome vêm depois de todos
+# os nomeados, por id (cursor com nome null). Todo produto tem `id`: a API o
+# grava na criação e o modelo Product (neomodel) no save; nós antigos, sem id,
+# são preenchidos pelo backfill de products/schema.py.
+#
+# Sem hint de índice: um USING INDEX falha se o índice não existir (banco
+# criado antes de install_schema); os planos são conferidos por
+# `install_schema --check` (products/schema.py).
+PRODUCT_PAGE_QUERY = """
+    MATCH (p:Product)
+    WHERE p.name IS NOT NULL AND p.id IS NOT NULL
+    RETURN p, p.name AS name, p.id AS key
+    ORDER BY p.name ASC, p.id ASC
+    LIMIT $limit
+"""
+
+PRODUCT_PAGE_AFTER_QUERY = """
+    MATCH (p:Product)
+    WHERE p.name >= $after_name AND p.id IS NOT NULL
+      AND (p.name > $after_name OR p.id > $after_key)
+    RETURN p, p.name AS name, p.id AS key
+    ORDER BY p.name ASC, p.id ASC
+    LIMIT $limit
+"""
+
+UNNAMED_PAGE_QUERY = """
+    MATCH (p:Product)
+    WHERE p.id > $after_key AND p.name IS NULL
+    RETURN p, null AS name, p.id AS key
+    ORDER BY p.id ASC
+    LIMIT $limit
+"""
+
+PRODUCT_EXPORT_QUERIES = (
+    """
+    MATCH (p:Product)
+    WHERE p.name IS NOT NULL AND p.id IS NOT NULL
+    RETURN p
+    ORDER BY p.name ASC, p.id ASC
+    """,
+    """
+    MATCH (p:Product)
+    WHERE p.id IS NOT NULL AND p.name IS NULL
+    RETURN p
+    ORDER BY p.id ASC
+    """,
+)
+
+PRODUCT_DETAIL_QUERY = "MATCH (p:Product {id: $id}) RETURN p"
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# Cursor inválido responde 404, como em orders/pagination.py (e no CursorPagination do DRF)
+INVALID_CURSOR = "Cursor inválido."
+
+
+def _page_size(request):
+    try:
+        size = int(request.GET.get("page_size", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def _sort_key(name, key):
+    # Mesma ordem das consultas: nomeados por (nome, id), depois os sem nome por id
+    return (0, name, key) if name is not None else (1, "", key)
+
+
+def _product_keys(snapshot):
+    """Ordinais dos produtos (com id) e suas chaves de ordenação, na ordem da listagem."""
+    table = snapshot.tables.get("Product")
+    keyed = sorted(
+        (_sort_key(snapshot.value(o, "name"), snapshot.value(o, "id")), o)
+        for o in (table.ordinals if table else ())
+        if snapshot.value(o, "id") is not None
+    )
+    return [key for key, _ in keyed], [o for _, o in keyed]
+
+
+def _snapshot_product_page(snapshot, after, limit):
+    keys, ordinals = snapshot.derived("products:by_name", _product_keys)
+    start = keyset_after(keys, _sort_key(*after) if after else None)
+    return [
+        (dict(snapshot.node(ordinals[i])), None if keys[i][0] else keys[i][1], keys[i][2])
+        for i in range(start, min(start + limit, len(keys)))
+    ]
+
+
+def _stream_snapshot_products(snapshot):
+    encoder = DjangoJSONEncoder()
+    _, ordinals = snapshot.derived("products:by_name", _product_keys)
+    chunk_size = settings.PRODUCTS_STREAM_FETCH_SIZE
+    yield "["
+    for begin in range(0, len(ordinals), chunk_size):
+        chunk = ",".join(encoder.encode(dict(snapshot.node(o))) for o in ordinals[begin:begin + chunk_size])
+        yield ("," if begin else "") + chunk
+    yield "]"
+
+
+def _stream_products():
+    """
+    Gera o catálogo inteiro como um array JSON, em pedaços. Os registros são
+    puxados do driver sob demanda (fetch_size limitado), então a memória fica
+    constante independente do tamanho do catálogo.
+    """
+    encoder = DjangoJSONEncoder()
+    chunk_size = settings.PRODUCTS_STREAM_FETCH_SIZE
+    with neo4j_session(fetch_size=chunk_size) as session:
+        yield "["
+        buffer = []
+        first = True
+        for query in PRODUCT_EXPORT_QUERIES:
+            for record in session.run(query):
+                buffer.append(encoder.encode(dict(record["p"])))
+                if len(buffer) >= chunk_size:
+                    yield ("" if first else ",") + ",".join(buffer)
+                    first = False
+                    buffer = []
+        if buffer:
+            yield ("" if first else ",") + ",".join(buffer)
+        yield "]"
+
+
+def _page_params(request):
+    """(chave do cursor ou None, tamanho da página). Levanta ValueError se o cursor for inválido."""
+    after = decode_cursor(request.GET["cursor"], 2) if request.GET.get("cursor") else None
+    return after, _page_size(request)
+
+
+def _page_plan(after):
+    """Consultas (texto, parâmetros) a executar em ordem até completar a página."""
+    if after is None:
+        return [(PRODUCT_PAGE_QUERY, {}), (UNNAMED_PAGE_QUERY, {"after_key": ""})]
+    after_name, after_key = after
+    if after_name is None:
+        return [(UNNAMED_PAGE_QUERY, {"after_key": after_key})]
+    return [
+        (PRODUCT_PAGE_AFTER_QUERY, {"after_name": after_name, "after_key": after_key}),
+        (UNNAMED_PAGE_QUERY, {"after_key": ""}),
+    ]
+
+
+def _fetch_page(after, limit):
+    rows = []
+    with neo4j_session() as session:
+        for query, params in _page_plan(after):
+            result = session.run(query, limit=limit - len(rows), **params)
+            rows.extend((dict(record["p"]), record["name"], record["key"]) for record in result)
+            if len(rows) >= limit:
+                break
+    return rows
+
+
+async def _afetch_page(after, limit):
+    rows = []
+    for query, params in _page_plan(after):
+        records = await afetch(query, limit=limit - len(rows), **params)
+        rows.extend((dict(record["p"]), record["name"], record["key"]) for record in records)
+        if len(rows) >= limit:
+            break
+    return rows
+
+
+def _page_response(request, rows, page_size):
+    """Resposta paginada a partir de até page_size + 1 linhas (produto, nome, chave)."""
+    next_url = None
+    if len(rows) > page_size:
+        _, name, key = rows[page_size - 1]
+        params = request.GET.copy()
+        params["cursor"] = encode_cursor((name, key))
+        next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+
+    return JsonResponse({
+        "next": next_url,
+        "results": [product for product, _, _ in rows[:page_size]],
+    })
 
 
 @method_decorator(csrf_exempt, name='dispatch')
 class ProductListCreateView(View):
     """
-    GET  -> Lista todos os produtos
+    GET  -> Lista os produtos, paginados por cursor (?cursor=, ?page_size=)
+            ou o catálogo inteiro em streaming (?stream=1)
     POST -> Cria um novo produto
     """
 
     def get(self, request):
-        with driver.session() as session:
-            result = session.run("MATCH (p:Product) RETURN p ORDER BY p.name ASC")
-            products = [dict(record["p"]) for record in result]
-        return JsonResponse(products, safe=False)
+        snapshot = get_snapshot()
+        if request.GET.get("stream") in ("1", "true"):
+            stream = _stream_snapshot_products(snapshot) if snapshot is not None else _stream_products()
+            response = StreamingHttpResponse(streaming_content(stream), content_type="application/json")
+            response["Content-Disposition"] = 'attachment; filename="produtos.json"'
+            return response
+
+        try:
+            after, page_size = _page_params(request)
+        except ValueError:
+            return JsonResponse({"error": INVALID_CURSOR}, status=404)
+
+        if snapshot is not None:
+            rows = _snapshot_product_page(snapshot, after, page_size + 1)
+        else:
+            rows = _fetch_page(after, page_size + 1)
+
+        return _page_response(request, rows, page_size)
 
     def post(self, request):
         try:
@@ -33,7 +230,7 @@ class ProductListCreateView(View):
             price = data.get('price', 0)
             stock = data.get('current_stock', 0)
 
-            with driver.session() as session:
+            with neo4j_session() as session:
                 session.run(
                     """
                     CREATE (p:Product {
@@ -49,12 +246,29 @@ class ProductListCreateView(View):
                     price=price,
                     stock=stock,
                 )
+            notify_graph_change("products")
 
             return JsonResponse({"message": "Produto criado com sucesso"}, status=201)
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=400)
 
 
+async def aproduct_list(request):
+    """GET de ProductListCreateView para ASGI (ver core/async_views.py)."""
+    if request.GET.get("stream") in ("1", "true"):
+        # O streaming continua no driver síncrono; streaming_content puxa um
+        # pedaço por vez numa thread, sem juntar o catálogo na memória
+        return ProductListCreateView().get(request)
+
+    try:
+        after, page_size = _page_params(request)
+    except ValueError:
+        return JsonResponse({"error": INVALID_CURSOR}, status=404)
+
+    rows = await _afetch_page(after, page_size + 1)
+    return _page_response(request, rows, page_size)
+
+
 @method_decorator(csrf_exempt, name='dispatch')
 class ProductDetailView(View):
     """
@@ -64,10 +278,15 @@ class ProductDetailView(View):
     """
 
     def get(self, request, product_id):
-        with driver.session() as session:
-            result = session.run(
-                "MATCH (p:Product {id: $id}) RETURN p", id=product_id
-            ).single()
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            product = snapshot.find("Product", "id", product_id)
+            if product is None:
+                return JsonResponse({"error": "Produto não encontrado"}, status=404)
+            return JsonResponse(dict(product))
+
+        with neo4j_session() as session:
+            result = session.run(PRODUCT_DETAIL_QUERY, id=product_id).single()
             if not result:
                 return JsonResponse({"error": "Produto não encontrado"}, status=404)
             return JsonResponse(dict(result["p"]))
@@ -75,7 +294,7 @@ class ProductDetailView(View):
     def put(self, request, product_id):
         try:
             data = json.loads(request.body.decode('utf-8'))
-            with driver.session() as session:
+            with neo4j_session() as session:
                 session.run(
                     """
                     MATCH (p:Product {id: $id})
@@ -90,11 +309,21 @@ class ProductDetailView(View):
                     price=data.get('price'),
                     stock=data.get('current_stock', 0),
                 )
+            notify_graph_change("products")
             return JsonResponse({"message": "Produto atualizado com sucesso"})
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=400)
 
     def delete(self, request, product_id):
-        with driver.session() as session:
+        with neo4j_session() as session:
             session.run("MATCH (p:Product {id: $id}) DETACH DELETE p", id=product_id)
+        notify_graph_change("products")
         return JsonResponse({"message": "Produto deletado com sucesso"})
+
+
+async def aproduct_detail(request, product_id):
+    """GET de ProductDetailView para ASGI (ver core/async_views.py)."""
+    records = await afetch(PRODUCT_DETAIL_QUERY, id=product_id)
+    if not records:
+        return JsonResponse({"error": "Produto não encontrado"}, status=404)
+    return JsonResponse(dict(records[0]["p"]))
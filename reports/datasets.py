@@ -0,0 +1,236 @@
+# reports/datasets.py
+"""
+Relatórios tabulares (inventário, ocupação por bin e linhas de pedido).
+
+Cada relatório é uma única consulta Cypher sem ORDER BY, lida com
+`fetch_size` limitado: o driver busca as linhas em páginas à medida que o
+escritor (reports/streaming.py) as consome, então a memória não depende do
+número de linhas. Com o modo snapshot ativo as mesmas linhas são geradas a
+partir do grafo em memória.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.utils import timezone as dj_timezone
+
+from core.neo4j_driver import session as neo4j_session
+from core.snapshot import get_snapshot
+from warehouse.occupancy import occupancy_percent
+
+INVENTORY_QUERY = """
+    MATCH (p:Product)
+    OPTIONAL MATCH (p)-[:STORED_IN]->(b:Bin)
+    OPTIONAL MATCH (b)-[:CONTAINS]->(:Shelf)-[:CONTAINS]->(a:Aisle)
+    OPTIONAL MATCH (a)<-[:CONTAINS]-(z:Zone)<-[:CONTAINS]-(w:Warehouse)
+    RETURN coalesce(p.sku, p.id, p.uid), p.name,
+           coalesce(p.quantity, p.current_stock, 0), p.unit,
+           w.name, z.name, a.code, b.code
+"""
+
+OCCUPANCY_QUERY = """
+    MATCH (b:Bin)
+    OPTIONAL MATCH (b)-[:CONTAINS]->(s:Shelf)-[:CONTAINS]->(a:Aisle)
+    OPTIONAL MATCH (a)<-[:CONTAINS]-(z:Zone)<-[:CONTAINS]-(w:Warehouse)
+    RETURN w.name, z.name, z.zone_type, a.code, s.code, b.code,
+           coalesce(b.capacity, 0.0), coalesce(b.occupied, 0.0),
+           COUNT { (:Product)-[:STORED_IN]->(b) }
+"""
+
+ORDER_LINES_QUERY = """
+    MATCH (o:Order)
+    OPTIONAL MATCH (o)-[:HAS_ITEM]->(i:OrderItem)
+    RETURN o.order_number, o.status, o.created_at, o.completed_at, o.wave_id,
+           i.product_sku, i.quantity, coalesce(i.picked_quantity, 0), i.bin_code
+"""
+
+
+def _iso(timestamp):
+    """DateTimeProperty é gravado como epoch (float); o relatório mostra ISO 8601 em UTC."""
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+def _occupancy_row(row):
+    *location, capacity, occupied, skus = row
+    return (*location, capacity, occupied, max(capacity - occupied, 0.0),
+            occupancy_percent(occupied, capacity), skus)
+
+
+def _order_row(row):
+    number, status, created_at, completed_at, *rest = row
+    return (number, status, _iso(created_at), _iso(completed_at), *rest)
+
+
+# ----------------------------------------------------------
+# Modo snapshot
+# ----------------------------------------------------------
+
+def _first(snapshot, ordinal, rel_type, direction, label):
+    found = snapshot.neighbors(ordinal, rel_type, direction, label)
+    return found[0] if found else None
+
+
+class _Locations:
+    """Localização (galpão, zona, tipo, corredor, prateleira) de cada bin, memorizada por prateleira."""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.shelves = {}
+
+    def __call__(self, bin_ordinal):
+        snapshot = self.snapshot
+        shelf = _first(snapshot, bin_ordinal, "CONTAINS", "out", "Shelf")
+        if shelf is None:
+            return (None,) * 5
+        location = self.shelves.get(shelf)
+        if location is None:
+            aisle = _first(snapshot, shelf, "CONTAINS", "out", "Aisle")
+            zone = _first(snapshot, aisle, "CONTAINS", "in", "Zone") if aisle is not None else None
+            warehouse = _first(snapshot, zone, "CONTAINS", "in", "Warehouse") if zone is not None else None
+            value = lambda ordinal, key: snapshot.value(ordinal, key) if ordinal is not None else None
+            location = self.shelves[shelf] = (
+                value(warehouse, "name"), value(zone, "name"), value(zone, "zone_type"),
+                value(aisle, "code"), value(shelf, "code"),
+            )
+        return location
+
+
+def _snapshot_inventory(snapshot):
+    locations = _Locations(snapshot)
+    table = snapshot.tables.get("Product")
+    for ordinal in table.ordinals if table else ():
+        value = lambda key: snapshot.value(ordinal, key)
+        quantity = value("quantity")
+        bins = snapshot.neighbors(ordinal, "STORED_IN", "out", "Bin") or [None]
+        for bin_ordinal in bins:
+            warehouse = zone = aisle = code = None
+            if bin_ordinal is not None:
+                warehouse, zone, _, aisle, _ = locations(bin_ordinal)
+                code = snapshot.value(bin_ordinal, "code")
+            yield (
+                value("sku") or value("id") or value("uid"), value("name"),
+                quantity if quantity is not None else (value("current_stock") or 0), value("unit"),
+                warehouse, zone, aisle, code,
+            )
+
+
+def _snapshot_occupancy(snapshot):
+    locations = _Locations(snapshot)
+    table = snapshot.tables.get("Bin")
+    for ordinal in table.ordinals if table else ():
+        yield (
+            *locations(ordinal), snapshot.value(ordinal, "code"),
+            snapshot.value(ordinal, "capacity") or 0.0, snapshot.value(ordinal, "occupied") or 0.0,
+            len(snapshot.neighbors(ordinal, "STORED_IN", "in", "Product")),
+        )
+
+
+def _snapshot_order_lines(snapshot):
+    table = snapshot.tables.get("Order")
+    for ordinal in table.ordinals if table else ():
+        order = tuple(snapshot.value(ordinal, key) for key in (
+            "order_number", "status", "created_at", "completed_at", "wave_id",
+        ))
+        items = snapshot.neighbors(ordinal, "HAS_ITEM", "out", "OrderItem") or [None]
+        for item in items:
+            if item is None:
+                yield (*order, None, None, 0, None)
+                continue
+            yield (
+                *order, snapshot.value(item, "product_sku"), snapshot.value(item, "quantity"),
+                snapshot.value(item, "picked_quantity") or 0, snapshot.value(item, "bin_code"),
+            )
+
+
+def _summary_rows():
+    from dashboard.stats import get_stats
+
+    stats = get_stats()
+    yield (
+        stats["totalWarehouses"], stats["totalProducts"], stats["totalOrders"],
+        stats["pendingOrders"], stats["averageOccupancy"], stats["criticalStock"],
+        dj_timezone.now().isoformat(),
+    )
+
+
+@dataclass(frozen=True)
+class Report:
+    name: str
+    title: str
+    columns: tuple
+    query: Optional[str] = None
+    convert: Optional[Callable] = None
+    snapshot_rows: Optional[Callable] = None
+    # Relatórios pequenos, montados em Python (sem consulta própria)
+    build: Optional[Callable] = None
+    # Tipos de entidade lidos (core.data_version), para a chave do cache de jobs
+    kinds: tuple = ("warehouses", "products", "bins", "layout")
+    formats: tuple = ("csv", "xlsx")
+
+    def rows(self):
+        """Gera as linhas do relatório como tuplas, na ordem de `columns`."""
+        if self.build is not None:
+            yield from self.build()
+            return
+
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            rows = self.snapshot_rows(snapshot)
+            yield from map(self.convert, rows) if self.convert else rows
+            return
+
+        with neo4j_session(fetch_size=settings.REPORTS_FETCH_SIZE) as session:
+            for record in session.run(self.query):
+                row = tuple(record.values())
+                yield self.convert(row) if self.convert else row
+
+
+REPORTS = {
+    report.name: report
+    for report in (
+        Report(
+            name="inventory",
+            title="Inventário",
+            columns=("SKU", "Produto", "Quantidade", "Unidade", "Galpão", "Zona", "Corredor", "Bin"),
+            query=INVENTORY_QUERY,
+            snapshot_rows=_snapshot_inventory,
+        ),
+        Report(
+            name="occupancy",
+            title="Ocupação",
+            columns=(
+                "Galpão", "Zona", "Tipo de zona", "Corredor", "Prateleira", "Bin",
+                "Capacidade", "Ocupado", "Livre", "Ocupação (%)", "SKUs",
+            ),
+            query=OCCUPANCY_QUERY,
+            convert=_occupancy_row,
+            snapshot_rows=_snapshot_occupancy,
+        ),
+        Report(
+            name="orders",
+            title="Pedidos",
+            columns=(
+                "Pedido", "Status", "Criado em", "Concluído em", "Onda",
+                "SKU", "Quantidade", "Coletado", "Bin",
+            ),
+            query=ORDER_LINES_QUERY,
+            convert=_order_row,
+            snapshot_rows=_snapshot_order_lines,
+            kinds=("orders",),
+        ),
+        Report(
+            name="summary",
+            title="Resumo",
+            columns=(
+                "Galpões", "Produtos", "Pedidos", "Pedidos pendentes",
+                "Ocupação média (%)", "Estoque crítico", "Gerado em",
+            ),
+            build=_summary_rows,
+            kinds=("warehouses", "orders", "products", "bins"),
+            formats=("csv", "xlsx", "pdf"),
+        ),
+    )
+}
@@ -0,0 +1,326 @@
+# reports/jobs.py
+"""
+Jobs de relatório: a renderização roda num pool de processos local, fora do
+worker web, e o arquivo gerado fica em disco num cache endereçado por
+conteúdo.
+
+A chave do arquivo é o hash de (relatório, formato, parâmetros, versão dos
+dados lidos), com a versão vinda de core.data_version. Pedidos idênticos
+enquanto os dados não mudam reaproveitam o arquivo pronto, e um pedido feito
+enquanto o mesmo arquivo está sendo gerado recebe o job já em andamento.
+
+Layout em settings.REPORT_JOBS_DIR:
+    jobs/<id>.json         estado do job (legível por qualquer worker)
+    artifacts/<chave>.<fmt> arquivo gerado (gravado via tmp + rename)
+    locks/<chave>          id do job que está gerando a chave
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.data_version import data_version
+from .datasets import REPORTS
+from .rendering import write_report
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+}
+
+# Parte fixa da chave: mude ao alterar o formato dos arquivos gerados
+ARTIFACT_SCHEMA = 1
+PRUNE_INTERVAL = 600
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+_pool = None
+_pool_pid = None
+_lock = threading.Lock()
+_last_prune = 0.0
+
+
+# ----------------------------------------------------------
+# Caminhos e estado em disco
+# ----------------------------------------------------------
+
+def _path(*parts):
+    return os.path.join(settings.REPORT_JOBS_DIR, *parts)
+
+
+def _job_path(job_id):
+    return _path("jobs", f"{job_id}.json")
+
+
+def artifact_path(job):
+    return _path("artifacts", f"{job['key']}.{job['format']}")
+
+
+def _lock_path(key):
+    return _path("locks", key)
+
+
+def _ensure_dirs():
+    for name in ("jobs", "artifacts", "locks"):
+        os.makedirs(_path(name), exist_ok=True)
+
+
+def _write_json(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(data, fh)
+    os.replace(tmp, path)
+
+
+def _save(job):
+    _write_json(_job_path(job["id"]), job)
+
+
+def _load(job_id):
+    try:
+        with open(_job_path(job_id)) as fh:
+            return json.load(fh)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _age(path):
+    try:
+        return time.time() - os.path.getmtime(path)
+    except FileNotFoundError:
+        return None
+
+
+def _now():
+    return timezone.now().isoformat()
+
+
+def _release(key, job_id):
+    try:
+        with open(_lock_path(key)) as fh:
+            owner = fh.read().strip()
+        if owner == job_id:
+            os.remove(_lock_path(key))
+    except FileNotFoundError:
+        pass
+
+
+def _acquire(key, job_id):
+    """Marca `key` como em geração por `job_id`. Retorna o id do dono atual se já houver um."""
+    path = _lock_path(key)
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            age = _age(path)
+            if age is not None and age < settings.REPORT_JOBS_TIMEOUT:
+                with open(path) as fh:
+                    return fh.read().strip() or None
+            # Dono morto (worker reiniciado, timeout): o lock é descartado
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            continue
+        with os.fdopen(fd, "w") as fh:
+            fh.write(job_id)
+        return None
+    return None
+
+
+def _prune():
+    """Remove estados de job e arquivos mais antigos que REPORT_JOBS_RETENTION (no máximo a cada 10 min)."""
+    global _last_prune
+    now = time.time()
+    if now - _last_prune < PRUNE_INTERVAL:
+        return
+    _last_prune = now
+    for name in ("jobs", "artifacts"):
+        with os.scandir(_path(name)) as entries:
+            for entry in entries:
+                try:
+                    if now - entry.stat().st_mtime > settings.REPORT_JOBS_RETENTION:
+                        os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+# ----------------------------------------------------------
+# Pool de processos
+# ----------------------------------------------------------
+
+def _init_worker():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+
+    django.setup()
+
+
+def _get_pool():
+    """Pool deste processo (recriado após fork, como o driver do Neo4j)."""
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is not None and _pool_pid == pid:
+        return _pool
+    with _lock:
+        if _pool is None or _pool_pid != pid:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.REPORT_JOBS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            _pool_pid = pid
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def run_job(job_id):
+    """Executado no processo do pool: renderiza o relatório e grava o arquivo."""
+    job = _load(job_id)
+    if job is None:
+        return
+    job.update(status="running", startedAt=_now())
+    _save(job)
+
+    target = artifact_path(job)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        started = time.perf_counter()
+        with open(tmp, "wb") as fh:
+            rows = write_report(REPORTS[job["report"]], job["format"], fh)
+        os.replace(tmp, target)
+        job.update(
+            status="done", rows=rows, size=os.path.getsize(target),
+            seconds=round(time.perf_counter() - started, 3),
+        )
+    except Exception as exc:
+        job.update(status="failed", error=str(exc))
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+    finally:
+        job["finishedAt"] = _now()
+        _save(job)
+        _release(job["key"], job_id)
+
+
+def _on_done(job_id, key):
+    def callback(future):
+        # O processo do pool morreu (ou a tarefa foi cancelada) antes de gravar o estado
+        if future.cancelled() or future.exception() is not None:
+            job = _load(job_id)
+            if job is not None and job["status"] in ("queued", "running"):
+                error = "cancelado" if future.cancelled() else str(future.exception())
+                job.update(status="failed", error=error, finishedAt=_now())
+                _save(job)
+            _release(key, job_id)
+    return callback
+
+
+# ----------------------------------------------------------
+# API
+# ----------------------------------------------------------
+
+def artifact_key(name, fmt, params=None):
+    """Hash de (relatório, formato, parâmetros, versão dos dados lidos pelo relatório)."""
+    report = REPORTS[name]
+    payload = {
+        "schema": ARTIFACT_SCHEMA,
+        "report": name,
+        "format": fmt,
+        "params": params or {},
+        "version": data_version(report.kinds),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def submit(name, fmt, params=None):
+    """
+    Cria um job para o relatório `name` no formato `fmt`. Se o arquivo já
+    existe para a versão atual dos dados, o job nasce concluído
+    (`cached=True`); se outro job está gerando o mesmo arquivo, ele é
+    devolvido no lugar de um novo.
+    """
+    _ensure_dirs()
+    _prune()
+
+    key = artifact_key(name, fmt, params)
+    job = {
+        "id": uuid.uuid4().hex,
+        "report": name,
+        "format": fmt,
+        "params": params or {},
+        "key": key,
+        "status": "queued",
+        "cached": False,
+        "createdAt": _now(),
+    }
+
+    age = _age(artifact_path(job))
+    if age is not None and age < settings.REPORT_JOBS_CACHE_TTL:
+        job.update(
+            status="done", cached=True, finishedAt=job["createdAt"],
+            size=os.path.getsize(artifact_path(job)),
+        )
+        _save(job)
+        return job
+
+    owner = _acquire(key, job["id"])
+    if owner is not None:
+        running = get_job(owner)
+        if running is not None and running["status"] in ("queued", "running"):
+            return running
+        _release(key, owner)
+        if _acquire(key, job["id"]) is not None:
+            return get_job(owner) or job
+
+    _save(job)
+    try:
+        try:
+            future = _get_pool().submit(run_job, job["id"])
+        except BrokenProcessPool:
+            # Um processo do pool morreu (ex.: OOM): o pool é descartado e recriado
+            shutdown_pool()
+            future = _get_pool().submit(run_job, job["id"])
+    except Exception as exc:
+        job.update(status="failed", error=str(exc), finishedAt=_now())
+        _save(job)
+        _release(key, job["id"])
+        return job
+    future.add_done_callback(_on_done(job["id"], key))
+    return job
+
+
+def get_job(job_id):
+    """Estado do job, ou None se o id não existe (ou já foi removido)."""
+    if not _JOB_ID.match(job_id or ""):
+        return None
+    job = _load(job_id)
+    if job is None:
+        return None
+    if job["status"] in ("queued", "running"):
+        # Sem atualização há mais que o timeout: o processo que o executava se perdeu
+        age = _age(_job_path(job_id))
+        if age is not None and age > settings.REPORT_JOBS_TIMEOUT:
+            job.update(status="failed", error="timeout", finishedAt=_now())
+            _save(job)
+            _release(job["key"], job_id)
+    return job
@@ -0,0 +1,48 @@
+# reports/rendering.py
+"""Renderização de relatórios em arquivo (usada pelos jobs e pelas exportações síncronas)."""
+from .streaming import csv_chunks, xlsx_chunks
+
+
+def write_pdf(title, fields, fh):
+    """PDF simples com pares rótulo/valor (reportlab é importado só aqui, por ser pesado)."""
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.pagesizes import A4
+
+    doc = SimpleDocTemplate(fh, pagesize=A4)
+    styles = getSampleStyleSheet()
+
+    story = []
+    story.append(Paragraph(f"📊 {title}", styles["Title"]))
+    story.append(Spacer(1, 20))
+
+    for key, value in fields:
+        story.append(Paragraph(f"<b>{key}:</b> {value}", styles["Normal"]))
+        story.append(Spacer(1, 10))
+
+    doc.build(story)
+
+
+def write_report(report, fmt, fh):
+    """Grava `report` (reports.datasets.Report) no arquivo binário `fh`. Retorna o número de linhas."""
+    counted = [0]
+
+    def rows():
+        for row in report.rows():
+            counted[0] += 1
+            yield row
+
+    if fmt == "pdf":
+        # Só relatórios de uma linha (ex.: summary) têm formato PDF
+        for row in rows():
+            write_pdf(f"Relatório: {report.title}", zip(report.columns, row), fh)
+            break
+    elif fmt == "xlsx":
+        for chunk in xlsx_chunks(report.columns, rows(), sheet_title=report.title):
+            fh.write(chunk)
+    elif fmt == "csv":
+        for chunk in csv_chunks(report.columns, rows()):
+            fh.write(chunk.encode("utf-8"))
+    else:
+        raise ValueError(f"Formato desconhecido: {fmt}")
+    return counted[0]
@@ -0,0 +1,16 @@
+from rest_framework import serializers
+
+from .datasets import REPORTS
+
+
+class ReportJobSerializer(serializers.Serializer):
+    report = serializers.ChoiceField(choices=sorted(REPORTS))
+    format = serializers.ChoiceField(choices=["csv", "xlsx", "pdf"], default="xlsx")
+
+    def validate(self, data):
+        formats = REPORTS[data["report"]].formats
+        if data["format"] not in formats:
+            raise serializers.ValidationError(
+                {"format": f"O relatório {data['report']} aceita apenas: {', '.join(formats)}."}
+            )
+        return data
@@ -0,0 +1,184 @@
+# reports/streaming.py
+"""
+Escritores de planilha em streaming: recebem um iterável de linhas e geram
+pedaços (str para CSV, bytes para XLSX) à medida que as linhas chegam. Nada
+é montado inteiro em memória. A resposta começa a ser enviada com a primeira
+página de dados e a memória fica limitada ao tamanho de um pedaço.
+
+O XLSX é escrito diretamente como um pacote zip em modo stream (zipfile
+aceita destinos sem seek), com células inlineStr: não há shared strings
+nem arquivo temporário, ao contrário do write_only do openpyxl.
+"""
+import csv
+import io
+import math
+import re
+import zipfile
+from datetime import datetime
+from xml.sax.saxutils import escape, quoteattr
+
+# Linhas por pedaço gerado
+CHUNK_ROWS = 1000
+# Limite do formato (1.048.576 linhas por aba, incluindo o cabeçalho)
+XLSX_MAX_ROWS = 1_048_576
+
+_ILLEGAL_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '{sheets}</Types>'
+)
+_SHEET_CONTENT_TYPE = (
+    '<Override PartName="/xl/worksheets/sheet{n}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>{sheets}</sheets></workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '{sheets}</Relationships>'
+)
+_SHEET_REL = (
+    '<Relationship Id="rId{n}" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet{n}.xml"/>'
+)
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = "</sheetData></worksheet>"
+
+
+def _text(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def csv_chunks(headers, rows, chunk_rows=CHUNK_ROWS):
+    """CSV (UTF-8 com BOM, para o Excel reconhecer acentos) em pedaços de `chunk_rows` linhas."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("﻿")
+    writer.writerow(headers)
+    pending = 0
+    for row in rows:
+        writer.writerow(["" if value is None else _text(value) for value in row])
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+class _Sink(io.RawIOBase):
+    """Destino sem seek para o zipfile: acumula os bytes até serem drenados."""
+
+    def __init__(self):
+        self._parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _cell(value):
+    kind = type(value)
+    if kind is str:
+        text = value
+    elif value is None:
+        return "<c/>"
+    elif (kind is int or kind is float) and math.isfinite(value):
+        return f"<c><v>{value!r}</v></c>"
+    else:
+        text = _text(value)
+    text = escape(_ILLEGAL_XML.sub("", text))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _row(cells):
+    return "<row>" + "".join(map(_cell, cells)) + "</row>"
+
+
+def xlsx_chunks(headers, rows, sheet_title="Relatório", chunk_rows=CHUNK_ROWS, max_rows=XLSX_MAX_ROWS):
+    """
+    Planilha XLSX em pedaços de bytes. Passando de `max_rows` linhas, os dados
+    continuam em novas abas ("<título> 2", ...), cada uma com o cabeçalho.
+    """
+    sink = _Sink()
+    package = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=1, allowZip64=True)
+    header = _row(headers)
+
+    sheets = 0
+    sheet = None
+    sheet_rows = 0
+    pending = []
+    rows = iter(rows)
+    while True:
+        row = next(rows, None)
+        if sheet is not None and (row is None or sheet_rows >= max_rows):
+            pending.append(_SHEET_TAIL)
+            sheet.write("".join(pending).encode())
+            pending = []
+            sheet.close()
+            sheet = None
+        if row is None and sheets:
+            break
+        if sheet is None:
+            sheets += 1
+            sheet = package.open(f"xl/worksheets/sheet{sheets}.xml", mode="w", force_zip64=True)
+            pending.append(_SHEET_HEAD + header)
+            sheet_rows = 1
+        if row is None:
+            continue  # relatório vazio: fecha a aba só com o cabeçalho
+        pending.append(_row(row))
+        sheet_rows += 1
+        if len(pending) >= chunk_rows:
+            sheet.write("".join(pending).encode())
+            pending = []
+            data = sink.drain()
+            if data:
+                yield data
+
+    names = [sheet_title[:31] if n == 1 else f"{sheet_title[:27]} {n}" for n in range(1, sheets + 1)]
+    package.writestr("[Content_Types].xml", _CONTENT_TYPES.format(
+        sheets="".join(_SHEET_CONTENT_TYPE.format(n=n) for n in range(1, sheets + 1))
+    ))
+    package.writestr("_rels/.rels", _ROOT_RELS)
+    package.writestr("xl/workbook.xml", _WORKBOOK.format(sheets="".join(
+        f'<sheet name={quoteattr(name)} sheetId="{n}" r:id="rId{n}"/>'
+        for n, name in enumerate(names, start=1)
+    )))
+    package.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS.format(
+        sheets="".join(_SHEET_REL.format(n=n) for n in range(1, sheets + 1))
+    ))
+    package.close()
+    yield sink.drain()
@@ -1,8 +1,20 @@
 from django.urls import path
-from .views import DashboardStatsView, DashboardExportPDF, DashboardExportExcel
+from .views import (
+    DashboardStatsView,
+    DashboardExportPDF,
+    DashboardExportExcel,
+    ReportExportView,
+    ReportJobCreateView,
+    ReportJobDetailView,
+    ReportJobDownloadView,
+)
 
 urlpatterns = [
     path("stats/", DashboardStatsView.as_view(), name="dashboard-stats"),
     path("export/pdf/", DashboardExportPDF.as_view(), name="dashboard-export-pdf"),
     path("export/excel/", DashboardExportExcel.as_view(), name="dashboard-export-excel"),
+    path("export/<slug:name>.<slug:fmt>", ReportExportView.as_view(), name="report-export"),
+    path("jobs/", ReportJobCreateView.as_view(), name="report-job-create"),
+    path("jobs/<str:job_id>/", ReportJobDetailView.as_view(), name="report-job-detail"),
+    path("jobs/<str:job_id>/download/", ReportJobDownloadView.as_view(), name="report-job-download"),
 ]
@@ -1,21 +1,55 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.http import HttpResponse
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
 
 import io
-import pandas as pd
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.pagesizes import A4
+
+from core.async_views import streaming_content
+from dashboard.stats import get_stats
+from . import jobs
+from .datasets import REPORTS
+from .rendering import write_pdf
+from .serializers import ReportJobSerializer
+from .streaming import csv_chunks, xlsx_chunks
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", csv_chunks),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", xlsx_chunks),
+}
+
+
+def stream_report(name, fmt):
+    """
+    Resposta em streaming do relatório `name` (ver reports/datasets.py) em CSV
+    ou XLSX. O download começa com a primeira página lida do banco.
+    """
+    report = REPORTS.get(name)
+    if report is None or fmt not in EXPORT_FORMATS:
+        raise Http404("Relatório ou formato desconhecido.")
+
+    content_type, writer = EXPORT_FORMATS[fmt]
+    if fmt == "xlsx":
+        chunks = writer(report.columns, report.rows(), sheet_title=report.title)
+    else:
+        chunks = writer(report.columns, report.rows())
+
+    response = StreamingHttpResponse(streaming_content(chunks), content_type=content_type)
+    stamp = timezone.now().strftime("%Y%m%d-%H%M")
+    response["Content-Disposition"] = f'attachment; filename="{report.name}-{stamp}.{fmt}"'
+    # Proxies (nginx) não devem segurar a resposta inteira antes de repassá-la
+    response["X-Accel-Buffering"] = "no"
+    return response
 
 
 class DashboardStatsView(APIView):
     """
-    GET /api/dashboard/stats/  -> Estatísticas
-    GET /api/dashboard/export/pdf/ -> Exporta relatório em PDF
-    GET /api/dashboard/export/excel/ -> Exporta relatório em Excel
+    GET /api/reports/stats/  -> Estatísticas
+    GET /api/reports/export/pdf/ -> Exporta relatório em PDF
+    GET /api/reports/export/excel/ -> Exporta relatório em Excel
+    GET /api/reports/export/<relatório>.<csv|xlsx> -> Relatório completo em streaming
     """
 
     def get(self, request, *args, **kwargs):
@@ -23,11 +57,15 @@ class DashboardStatsView(APIView):
         return Response(stats, status=status.HTTP_200_OK)
 
     def get_stats(self):
-        # Exemplo — troque pelos dados do seu projeto
+        # Mesmos números do dashboard (dashboard/stats.py, com cache)
+        stats = get_stats()
         return {
-            "total_orders": 42,
-            "total_products": 150,
-            "active_warehouses": 3,
+            "total_orders": stats["totalOrders"],
+            "total_products": stats["totalProducts"],
+            "active_warehouses": stats["totalWarehouses"],
+            "pending_orders": stats["pendingOrders"],
+            "average_occupancy": stats["averageOccupancy"],
+            "critical_stock": stats["criticalStock"],
             "generated_at": timezone.now().isoformat(),
         }
 
@@ -42,18 +80,7 @@ class DashboardExportPDF(APIView):
         stats = DashboardStatsView().get_stats()
 
         buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4)
-        styles = getSampleStyleSheet()
-
-        story = []
-        story.append(Paragraph("📊 Relatório de Estatísticas", styles["Title"]))
-        story.append(Spacer(1, 20))
-
-        for key, value in stats.items():
-            story.append(Paragraph(f"<b>{key}:</b> {value}", styles["Normal"]))
-            story.append(Spacer(1, 10))
-
-        doc.build(story)
+        write_pdf("Relatório de Estatísticas", stats.items(), buffer)
 
         buffer.seek(0)
         response = HttpResponse(buffer, content_type='application/pdf')
@@ -63,23 +90,86 @@ class DashboardExportPDF(APIView):
 
 
 # ---------------------------
-# EXPORTAÇÃO EM EXCEL
+# EXPORTAÇÃO EM EXCEL / CSV
 # ---------------------------
 
 class DashboardExportExcel(APIView):
+    """GET ?report=inventory|occupancy|orders|summary (padrão: summary)"""
 
     def get(self, request):
-        stats = DashboardStatsView().get_stats()
+        return stream_report(request.query_params.get("report", "summary"), "xlsx")
 
-        df = pd.DataFrame([stats])  # 1 linha
 
-        output = io.BytesIO()
-        df.to_excel(output, index=False)
+class ReportExportView(APIView):
 
-        response = HttpResponse(
-            output.getvalue(),
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-        response["Content-Disposition"] = 'attachment; filename="relatorio.xlsx"'
+    def get(self, request, name, fmt):
+        return stream_report(name, fmt)
 
-        return response
+
+# ---------------------------
+# JOBS EM SEGUNDO PLANO
+# ---------------------------
+
+def _job_payload(request, job):
+    payload = {
+        key: job.get(key)
+        for key in ("id", "report", "format", "status", "cached", "createdAt",
+                    "startedAt", "finishedAt", "rows", "size", "error")
+    }
+    payload["downloadUrl"] = (
+        request.build_absolute_uri(reverse("report-job-download", args=[job["id"]]))
+        if job["status"] == "done" else None
+    )
+    return payload
+
+
+class ReportJobCreateView(APIView):
+    """
+    POST /api/reports/jobs/ {"report": "inventory", "format": "xlsx"}
+    Enfileira a geração no pool de processos (202) ou devolve o arquivo já
+    gerado para a versão atual dos dados (200, cached=true).
+    """
+
+    def post(self, request):
+        serializer = ReportJobSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        job = jobs.submit(data["report"], data["format"])
+        code = status.HTTP_200_OK if job["status"] == "done" else status.HTTP_202_ACCEPTED
+        return Response(_job_payload(request, job), status=code)
+
+
+class ReportJobDetailView(APIView):
+    """GET /api/reports/jobs/<id>/ -> status do job (queued, running, done, failed)"""
+
+    def get(self, request, job_id):
+        job = jobs.get_job(job_id)
+        if job is None:
+            return Response({"error": "Job não encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(_job_payload(request, job), status=status.HTTP_200_OK)
+
+
+class ReportJobDownloadView(APIView):
+    """GET /api/reports/jobs/<id>/download/ -> arquivo gerado"""
+
+    def get(self, request, job_id):
+        job = jobs.get_job(job_id)
+        if job is None:
+            return Response({"error": "Job não encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        if job["status"] != "done":
+            return Response(
+                {"error": f"Job ainda não concluído (status: {job['status']})"},
+                status=status.HTTP_409_CONFLICT,
+            )
+        try:
+            fh = open(jobs.artifact_path(job), "rb")
+        except FileNotFoundError:
+            return Response({"error": "Arquivo expirado; envie o job novamente"}, status=status.HTTP_410_GONE)
+
+        stamp = timezone.now().strftime("%Y%m%d-%H%M")
+        return FileResponse(
+            fh, as_attachment=True, filename=f"{job['report']}-{stamp}.{job['format']}",
+            content_type=jobs.CONTENT_TYPES[job["format"]],
+        )
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class RoutingConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "routing"
+
+    def ready(self):
+        from core.signals import graph_changed
+        from .layout import invalidate_layouts
+
+        graph_changed.connect(invalidate_layouts, dispatch_uid="routing-layout-invalidation")
@@ -0,0 +1,257 @@
+# routing/layout.py
+"""
+Grafo de layout dos galpões e matriz de distâncias para roteirização.
+
+Cada galpão vira um grafo ponderado (networkx) no modelo clássico de
+corredores paralelos: um corredor transversal na frente (onde fica a doca de
+saída, `depot`) e outro no fundo, ligados pelos corredores de armazenagem.
+Os pontos de parada são os "slots" (corredor × prateleira); as coordenadas
+saem do código do bin (Corredor-Prateleira-Nível-Posição, ex.: A-01-03-B).
+
+A distância entre slots é pré-calculada uma vez (linhas array('d')) e a
+distância entre dois bins é a dos seus slots mais o custo local de cada bin
+(nível e posição na prateleira). Os layouts ficam em cache no processo e só são
+reconstruídos quando a impressão digital lida do grafo (versão "layout" e
+contagens por label) muda.
+"""
+import logging
+import threading
+import time
+from array import array
+
+from django.conf import settings
+from neomodel import db
+
+logger = logging.getLogger(__name__)
+
+# Geometria padrão (metros)
+AISLE_PITCH = 3.0      # distância entre eixos de corredores vizinhos
+SHELF_WIDTH = 1.2      # largura de uma prateleira ao longo do corredor
+POSITION_WIDTH = 0.4   # deslocamento lateral entre posições de uma prateleira
+LEVEL_COST = 0.5       # custo equivalente de cada nível acima do primeiro
+
+LAYOUT_QUERY = """
+    MATCH (w:Warehouse)-[:CONTAINS]->(z:Zone)-[:CONTAINS]->(a:Aisle)
+    MATCH (a)<-[:CONTAINS]-(s:Shelf)<-[:CONTAINS]-(b:Bin)
+    RETURN w.uid, a.code, s.code, b.code
+"""
+
+# Versão "layout" do grafo (core/data_version.py, trocada por qualquer processo
+# que mude a estrutura, ex.: generate_warehouse) mais as contagens por label,
+# que vêm do count store e pegam cargas feitas sem aviso (scripts/popular*.py).
+# Barato o bastante para checar a cada ROUTING_LAYOUT_CHECK_INTERVAL.
+LAYOUT_FINGERPRINT_QUERY = """
+    CALL { OPTIONAL MATCH (v:DataVersion {kind: 'layout'}) RETURN v.token AS version }
+    CALL { MATCH (n:Zone) RETURN count(n) AS zones }
+    CALL { MATCH (n:Aisle) RETURN count(n) AS aisles }
+    CALL { MATCH (n:Shelf) RETURN count(n) AS shelves }
+    CALL { MATCH (n:Bin) RETURN count(n) AS bins }
+    RETURN version, zones, aisles, shelves, bins
+"""
+
+DEPOT = "depot"
+
+
+def _as_int(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def parse_bin_code(code, aisle_code=None, shelf_code=None):
+    """
+    Decompõe `A-01-03-B` em (corredor, prateleira, nível, posição). Partes
+    ausentes caem para os códigos do Aisle/Shelf da hierarquia, nível 1 e
+    posição 0.
+    """
+    parts = (code or "").split("-")
+    aisle = parts[0] if len(parts) > 0 and parts[0] else aisle_code
+    shelf = _as_int(parts[1], None) if len(parts) > 1 else None
+    if shelf is None:
+        shelf = _as_int(shelf_code, 0)
+    level = _as_int(parts[2], 1) if len(parts) > 2 else 1
+    position = 0
+    if len(parts) > 3 and parts[3]:
+        token = parts[3]
+        position = _as_int(token, None)
+        if position is None:
+            position = ord(token[0].upper()) - ord("A")
+    return aisle or "", shelf, level, position
+
+
+class Layout:
+    """Layout de um galpão: slots, matriz de distâncias e índice de bins."""
+
+    def __init__(self, warehouse_uid, bins):
+        """`bins`: iterável de (aisle_code, shelf_code, bin_code)."""
+        import networkx as nx
+
+        self.warehouse_uid = warehouse_uid
+        parsed = [(code, *parse_bin_code(code, aisle, shelf)) for aisle, shelf, code in bins]
+
+        aisles = sorted({aisle for _, aisle, _, _, _ in parsed})
+        shelves = sorted({shelf for _, _, shelf, _, _ in parsed})
+        aisle_x = {aisle: (i + 1) * AISLE_PITCH for i, aisle in enumerate(aisles)}
+        shelf_y = {shelf: (j + 1) * SHELF_WIDTH for j, shelf in enumerate(shelves)}
+        back_y = (len(shelves) + 1) * SHELF_WIDTH
+
+        graph = nx.Graph()
+        previous = None
+        for aisle in aisles:
+            x = aisle_x[aisle]
+            front, back = ("front", aisle), ("back", aisle)
+            if previous is None:
+                graph.add_edge(DEPOT, front, weight=x)
+            else:
+                gap = x - aisle_x[previous]
+                graph.add_edge(("front", previous), front, weight=gap)
+                graph.add_edge(("back", previous), back, weight=gap)
+            previous = aisle
+
+            last, last_y = front, 0.0
+            for shelf in shelves:
+                node = ("slot", aisle, shelf)
+                graph.add_edge(last, node, weight=shelf_y[shelf] - last_y)
+                last, last_y = node, shelf_y[shelf]
+            graph.add_edge(last, back, weight=back_y - last_y)
+
+        self.graph = graph
+        self.slots = [DEPOT] + [("slot", a, s) for a in aisles for s in shelves]
+        self.slot_index = {slot: i for i, slot in enumerate(self.slots)}
+        self.size = len(self.slots)
+
+        # Posição de cada slot num percurso em serpentina (sobe um corredor,
+        # desce o seguinte): slots próximos no percurso são próximos no galpão.
+        self.sweep = array("d", [0.0] * self.size)
+        for a_rank, aisle in enumerate(aisles):
+            ordered = shelves if a_rank % 2 == 0 else shelves[::-1]
+            for s_rank, shelf in enumerate(ordered):
+                self.sweep[self.slot_index[("slot", aisle, shelf)]] = a_rank * len(shelves) + s_rank + 1
+
+        # bin_code -> (índice do slot, custo local do bin)
+        self.bins = {
+            code: (
+                self.slot_index[("slot", aisle, shelf)],
+                (level - 1) * LEVEL_COST + position * POSITION_WIDTH,
+            )
+            for code, aisle, shelf, level, position in parsed
+        }
+
+        # Linhas da matriz de distâncias entre slots: {i: array('d') de tamanho n}
+        self._rows = {}
+        if self.size <= settings.ROUTING_MATRIX_MAX_SLOTS:
+            for i in range(self.size):
+                self._fill_row(i)
+
+    def _fill_row(self, i):
+        """Dijkstra a partir do slot `i`."""
+        import networkx as nx
+
+        lengths = nx.single_source_dijkstra_path_length(self.graph, self.slots[i], weight="weight")
+        row = array("d", (lengths.get(slot, float("inf")) for slot in self.slots))
+        self._rows[i] = row
+        return row
+
+    def slot_distance(self, i, j):
+        row = self._rows.get(i)
+        if row is not None:
+            return row[j]
+        row = self._rows.get(j)
+        if row is not None:
+            return row[i]
+        # Layouts acima de ROUTING_MATRIX_MAX_SLOTS calculam as linhas sob
+        # demanda, uma vez cada.
+        return self._fill_row(i)[j]
+
+    def __contains__(self, bin_code):
+        return bin_code in self.bins
+
+    def distance(self, bin_a, bin_b):
+        """Distância de caminhada entre dois bins (None = doca)."""
+        if bin_a == bin_b:
+            return 0.0
+        slot_a, cost_a = self.bins[bin_a] if bin_a is not None else (0, 0.0)
+        slot_b, cost_b = self.bins[bin_b] if bin_b is not None else (0, 0.0)
+        return self.slot_distance(slot_a, slot_b) + cost_a + cost_b
+
+    def distance_matrix(self, bin_codes):
+        """Matriz (lista de listas) entre a doca (índice 0) e `bin_codes` (1..n)."""
+        stops = [None] + list(bin_codes)
+        return [[self.distance(a, b) for b in stops] for a in stops]
+
+
+# --------------------------------------------------------------
+# Cache em processo
+# --------------------------------------------------------------
+
+_lock = threading.Lock()
+# (layouts {warehouse_uid: Layout}, índice {bin_code: warehouse_uid}, fingerprint);
+# substituído por inteiro a cada reconstrução, então leitores nunca veem meio estado.
+_state = None
+_checked_at = 0.0
+
+
+def _fingerprint():
+    rows, _ = db.cypher_query(LAYOUT_FINGERPRINT_QUERY)
+    return tuple(rows[0]) if rows else None
+
+
+def _build(fingerprint):
+    start = time.perf_counter()
+    rows, _ = db.cypher_query(LAYOUT_QUERY)
+    grouped = {}
+    for warehouse_uid, aisle_code, shelf_code, bin_code in rows:
+        grouped.setdefault(warehouse_uid, []).append((aisle_code, shelf_code, bin_code))
+
+    layouts = {uid: Layout(uid, bins) for uid, bins in grouped.items()}
+    bin_index = {code: uid for uid, layout in layouts.items() for code in layout.bins}
+    logger.info(
+        "Layout de roteirização reconstruído: %d galpões, %d bins em %.0f ms",
+        len(layouts), len(bin_index), (time.perf_counter() - start) * 1000,
+    )
+    return layouts, bin_index, fingerprint
+
+
+def _current_state():
+    global _state, _checked_at
+    state = _state
+    interval = settings.ROUTING_LAYOUT_CHECK_INTERVAL
+    if state is not None and time.monotonic() - _checked_at < interval:
+        return state
+
+    with _lock:
+        if _state is not None and time.monotonic() - _checked_at < interval:
+            return _state
+        fingerprint = _fingerprint()
+        if _state is None or fingerprint != _state[2]:
+            _state = _build(fingerprint)
+        _checked_at = time.monotonic()
+        return _state
+
+
+def get_layouts():
+    """Todos os layouts em cache, {warehouse_uid: Layout}."""
+    return _current_state()[0]
+
+
+def get_layout(warehouse_uid):
+    return get_layouts().get(warehouse_uid)
+
+
+def locate(bin_code):
+    """Retorna o Layout que contém `bin_code`, ou None."""
+    layouts, bin_index, _ = _current_state()
+    warehouse_uid = bin_index.get(bin_code)
+    return layouts.get(warehouse_uid) if warehouse_uid else None
+
+
+def invalidate_layouts(sender=None, kinds=(), **kwargs):
+    """
+    Receiver de core.signals.graph_changed: força a reconstrução se o layout
+    mudou neste processo (os demais percebem pela impressão digital).
+    """
+    global _state
+    if "layout" in kinds:
+        with _lock:
+            _state = None
@@ -0,0 +1,75 @@
+# routing/planner.py
+from neomodel import db
+
+from .layout import locate
+from .tsp import solve_route
+
+# Itens do pedido e, para os que ainda não têm bin_code, os bins onde o SKU
+# está armazenado (Product -[:STORED_IN]-> Bin).
+ORDER_LINES_QUERY = """
+    MATCH (o:Order {uid: $uid})
+    OPTIONAL MATCH (o)-[:HAS_ITEM]->(i:OrderItem)
+    OPTIONAL MATCH (p:Product {sku: i.product_sku})-[:STORED_IN]->(b:Bin)
+    WITH o, i, collect(DISTINCT b.code) AS candidates
+    RETURN o.uid, i.product_sku, i.quantity, i.bin_code, candidates
+"""
+
+
+def choose_bin(bin_code, candidates):
+    """
+    Bin de coleta de uma linha: o bin_code gravado no item, se conhecido no
+    layout; senão o candidato mais próximo da doca.
+    """
+    if bin_code and locate(bin_code) is not None:
+        return bin_code
+    located = [(code, locate(code)) for code in candidates if code]
+    located = [(code, layout) for code, layout in located if layout is not None]
+    if not located:
+        return None
+    code, _ = min(located, key=lambda item: item[1].distance(None, item[0]))
+    return code
+
+
+def build_routes(lines):
+    """
+    `lines`: iterável de (sku, quantity, bin_code). Agrupa as paradas por
+    galpão e sequencia cada grupo. Retorna (rotas, skus sem localização).
+    """
+    stops_by_layout = {}
+    unlocated = []
+    for sku, quantity, bin_code in lines:
+        layout = locate(bin_code) if bin_code else None
+        if layout is None:
+            unlocated.append(sku)
+            continue
+        stops = stops_by_layout.setdefault(layout.warehouse_uid, (layout, {}))[1]
+        stops.setdefault(bin_code, []).append({"sku": sku, "quantity": quantity})
+
+    routes = []
+    for warehouse_uid, (layout, stops) in stops_by_layout.items():
+        codes = list(stops)
+        order, total = solve_route(layout.distance_matrix(codes))
+        routes.append({
+            "warehouseId": warehouse_uid,
+            "distance": round(total, 2),
+            "stops": [
+                {"sequence": seq, "binCode": codes[i - 1], "items": stops[codes[i - 1]]}
+                for seq, i in enumerate(order, start=1)
+            ],
+        })
+    return routes, unlocated
+
+
+def plan_order_route(order_uid):
+    """Rota de coleta de um pedido, ou None se o pedido não existir."""
+    rows, _ = db.cypher_query(ORDER_LINES_QUERY, {"uid": order_uid})
+    if not rows:
+        return None
+
+    lines = [
+        (sku, quantity, choose_bin(bin_code, candidates))
+        for _, sku, quantity, bin_code, candidates in rows
+        if sku is not None
+    ]
+    routes, unlocated = build_routes(lines)
+    return {"orderId": order_uid, "routes": routes, "unlocated": unlocated}
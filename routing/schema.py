@@ -0,0 +1,17 @@
+# routing/schema.py
+"""Consultas de roteirização, ondas e slotting que devem usar índice (ver core/schema.py)."""
+from core.schema import HotQuery
+from .planner import ORDER_LINES_QUERY
+from .slotting import MOVE_PRODUCTS_QUERY, PICK_VELOCITY_QUERY
+from .waves import PENDING_LINES_QUERY, START_WAVE_QUERY
+
+HOT_QUERIES = [
+    HotQuery("order_lines", ORDER_LINES_QUERY, {"uid": "o-1"}),
+    HotQuery("pending_lines", PENDING_LINES_QUERY, {"limit": 500}),
+    HotQuery("start_wave", START_WAVE_QUERY, {"assignments": [{"uid": "o-1", "batch": 1}], "wave_id": "w-1"}),
+    HotQuery("pick_velocity", PICK_VELOCITY_QUERY, {"since": 0.0}),
+    HotQuery(
+        "move_products", MOVE_PRODUCTS_QUERY,
+        {"moves": [{"sku": "SKU-1", "from_bin": "A-01-01-A", "to_bin": "A-01-01-B"}]},
+    ),
+]
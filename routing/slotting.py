@@ -0,0 +1,261 @@
+# routing/slotting.py
+"""
+Slotting por giro: reposiciona os SKUs de maior frequência de coleta nos bins
+mais baratos de alcançar a partir da doca.
+
+Roda em lote (comando `slotting`), pensado para ~100k SKUs e ~1M linhas de
+pedido:
+
+1. Exporta do Neo4j, de uma vez e já agregado por SKU, o número de coletas
+   (linhas de OrderItem) e de unidades numa janela de dias; exporta também as
+   localizações atuais (Product -[:STORED_IN]-> Bin) e os bins.
+2. Classifica os SKUs em A/B/C pela participação acumulada nas coletas.
+3. Custo de cada bin = ida e volta da doca pelo mesmo modelo de distâncias da
+   roteirização (routing/layout.py). Em cada galpão, os SKUs ordenados por
+   coletas recebem os bins ordenados por custo.
+4. Estima o deslocamento antes/depois como Σ coletas × custo do bin.
+
+Todo o cálculo depois da exportação é vetorizado (pandas/NumPy), importados
+só aqui para não pesarem no boot dos workers.
+"""
+import logging
+import time
+
+from neomodel import db
+
+from core.neo4j_driver import session as neo4j_session
+from core.signals import notify_bin_levels, notify_graph_change
+from warehouse.counters import rollup_clause
+
+from .layout import get_layouts
+
+logger = logging.getLogger(__name__)
+
+# Coletas por SKU na janela. Pedidos cancelados não contam.
+PICK_VELOCITY_QUERY = """
+    MATCH (o:Order)-[:HAS_ITEM]->(i:OrderItem)
+    WHERE o.created_at >= $since AND o.status <> 'cancelled'
+    RETURN i.product_sku AS sku, count(*) AS picks, sum(coalesce(i.quantity, 0)) AS units
+"""
+
+# `locations`: em quantos bins o SKU está. Só SKUs num único bin são
+# realocados, pois aí Product.quantity é o estoque daquele bin.
+LOCATIONS_QUERY = """
+    MATCH (p:Product)-[:STORED_IN]->(b:Bin)
+    WITH p, collect(b.code) AS bins
+    UNWIND bins AS bin
+    RETURN p.sku AS sku, coalesce(p.quantity, 0) AS quantity, bin, size(bins) AS locations
+"""
+
+BINS_QUERY = """
+    MATCH (b:Bin)
+    RETURN b.code AS bin, coalesce(b.capacity, 0.0) AS capacity, coalesce(b.occupied, 0.0) AS occupied,
+           EXISTS { (b)<-[:STORED_IN]-(:Product) } AS used
+"""
+
+# Move o produto, corrige o bin_code das linhas ainda pendentes e transfere a
+# ocupação entre os bins (com os contadores dos ancestrais), tudo por linha:
+# um movimento cujo produto já não está em `from_bin` não casa e não altera
+# nada. A ocupação transferida é o estoque do produto, limitado ao que o bin
+# de origem registra.
+MOVE_PRODUCTS_QUERY = f"""
+    UNWIND $moves AS row
+    MATCH (p:Product {{sku: row.sku}})-[r:STORED_IN]->(source:Bin {{code: row.from_bin}})
+    MATCH (target:Bin {{code: row.to_bin}})
+    WITH row, p, r, source, target,
+         toFloat(CASE WHEN coalesce(p.quantity, 0) < coalesce(source.occupied, 0.0)
+                      THEN coalesce(p.quantity, 0) ELSE coalesce(source.occupied, 0.0) END) AS moved
+    DELETE r
+    MERGE (p)-[:STORED_IN]->(target)
+    WITH row, source, target, moved
+    CALL {{
+        WITH row
+        MATCH (:Order {{status: 'pending'}})-[:HAS_ITEM]->(i:OrderItem {{product_sku: row.sku, bin_code: row.from_bin}})
+        SET i.bin_code = row.to_bin
+    }}
+    CALL {{
+        WITH source, target, moved
+        UNWIND [[source, -moved], [target, moved]] AS shift
+        WITH shift[0] AS b, 0.0 AS d_capacity, shift[1] AS d_occupied
+        SET b.occupied = coalesce(b.occupied, 0.0) + d_occupied
+        {rollup_clause()}
+    }}
+    RETURN source.code, source.capacity, source.occupied, target.code, target.capacity, target.occupied
+"""
+
+
+def _frame(query, params, columns, fetch_size=10000):
+    """Exporta o resultado de `query` num DataFrame, lendo em lotes de `fetch_size`."""
+    import pandas as pd
+
+    with neo4j_session(fetch_size=fetch_size) as session:
+        result = session.run(query, params)
+        return pd.DataFrame.from_records((tuple(record) for record in result), columns=columns)
+
+
+def bin_costs():
+    """
+    DataFrame (bin, warehouse, cost) com o custo de ida e volta da doca até
+    cada bin conhecido pelos layouts de roteirização.
+    """
+    import numpy as np
+    import pandas as pd
+
+    frames = []
+    for uid, layout in get_layouts().items():
+        depot_row = np.array([layout.slot_distance(0, s) for s in range(layout.size)])
+        codes = list(layout.bins)
+        slots = np.fromiter((layout.bins[c][0] for c in codes), dtype=np.int64, count=len(codes))
+        local = np.fromiter((layout.bins[c][1] for c in codes), dtype=np.float64, count=len(codes))
+        frames.append(pd.DataFrame({
+            "bin": codes,
+            "warehouse": uid,
+            "cost": 2 * (depot_row[slots] + local),
+        }))
+    if not frames:
+        return pd.DataFrame({"bin": [], "warehouse": [], "cost": []})
+    return pd.concat(frames, ignore_index=True)
+
+
+def classify_abc(picks, a_share=0.8, b_share=0.95):
+    """
+    Classe ABC de cada SKU (Series de coletas, já em ordem decrescente): A até
+    `a_share` das coletas acumuladas, B até `b_share`, C o restante.
+    """
+    import numpy as np
+
+    total = picks.sum()
+    if total <= 0:
+        return np.full(len(picks), "C", dtype=object)
+    # Participação acumulada ANTES do SKU: o que cruza o limite ainda entra na classe
+    before = (picks.cumsum() - picks) / total
+    return np.select([before < a_share, before < b_share], ["A", "B"], default="C")
+
+
+def assign_bins(skus, pool):
+    """
+    Distribui os bins de `pool` (warehouse, bin, cost, room) entre os SKUs de
+    `skus` (warehouse, bin, cost, quantity), já em ordem de prioridade: em
+    cada galpão o k-ésimo SKU recebe o k-ésimo bin mais barato.
+
+    Um SKU sem bin no pool, ou cujo estoque não cabe em `room`, fica onde
+    está; seu bin sai do pool e os demais são redistribuídos, até que nenhum
+    SKU fique bloqueado. Assim nenhum bin é dado a dois SKUs, nem a um SKU
+    enquanto outro continua nele. Retorna `skus` com to_bin, new_cost e
+    blocked (mantido por falta de capacidade).
+    """
+    skus = skus.assign(to_bin=skus["bin"], new_cost=skus["cost"], blocked=False)
+    pool = pool.sort_values(["warehouse", "cost", "bin"], kind="mergesort")
+    pending = skus.index
+    while len(pending):
+        movable = skus.loc[pending, ["warehouse", "quantity"]]
+        ranked = pool.assign(rank=pool.groupby("warehouse").cumcount())
+        offer = movable.assign(rank=movable.groupby("warehouse").cumcount()).merge(
+            ranked[["warehouse", "rank", "bin", "cost", "room"]], on=["warehouse", "rank"], how="left",
+        )
+        offer.index = pending
+        no_bin = offer["bin"].isna()
+        too_small = ~no_bin & (movable["quantity"] > offer["room"])
+        stuck = no_bin | too_small
+        if not stuck.any():
+            skus.loc[pending, "to_bin"] = offer["bin"]
+            skus.loc[pending, "new_cost"] = offer["cost"]
+            break
+        skus.loc[too_small[too_small].index, "blocked"] = True
+        pool = pool[~pool["bin"].isin(skus.loc[stuck[stuck].index, "bin"])]
+        pending = pending[~stuck.to_numpy()]
+    return skus
+
+
+def propose_slotting(days=90, a_share=0.8, b_share=0.95, swap_only=False):
+    """
+    Calcula a proposta sem gravar nada. Retorna (resumo, DataFrame de
+    movimentos com sku, class, picks, from_bin, to_bin, quantity, saving).
+    """
+    import numpy as np
+    import pandas as pd
+
+    start = time.perf_counter()
+    since = time.time() - days * 86400
+    velocity = _frame(PICK_VELOCITY_QUERY, {"since": since}, ["sku", "picks", "units"])
+    locations = _frame(LOCATIONS_QUERY, {}, ["sku", "quantity", "bin", "locations"])
+    bins = _frame(BINS_QUERY, {}, ["bin", "capacity", "occupied", "used"])
+    costs = bin_costs()
+    exported = time.perf_counter()
+
+    bins = bins.merge(costs, on="bin", how="inner")
+
+    # Localização principal de cada SKU: o bin mais barato onde ele está
+    located = locations.merge(costs, on="bin", how="inner")
+    primary = located.sort_values(["sku", "cost"]).drop_duplicates("sku", keep="first")
+
+    skus = primary.merge(velocity, on="sku", how="left")
+    skus[["picks", "units"]] = skus[["picks", "units"]].fillna(0).astype(np.int64)
+    skus = skus.sort_values(["picks", "cost"], ascending=[False, True], kind="mergesort", ignore_index=True)
+    skus["class"] = classify_abc(skus["picks"], a_share, b_share)
+
+    # SKUs em mais de um bin ficam onde estão, e todos os bins deles saem do
+    # pool. Os demais bins disponíveis são os dos SKUs realocáveis e, salvo
+    # swap_only, os vazios; o espaço livre conta o estoque que sai de lá.
+    single = skus["locations"] == 1
+    leaving = skus[single].groupby("bin")["quantity"].sum()
+    fixed_bins = locations.loc[locations["locations"] > 1, "bin"]
+    pool = bins[
+        (bins["bin"].isin(leaving.index) | (~bins["used"] & (not swap_only)))
+        & ~bins["bin"].isin(fixed_bins)
+    ]
+    pool = pool.assign(
+        room=pool["capacity"] - pool["occupied"] + pool["bin"].map(leaving).fillna(0)
+    )
+
+    assigned = assign_bins(skus[single], pool[["warehouse", "bin", "cost", "room"]])
+    skus = skus.assign(to_bin=skus["bin"], new_cost=skus["cost"], blocked=False)
+    skus.loc[assigned.index, ["to_bin", "new_cost", "blocked"]] = assigned[["to_bin", "new_cost", "blocked"]]
+
+    before = float((skus["picks"] * skus["cost"]).sum())
+    after = float((skus["picks"] * skus["new_cost"]).sum())
+    skus["saving"] = skus["picks"] * (skus["cost"] - skus["new_cost"])
+
+    moves = skus.loc[skus["to_bin"] != skus["bin"], [
+        "sku", "class", "picks", "bin", "to_bin", "quantity", "cost", "new_cost", "saving",
+    ]].rename(columns={"bin": "from_bin"}).reset_index(drop=True)
+
+    summary = {
+        "days": days,
+        "skus": int(len(skus)),
+        "pickLines": int(velocity["picks"].sum()) if len(velocity) else 0,
+        "classes": {c: int(n) for c, n in skus["class"].value_counts().sort_index().items()},
+        "moves": int(len(moves)),
+        "blockedByCapacity": int(skus["blocked"].sum()),
+        "multiLocation": int((~single).sum()),
+        "travelBefore": round(before, 2),
+        "travelAfter": round(after, 2),
+        "travelReduction": round((1 - after / before) * 100, 1) if before > 0 else 0.0,
+        "exportSeconds": round(exported - start, 2),
+        "computeSeconds": round(time.perf_counter() - exported, 2),
+    }
+    logger.info("Slotting: %s", summary)
+    return summary, moves
+
+
+def apply_moves(moves, chunk_size=1000, progress=None):
+    """
+    Grava os movimentos propostos em transações de até `chunk_size` SKUs.
+    Retorna quantos foram de fato aplicados (um SKU que saiu do bin de origem
+    desde a proposta é ignorado).
+    """
+    applied = 0
+    for begin in range(0, len(moves), chunk_size):
+        chunk = moves.iloc[begin:begin + chunk_size]
+        rows = chunk[["sku", "from_bin", "to_bin"]].to_dict("records")
+
+        with db.transaction:
+            results, _ = db.cypher_query(MOVE_PRODUCTS_QUERY, {"moves": rows})
+        notify_bin_levels([level for row in results for level in (row[:3], row[3:])])
+        applied += len(results)
+        if progress:
+            progress(begin + len(rows))
+
+    if applied:
+        notify_graph_change("products", "bins")
+    return applied
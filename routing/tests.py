@@ -0,0 +1,65 @@
+import pandas as pd
+from django.test import SimpleTestCase
+
+from .slotting import assign_bins
+
+
+def _skus(*rows):
+    return pd.DataFrame(rows, columns=["sku", "warehouse", "bin", "cost", "quantity"])
+
+
+def _pool(*rows):
+    return pd.DataFrame(rows, columns=["warehouse", "bin", "cost", "room"])
+
+
+class AssignBinsTests(SimpleTestCase):
+    def test_most_picked_sku_gets_cheapest_bin(self):
+        skus = _skus(("X", "w", "far", 10.0, 5), ("Y", "w", "near", 1.0, 5))
+        pool = _pool(("w", "near", 1.0, 50.0), ("w", "far", 10.0, 50.0))
+
+        result = assign_bins(skus, pool).set_index("sku")
+
+        self.assertEqual(result.loc["X", "to_bin"], "near")
+        self.assertEqual(result.loc["Y", "to_bin"], "far")
+        self.assertFalse(result["blocked"].any())
+
+    def test_blocked_sku_keeps_its_bin_out_of_the_pool(self):
+        # Y não cabe em "far": fica em "near", e X não pode ir para lá
+        skus = _skus(("X", "w", "far", 10.0, 5), ("Y", "w", "near", 1.0, 80))
+        pool = _pool(("w", "near", 1.0, 100.0), ("w", "far", 10.0, 50.0))
+
+        result = assign_bins(skus, pool).set_index("sku")
+
+        self.assertEqual(result.loc["Y", "to_bin"], "near")
+        self.assertTrue(result.loc["Y", "blocked"])
+        self.assertEqual(result.loc["X", "to_bin"], "far")
+        self.assertEqual(result.loc["X", "new_cost"], 10.0)
+
+    def test_no_bin_is_claimed_twice(self):
+        skus = _skus(
+            ("A", "w", "b3", 3.0, 40),
+            ("B", "w", "b1", 1.0, 90),
+            ("C", "w", "b2", 2.0, 10),
+            ("D", "v", "v1", 1.0, 10),
+        )
+        pool = _pool(
+            ("w", "b1", 1.0, 100.0), ("w", "b2", 2.0, 50.0), ("w", "b3", 3.0, 50.0),
+            ("w", "b0", 0.5, 20.0), ("v", "v1", 1.0, 10.0),
+        )
+
+        result = assign_bins(skus, pool)
+
+        self.assertFalse(result["to_bin"].duplicated().any())
+        fits = result.merge(pool, left_on="to_bin", right_on="bin", suffixes=("", "_pool"))
+        moved = fits[fits["to_bin"] != fits["bin"]]
+        self.assertTrue((moved["quantity"] <= moved["room"]).all())
+
+    def test_sku_without_a_bin_stays(self):
+        # Dois SKUs dividem o único bin do pool: o segundo não recebe bin e fica
+        skus = _skus(("X", "w", "b1", 1.0, 5), ("Y", "w", "b1", 1.0, 5))
+        pool = _pool(("w", "b1", 1.0, 100.0))
+
+        result = assign_bins(skus, pool).set_index("sku")
+
+        self.assertEqual(list(result["to_bin"]), ["b1", "b1"])
+        self.assertFalse(result["blocked"].any())
@@ -0,0 +1,59 @@
+# routing/tsp.py
+"""
+Heurística de sequenciamento de coleta (TSP com saída e volta à doca).
+
+Vizinho mais próximo para a rota inicial, refinada com 2-opt até não haver
+melhora. Para pedidos de dezenas de linhas a rota fica a poucos por cento da
+ótima e sai em milissegundos.
+"""
+
+
+def route_length(dist, order):
+    """Comprimento do ciclo 0 → order... → 0 na matriz `dist`."""
+    total = 0.0
+    previous = 0
+    for node in order:
+        total += dist[previous][node]
+        previous = node
+    return total + dist[previous][0]
+
+
+def nearest_neighbor(dist, nodes):
+    remaining = set(nodes)
+    order = []
+    current = 0
+    while remaining:
+        current = min(remaining, key=dist[current].__getitem__)
+        remaining.remove(current)
+        order.append(current)
+    return order
+
+
+def two_opt(dist, order, max_passes=50):
+    """Inverte trechos da rota enquanto isso encurtar o ciclo."""
+    tour = [0] + list(order) + [0]
+    n = len(tour)
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, n - 2):
+            a, b = tour[i - 1], tour[i]
+            for j in range(i + 1, n - 1):
+                c, d = tour[j], tour[j + 1]
+                delta = dist[a][c] + dist[b][d] - dist[a][b] - dist[c][d]
+                if delta < -1e-9:
+                    tour[i:j + 1] = reversed(tour[i:j + 1])
+                    b = tour[i]
+                    improved = True
+        if not improved:
+            break
+    return tour[1:-1]
+
+
+def solve_route(dist):
+    """
+    `dist` é a matriz (n+1)×(n+1) com a doca no índice 0. Retorna
+    (ordem de visita dos índices 1..n, distância total).
+    """
+    nodes = range(1, len(dist))
+    order = two_opt(dist, nearest_neighbor(dist, nodes))
+    return order, route_length(dist, order)
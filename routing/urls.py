@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import OrderRouteView, WaveView
+
+urlpatterns = [
+    path('orders/<str:uid>/', OrderRouteView.as_view(), name='order-route'),
+    path('waves/', WaveView.as_view(), name='wave-plan'),
+]
@@ -0,0 +1,65 @@
+from django.conf import settings
+from rest_framework import serializers, status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.signals import notify_graph_change
+from .planner import plan_order_route
+from .waves import plan_wave, start_wave
+
+
+class OrderRouteView(APIView):
+    """
+    GET /api/routes/orders/<uid>/ -> sequência de coleta otimizada do pedido,
+    uma rota por galpão, saindo e voltando à doca.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, uid):
+        route = plan_order_route(uid)
+        if route is None:
+            return Response({"error": "Pedido não encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(route, status=status.HTTP_200_OK)
+
+
+class WaveRequestSerializer(serializers.Serializer):
+    cartCapacity = serializers.IntegerField(min_value=1, default=lambda: settings.WAVE_CART_CAPACITY)
+    maxOrders = serializers.IntegerField(min_value=1, default=lambda: settings.WAVE_MAX_ORDERS)
+    limit = serializers.IntegerField(min_value=1, default=lambda: settings.WAVE_MAX_PENDING)
+    warehouseId = serializers.CharField(required=False)
+    dryRun = serializers.BooleanField(default=False)
+
+
+class WaveView(APIView):
+    """
+    POST /api/routes/waves/ -> agrupa os pedidos pendentes em lotes de coleta.
+
+    Sem `dryRun`, todos os pedidos planejados passam para `picking` em uma
+    única transação, com `waveId` e `batchNumber` gravados.
+    """
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        params = WaveRequestSerializer(data=request.data)
+        if not params.is_valid():
+            return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = params.validated_data
+
+        plan = plan_wave(
+            cart_capacity=data["cartCapacity"],
+            max_orders=data["maxOrders"],
+            limit=data["limit"],
+            warehouse_uid=data.get("warehouseId"),
+        )
+        if data["dryRun"] or not plan["batches"]:
+            return Response({"waveId": None, **plan}, status=status.HTTP_200_OK)
+
+        wave_id, started = start_wave(plan)
+        notify_graph_change("orders")
+
+        # Pedidos que deixaram de estar pendentes durante o planejamento
+        for batch in plan["batches"]:
+            batch["orders"] = [uid for uid in batch["orders"] if uid in started]
+        plan["batches"] = [batch for batch in plan["batches"] if batch["orders"]]
+        return Response({"waveId": wave_id, **plan}, status=status.HTTP_201_CREATED)
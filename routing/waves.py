@@ -0,0 +1,203 @@
+# routing/waves.py
+"""
+Planejamento de ondas (wave/batch picking) para pedidos pendentes.
+
+Os pedidos `pending` são agrupados em lotes (um carrinho cada) que minimizam a
+caminhada total, respeitando a capacidade do carrinho (em unidades) e o máximo
+de pedidos por lote. Heurística de semente e crescimento:
+
+1. Ordena os pedidos pela posição média das suas paradas num percurso em
+   serpentina pelo galpão (Layout.sweep).
+2. A semente de cada lote é o pedido ainda livre cuja parada mais distante da
+   doca é a maior.
+3. O lote cresce com o candidato (entre os vizinhos da semente na ordem de
+   varredura) de menor custo marginal: a soma, sobre os slots do candidato, da
+   distância até o slot mais próximo já visitado pelo lote.
+
+Cada lote é então sequenciado com o mesmo TSP das rotas de pedido, usando o
+mesmo modelo de distâncias (routing/layout.py).
+"""
+import bisect
+import uuid
+
+from neomodel import db
+
+from .layout import locate
+from .planner import choose_bin
+from .tsp import solve_route
+
+PENDING_LINES_QUERY = """
+    MATCH (o:Order {status: 'pending'})
+    WITH o ORDER BY o.created_at ASC LIMIT $limit
+    OPTIONAL MATCH (o)-[:HAS_ITEM]->(i:OrderItem)
+    OPTIONAL MATCH (p:Product {sku: i.product_sku})-[:STORED_IN]->(b:Bin)
+    WITH o, i, collect(DISTINCT b.code) AS candidates
+    RETURN o.uid, i.product_sku, i.quantity, i.bin_code, candidates
+"""
+
+# Só vira `picking` quem ainda estiver `pending`: pedidos alterados por outro
+# processo entre o planejamento e a confirmação ficam de fora.
+START_WAVE_QUERY = """
+    UNWIND $assignments AS row
+    MATCH (o:Order {uid: row.uid})
+    WHERE o.status = 'pending'
+    SET o.status = 'picking', o.wave_id = $wave_id, o.batch_number = row.batch
+    RETURN o.uid
+"""
+
+# Quantos vizinhos na ordem de varredura são avaliados a cada passo
+CANDIDATE_WINDOW = 40
+
+
+class _Order:
+    __slots__ = ("uid", "layout", "bins", "slots", "units", "sweep", "reach")
+
+    def __init__(self, uid, layout, bins, units):
+        self.uid = uid
+        self.layout = layout
+        self.bins = bins
+        self.slots = {layout.bins[code][0] for code in bins}
+        self.units = units
+        self.sweep = sum(layout.sweep[s] for s in self.slots) / len(self.slots)
+        self.reach = max(layout.slot_distance(0, s) for s in self.slots)
+
+
+def load_pending_orders(limit):
+    """
+    Lê até `limit` pedidos pendentes (mais antigos primeiro) e resolve o bin
+    de cada linha. Retorna ([_Order], [{"orderId", "reason"}]).
+    """
+    rows, _ = db.cypher_query(PENDING_LINES_QUERY, {"limit": limit})
+
+    lines = {}
+    for order_uid, sku, quantity, bin_code, candidates in rows:
+        entry = lines.setdefault(order_uid, [])
+        if sku is not None:
+            entry.append((quantity or 0, choose_bin(bin_code, candidates)))
+
+    orders, skipped = [], []
+    for order_uid, items in lines.items():
+        if not items:
+            skipped.append({"orderId": order_uid, "reason": "pedido sem itens"})
+            continue
+        if any(bin_code is None for _, bin_code in items):
+            skipped.append({"orderId": order_uid, "reason": "item sem localização"})
+            continue
+        layouts = {locate(bin_code) for _, bin_code in items}
+        if len(layouts) > 1:
+            skipped.append({"orderId": order_uid, "reason": "itens em mais de um galpão"})
+            continue
+        orders.append(_Order(
+            order_uid,
+            layouts.pop(),
+            {bin_code for _, bin_code in items},
+            sum(quantity for quantity, _ in items),
+        ))
+    return orders, skipped
+
+
+def _batch_orders(orders, cart_capacity, max_orders):
+    """Particiona pedidos de um mesmo galpão em lotes (listas de _Order)."""
+    layout = orders[0].layout
+    by_sweep = sorted(orders, key=lambda o: o.sweep)
+    keys = [o.sweep for o in by_sweep]
+    free = set(range(len(by_sweep)))
+    seeds = sorted(free, key=lambda i: -by_sweep[i].reach)
+
+    batches = []
+    for seed in seeds:
+        if seed not in free:
+            continue
+        free.discard(seed)
+        batch = [by_sweep[seed]]
+        units = by_sweep[seed].units
+
+        # near[s] = distância do slot s ao slot mais próximo já visitado no lote
+        near = [min(layout.slot_distance(s, t) for t in batch[0].slots) for s in range(layout.size)]
+
+        while len(batch) < max_orders:
+            center = bisect.bisect_left(keys, batch[0].sweep)
+            window = range(max(0, center - CANDIDATE_WINDOW), min(len(by_sweep), center + CANDIDATE_WINDOW))
+            best, best_cost = None, None
+            for i in window:
+                if i not in free or units + by_sweep[i].units > cart_capacity:
+                    continue
+                cost = sum(near[s] for s in by_sweep[i].slots)
+                if best_cost is None or cost < best_cost:
+                    best, best_cost = i, cost
+            if best is None:
+                break
+
+            free.discard(best)
+            chosen = by_sweep[best]
+            batch.append(chosen)
+            units += chosen.units
+            for s in range(layout.size):
+                for t in chosen.slots:
+                    d = layout.slot_distance(s, t)
+                    if d < near[s]:
+                        near[s] = d
+        batches.append(batch)
+    return batches
+
+
+def _route(layout, bins):
+    codes = sorted(bins)
+    order, total = solve_route(layout.distance_matrix(codes))
+    return [codes[i - 1] for i in order], total
+
+
+def plan_wave(cart_capacity, max_orders, limit, warehouse_uid=None):
+    """
+    Monta a onda sem gravar nada. Retorna o plano com os lotes, a distância
+    total e a distância que os mesmos pedidos percorreriam um a um.
+    """
+    orders, skipped = load_pending_orders(limit)
+    if warehouse_uid:
+        orders = [o for o in orders if o.layout.warehouse_uid == warehouse_uid]
+
+    by_warehouse = {}
+    for order in orders:
+        by_warehouse.setdefault(order.layout.warehouse_uid, []).append(order)
+
+    batches = []
+    total = unbatched = 0.0
+    for uid, group in by_warehouse.items():
+        for batch in _batch_orders(group, cart_capacity, max_orders):
+            layout = batch[0].layout
+            route, distance = _route(layout, set().union(*(o.bins for o in batch)))
+            single = sum(_route(layout, o.bins)[1] for o in batch)
+            total += distance
+            unbatched += single
+            batches.append({
+                "batch": len(batches) + 1,
+                "warehouseId": uid,
+                "orders": [o.uid for o in batch],
+                "units": sum(o.units for o in batch),
+                "overCapacity": sum(o.units for o in batch) > cart_capacity,
+                "distance": round(distance, 2),
+                "route": route,
+            })
+
+    return {
+        "batches": batches,
+        "totalDistance": round(total, 2),
+        "unbatchedDistance": round(unbatched, 2),
+        "skipped": skipped,
+    }
+
+
+def start_wave(plan):
+    """
+    Passa todos os pedidos do plano para `picking` em uma única transação,
+    gravando wave_id e o número do lote. Retorna (wave_id, uids atualizados).
+    """
+    wave_id = uuid.uuid4().hex
+    assignments = [
+        {"uid": order_uid, "batch": batch["batch"]}
+        for batch in plan["batches"]
+        for order_uid in batch["orders"]
+    ]
+    with db.transaction:
+        rows, _ = db.cypher_query(START_WAVE_QUERY, {"assignments": assignments, "wave_id": wave_id})
+    return wave_id, {row[0] for row in rows}
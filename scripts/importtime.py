@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark de tempo de import do boot de um worker (config.wsgi + URLconf).
+
+Roda `python -X importtime` algumas vezes e falha (exit 1) se a mediana do
+custo próprio do projeto passar do orçamento ou se alguma dependência pesada,
+que deve ser carregada só sob demanda, aparecer no boot.
+
+O custo próprio é a soma dos módulos que o boot importa além da base (Django,
+DRF e neomodel/driver neo4j, que todo worker carrega de qualquer forma). A
+base sozinha leva ~1 s e varia bastante entre máquinas e execuções, inclusive
+porque o driver importa pandas/numpy quando estão instalados; medir só o que
+o projeto acrescenta deixa o orçamento com folga real e fora do ruído.
+
+Execute na raiz do projeto:
+    python scripts/importtime.py
+    python scripts/importtime.py --budget-ms 200 --runs 7 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Orçamento padrão (ms, soma do "self" dos imports fora da base; ~120 ms
+# medidos). Ajuste conscientemente quando uma dependência nova for realmente
+# necessária no boot.
+BUDGET_MS = 300
+
+# Módulos que só podem ser importados quando o endpoint que os usa é acessado.
+# pandas/numpy ficam de fora: o próprio driver neo4j os importa no boot
+# (neo4j._optional_deps) quando estão instalados.
+LAZY_MODULES = ("reportlab", "openpyxl", "firebase_admin", "google", "networkx")
+
+# Dependências que qualquer boot do worker carrega (descontadas do orçamento)
+BASELINE_SNIPPET = "import django.core.handlers.wsgi, rest_framework.views, neomodel"
+
+BOOT_SNIPPET = (
+    "import config.wsgi; "
+    "from django.urls import get_resolver; "
+    "get_resolver().url_patterns"
+)
+
+
+def measure(snippet=BOOT_SNIPPET):
+    """Executa `snippet` em subprocesso; retorna {módulo: (self_us, cumulative_us)}."""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE="config.settings", PYTHONDONTWRITEBYTECODE="")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", snippet],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f"❌ O boot falhou (exit {proc.returncode}).")
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Módulos mais caros a listar.")
+    args = parser.parse_args()
+
+    baseline = set(measure(BASELINE_SNIPPET))
+    totals = []
+    own = []
+    modules = {}
+    for _ in range(args.runs):
+        modules = measure()
+        totals.append(sum(self_us for self_us, _ in modules.values()) / 1000)
+        own.append(sum(self_us for name, (self_us, _) in modules.items() if name not in baseline) / 1000)
+    median_ms = statistics.median(own)
+
+    print(f"⏱️  Boot (config.wsgi + URLconf): mediana {statistics.median(totals):.0f} ms em {args.runs} execuções, "
+          f"{median_ms:.0f} ms além da base (orçamento {args.budget_ms:.0f} ms)")
+    print(f"   Mais caros fora da base (self, última execução):")
+    extra = [(name, self_us) for name, (self_us, _) in modules.items() if name not in baseline]
+    for name, self_us in sorted(extra, key=lambda item: -item[1])[:args.top]:
+        print(f"   {self_us / 1000:8.1f} ms  {name}")
+
+    failures = []
+    eager = sorted({name.split(".")[0] for name in modules} & set(LAZY_MODULES))
+    if eager:
+        failures.append(f"dependências pesadas importadas no boot: {', '.join(eager)}")
+    if median_ms > args.budget_ms:
+        failures.append(f"o projeto somou {median_ms:.0f} ms ao boot, acima do orçamento de {args.budget_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Dentro do orçamento.")
+
+
+if __name__ == "__main__":
+    main()
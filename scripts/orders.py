@@ -1,58 +1,279 @@
 #!/usr/bin/env python3
+"""
+Gerador de carga HTTP para a API (open-loop).
+
+As requisições chegam numa taxa fixa (`--rate`, req/s), com intervalos
+constantes ou de Poisson, independentemente de o servidor já ter respondido
+às anteriores. A latência é medida a partir do instante PLANEJADO da chegada,
+então a fila formada quando o servidor não acompanha a taxa entra no número
+(sem "coordinated omission"). `--concurrency` limita as requisições em voo.
+
+Cenários (peso relativo em `--mix`):
+    order_create     POST /api/orders/
+    order_list       GET  /api/orders/ (primeira página ou a próxima do cursor)
+    warehouse_list   GET  /api/warehouses/
+    dashboard_stats  GET  /api/dashboard/stats/
+    product_list     GET  /api/products/ (idem order_list)
+
+Ao final imprime e grava (`--output`) um relatório JSON por cenário, com
+p50/p95/p99, vazão e taxa de erro. Com `--compare` o relatório é comparado
+com um anterior, e o script falha (exit 1) se o p95 de algum cenário crescer
+mais que `--max-regression` ou a taxa de erro subir.
+
+Exemplos:
+    python scripts/orders.py --rate 50 --duration 60 --output base.json
+    python scripts/orders.py --rate 50 --duration 60 --compare base.json
+    python scripts/orders.py --mix order_create=1,order_list=4 --arrival constant
+"""
+import argparse
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
 import requests
-import json # Importar para formatação de saída
-
-# Base da URL da sua API de pedidos
-API_BASE = "http://localhost:8000/api/orders/"
-
-sample_orders = [
-    {
-        "order_number": "SEED-001",
-        "customer_name": "Cliente A",
-        "items": [
-            # Usando SKUs criados no seed do armazém
-            {"product_sku": "PROD-001", "quantity": 2}, # Notebook Dell
-            {"product_sku": "PROD-002", "quantity": 1}  # Mouse Logitech
-        ]
-    },
-    {
-        "order_number": "SEED-002",
-        "customer_name": "Cliente B",
-        "items": [
-            # Usando SKUs criados no seed do armazém
-            {"product_sku": "PROD-003", "quantity": 5}  # Teclado Mecânico
-        ]
+from requests.adapters import HTTPAdapter
+
+DEFAULT_MIX = "order_create=1,order_list=3,warehouse_list=2,dashboard_stats=2,product_list=2"
+# SKUs criados pelos scripts de seed (scripts/popular.py)
+DEFAULT_SKUS = "PROD-001,PROD-002,PROD-003,PROD-004,PROD-005"
+
+
+class Scenarios:
+    """Monta as requisições de cada cenário. Os cursores são compartilhados entre threads."""
+
+    def __init__(self, base_url, skus, page_size, rng):
+        self.base_url = base_url.rstrip("/")
+        self.skus = skus
+        self.page_size = page_size
+        self.rng = rng
+        self.run_id = uuid.uuid4().hex[:8]
+        self.counter = itertools.count(1)
+        self.next_pages = {}
+        self.lock = threading.Lock()
+
+    def _paged(self, name, path):
+        with self.lock:
+            url = self.next_pages.pop(name, None)
+        return "GET", url or f"{self.base_url}{path}?page_size={self.page_size}", {}
+
+    def remember_next(self, name, response):
+        try:
+            next_url = response.json().get("next")
+        except (ValueError, AttributeError):
+            return
+        if next_url:
+            with self.lock:
+                self.next_pages[name] = next_url
+
+    def order_create(self):
+        with self.lock:
+            lines = self.rng.randint(1, min(5, len(self.skus)))
+            skus = self.rng.sample(self.skus, lines)
+            quantities = [self.rng.randint(1, 5) for _ in skus]
+        payload = {
+            "externalId": f"LOAD-{self.run_id}-{next(self.counter):07d}",
+            "items": [{"sku": sku, "qty": qty} for sku, qty in zip(skus, quantities)],
+        }
+        return "POST", f"{self.base_url}/api/orders/", {"json": payload}
+
+    def order_list(self):
+        return self._paged("order_list", "/api/orders/")
+
+    def warehouse_list(self):
+        return "GET", f"{self.base_url}/api/warehouses/", {}
+
+    def dashboard_stats(self):
+        return "GET", f"{self.base_url}/api/dashboard/stats/", {}
+
+    def product_list(self):
+        return self._paged("product_list", "/api/products/")
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if not hasattr(Scenarios, name) or name.startswith("_") or name == "remember_next":
+            raise SystemExit(f"❌ Cenário desconhecido: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(ordered, p):
+    """Percentil por posto mais próximo de uma lista já ordenada."""
+    if not ordered:
+        return None
+    rank = max(1, int(round(p / 100 * len(ordered) + 0.4999)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples, elapsed):
+    """samples: [(latência_s, erro)]."""
+    latencies = sorted(latency for latency, _ in samples)
+    errors = sum(1 for _, error in samples if error)
+    to_ms = lambda value: round(value * 1000, 2) if value is not None else None
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "errorRate": round(errors / len(samples), 4) if samples else 0.0,
+        "throughput": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "p50": to_ms(percentile(latencies, 50)),
+        "p95": to_ms(percentile(latencies, 95)),
+        "p99": to_ms(percentile(latencies, 99)),
+        "max": to_ms(latencies[-1] if latencies else None),
     }
-]
-
-def create_order(order_data):
-    """Envia um POST request para criar um novo pedido."""
-    print(f"📦 Enviando pedido: {order_data['order_number']}")
-    try:
-        r = requests.post(API_BASE, json=order_data)
-        
-        # Imprime o código de status e a resposta formatada
-        print(f"   Status Code: {r.status_code}")
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    mix = parse_mix(args.mix)
+    names, weights = list(mix), list(mix.values())
+    skus = [sku.strip() for sku in args.skus.split(",") if sku.strip()]
+    scenarios = Scenarios(args.base_url, skus, args.page_size, random.Random(args.seed))
+
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    local = threading.local()
+
+    def http():
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+            local.session.headers.update(headers)
+            local.session.mount("http://", HTTPAdapter(pool_maxsize=1))
+            local.session.mount("https://", HTTPAdapter(pool_maxsize=1))
+        return local.session
+
+    samples = {name: [] for name in names}
+    statuses = {name: {} for name in names}
+    results_lock = threading.Lock()
+    in_flight = threading.BoundedSemaphore(args.concurrency)
+
+    def fire(name, scheduled):
+        error = True
+        status = "exception"
         try:
-            # Tenta imprimir a resposta JSON formatada, se houver
-            response_json = r.json()
-            print("   Resposta (JSON):")
-            print(json.dumps(response_json, indent=4))
-        except requests.exceptions.JSONDecodeError:
-            # Se não for JSON, imprime como texto
-            print(f"   Resposta (Texto): {r.text}")
-            
-    except requests.exceptions.ConnectionError as e:
-        print(f"   ❌ ERRO DE CONEXÃO: Não foi possível conectar a {API_BASE}. Verifique se o servidor está rodando.")
-        print(f"   Detalhe: {e}")
-    except Exception as e:
-        print(f"   ❌ Ocorreu um erro: {e}")
-    print("-" * 30)
+            method, url, kwargs = getattr(scenarios, name)()
+            response = http().request(method, url, timeout=args.timeout, **kwargs)
+            status = response.status_code
+            error = status >= 400
+            if not error and name in ("order_list", "product_list"):
+                scenarios.remember_next(name, response)
+        except requests.RequestException:
+            pass
+        finally:
+            latency = time.perf_counter() - scheduled
+            in_flight.release()
+            with results_lock:
+                samples[name].append((latency, error))
+                statuses[name][str(status)] = statuses[name].get(str(status), 0) + 1
+
+    print(f"🚀 {args.rate} req/s por {args.duration}s contra {args.base_url} "
+          f"(chegadas {args.arrival}, até {args.concurrency} em voo)")
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    start = time.perf_counter()
+    deadline = start + args.duration
+    scheduled = start
+    sent = 0
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        while True:
+            gap = rng.expovariate(args.rate) if args.arrival == "poisson" else 1 / args.rate
+            scheduled += gap
+            if scheduled >= deadline:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            # Servidor saturado: a chegada espera uma vaga, e a espera conta na latência
+            in_flight.acquire()
+            name = rng.choices(names, weights)[0]
+            pool.submit(fire, name, scheduled)
+            sent += 1
+    elapsed = time.perf_counter() - start
+
+    everything = [sample for name in names for sample in samples[name]]
+    return {
+        "meta": {
+            "startedAt": started_at,
+            "baseUrl": args.base_url,
+            "rate": args.rate,
+            "arrival": args.arrival,
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "mix": mix,
+            "seed": args.seed,
+            "sent": sent,
+            "elapsed": round(elapsed, 2),
+        },
+        "total": summarize(everything, elapsed),
+        "endpoints": {
+            name: {**summarize(samples[name], elapsed), "statuses": statuses[name]}
+            for name in names
+        },
+    }
+
+
+def compare(report, baseline, max_regression):
+    """Lista as regressões de `report` em relação a `baseline`."""
+    regressions = []
+    for name, current in report["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before or not current["requests"]:
+            continue
+        print(f"   {name:16} p95 {before['p95']} → {current['p95']} ms, "
+              f"erros {before['errorRate']:.2%} → {current['errorRate']:.2%}")
+        if before["p95"] and current["p95"] > before["p95"] * (1 + max_regression):
+            regressions.append(f"{name}: p95 {before['p95']} → {current['p95']} ms")
+        if current["errorRate"] > before["errorRate"] + 0.01:
+            regressions.append(f"{name}: taxa de erro {before['errorRate']:.2%} → {current['errorRate']:.2%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--rate", type=float, default=20.0, help="Chegadas por segundo (padrão: 20).")
+    parser.add_argument("--duration", type=float, default=30.0, help="Duração em segundos (padrão: 30).")
+    parser.add_argument("--concurrency", type=int, default=32, help="Máximo de requisições em voo (padrão: 32).")
+    parser.add_argument("--arrival", choices=("poisson", "constant"), default="poisson")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Pesos dos cenários (padrão: {DEFAULT_MIX}).")
+    parser.add_argument("--skus", default=DEFAULT_SKUS, help="SKUs usados nos pedidos criados.")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--token", help="Token Firebase enviado como Bearer.")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=None, help="Semente do sorteio de cenários/chegadas.")
+    parser.add_argument("--output", help="Grava o relatório JSON neste arquivo.")
+    parser.add_argument("--compare", help="Relatório JSON anterior para comparação.")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Crescimento máximo aceito do p95 com --compare (padrão: 0.2 = 20%%).")
+    args = parser.parse_args()
+    if args.rate <= 0 or args.duration <= 0 or args.concurrency < 1:
+        parser.error("--rate, --duration e --concurrency devem ser positivos.")
+
+    report = run(args)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2, ensure_ascii=False)
+        print(f"💾 Relatório gravado em {args.output}")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        print(f"📊 Comparando com {args.compare}:")
+        regressions = compare(report, baseline, args.max_regression)
+        for regression in regressions:
+            print(f"❌ {regression}")
+        if regressions:
+            sys.exit(1)
+        print("✅ Sem regressões.")
+
 
 if __name__ == "__main__":
-    print("🚀 Iniciando seed de pedidos...")
-    print(f"API Base: {API_BASE}")
-    print("-" * 30)
-    for order in sample_orders:
-        create_order(order)
-    print("🎉 Seed de pedidos concluído!")
\ No newline at end of file
+    main()
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class WarehouseConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'warehouse'
+
+    def ready(self):
+        from core.signals import bin_levels_changed, graph_changed
+        from .putaway import invalidate_index, on_bin_levels_changed
+
+        bin_levels_changed.connect(on_bin_levels_changed, dispatch_uid="warehouse-putaway-levels")
+        graph_changed.connect(invalidate_index, dispatch_uid="warehouse-putaway-invalidation")
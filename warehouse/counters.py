@@ -0,0 +1,259 @@
+# warehouse/counters.py
+from neomodel import db
+
+from core.signals import notify_bin_levels, notify_graph_change
+
+# Contadores pré-agregados de capacidade/ocupação.
+#
+# Shelf, Aisle, Zone e Warehouse guardam `capacity_sum`/`occupied_sum` com a
+# soma dos bins abaixo deles. Toda alteração de `Bin.capacity`/`Bin.occupied`
+# calcula o delta contra o valor gravado no banco e o propaga para os
+# ancestrais no MESMO statement Cypher, então as leituras de ocupação passam a
+# ser O(1) por nó; excluir um bin desconta seus valores do mesmo jeito.
+# Conectar/desconectar nós da hierarquia pelos modelos (ex.:
+# shelf.bins.connect(bin), ver warehouse.models.Containment) soma/subtrai os
+# totais do filho no pai e nos ancestrais, no mesmo statement que grava a
+# relação. Só cargas em massa em Cypher (generate_warehouse) dependem do
+# comando `rebuild_occupancy`.
+
+def rollup_clause(*carry):
+    """
+    Trecho Cypher que soma `d_capacity`/`d_occupied` do bin `b` nos contadores
+    de todos os ancestrais. `carry` lista variáveis extras a manter no escopo
+    (ex.: `row` dentro de um UNWIND).
+    """
+    scope = ", ".join(("b", "d_capacity", "d_occupied") + carry)
+    return f"""
+    WITH {scope}
+    OPTIONAL MATCH (b)-[:CONTAINS]->(s:Shelf)
+    OPTIONAL MATCH (s)-[:CONTAINS]->(a:Aisle)
+    OPTIONAL MATCH (a)<-[:CONTAINS]-(z:Zone)
+    OPTIONAL MATCH (z)<-[:CONTAINS]-(w:Warehouse)
+    FOREACH (n IN [x IN [s, a, z, w] WHERE x IS NOT NULL] |
+        SET n.capacity_sum = coalesce(n.capacity_sum, 0) + d_capacity,
+            n.occupied_sum = coalesce(n.occupied_sum, 0) + d_occupied)
+    """
+
+
+def ancestors_clause(*carry):
+    """
+    Como rollup_clause, mas a partir de um nó `n` de qualquer nível acima de
+    Bin (Shelf, Aisle, Zone ou Warehouse): soma `d_capacity`/`d_occupied` em
+    `n` e em todos os seus ancestrais.
+    """
+    scope = ", ".join(("n", "d_capacity", "d_occupied") + carry)
+    return f"""
+    WITH {scope}
+    OPTIONAL MATCH (n:Shelf)-[:CONTAINS]->(up_a:Aisle)
+    WITH {scope}, coalesce(up_a, CASE WHEN n:Aisle THEN n END) AS a
+    OPTIONAL MATCH (a)<-[:CONTAINS]-(up_z:Zone)
+    WITH {scope}, a, coalesce(up_z, CASE WHEN n:Zone THEN n END) AS z
+    OPTIONAL MATCH (z)<-[:CONTAINS]-(up_w:Warehouse)
+    WITH {scope}, a, z, coalesce(up_w, CASE WHEN n:Warehouse THEN n END) AS w
+    FOREACH (x IN [y IN [CASE WHEN n:Shelf THEN n END, a, z, w] WHERE y IS NOT NULL] |
+        SET x.capacity_sum = coalesce(x.capacity_sum, 0) + d_capacity,
+            x.occupied_sum = coalesce(x.occupied_sum, 0) + d_occupied)
+    """
+
+
+# Níveis da hierarquia, de baixo para cima
+LEVELS_UP = ("Bin", "Shelf", "Aisle", "Zone", "Warehouse")
+
+
+def link_query(relation_type, outgoing, child, connect):
+    """
+    Cria (connect) ou remove a relação `relation_type` entre `us` e `them` e,
+    se ela de fato mudou, soma (ou subtrai) os totais do filho (`child`, "us"
+    ou "them") no pai e nos ancestrais do pai.
+    """
+    id_method = db.get_id_method()
+    pattern = f"(us)-[r:{relation_type}]->(them)" if outgoing else f"(us)<-[r:{relation_type}]-(them)"
+    parent = "them" if child == "us" else "us"
+    if connect:
+        change = f"""
+    OPTIONAL MATCH {pattern}
+    WITH us, them, count(r) = 0 AS changed
+    MERGE {pattern}
+    WITH us, them, changed, 1 AS sign"""
+    else:
+        change = f"""
+    OPTIONAL MATCH {pattern}
+    WITH us, them, collect(r) AS rels
+    FOREACH (x IN rels | DELETE x)
+    WITH us, them, size(rels) > 0 AS changed, -1 AS sign"""
+    return f"""
+    MATCH (us) WHERE {id_method}(us) = $us
+    MATCH (them) WHERE {id_method}(them) = $them
+    {change}
+    WITH {child} AS c, {parent} AS n, CASE WHEN changed THEN sign ELSE 0 END AS k
+    WITH n,
+         k * toFloat(coalesce(CASE WHEN c:Bin THEN c.capacity ELSE c.capacity_sum END, 0)) AS d_capacity,
+         k * toFloat(coalesce(CASE WHEN c:Bin THEN c.occupied ELSE c.occupied_sum END, 0)) AS d_occupied
+    {ancestors_clause()}
+    RETURN d_capacity, d_occupied
+    """
+
+
+def link(source, node, relation_type, outgoing, connect=True):
+    """
+    Conecta/desconecta dois nós da hierarquia (relação CONTAINS vista de
+    `source`) ajustando os contadores. Retorna o delta (capacity, occupied)
+    aplicado ao pai, (0, 0) se a relação já estava no estado pedido.
+    """
+    us, them = LEVELS_UP.index(source.__label__), LEVELS_UP.index(node.__label__)
+    query = link_query(relation_type, outgoing, "us" if us < them else "them", connect)
+    rows, _ = db.cypher_query(query, {"us": source.element_id, "them": node.element_id})
+    # Estrutura mudou: o índice de putaway e o layout de rotas são recarregados
+    notify_graph_change("warehouses", "bins", "layout")
+    return tuple(rows[0]) if rows else (0, 0)
+
+
+def save_bin_query():
+    return f"""
+    MATCH (b:Bin) WHERE {db.get_id_method()}(b) = $element_id
+    WITH b,
+         coalesce($props.capacity, 0) - coalesce(b.capacity, 0) AS d_capacity,
+         coalesce($props.occupied, 0) - coalesce(b.occupied, 0) AS d_occupied
+    SET b += $props
+    {rollup_clause()}
+    RETURN d_capacity, d_occupied, b.code, b.capacity, b.occupied
+    """
+
+
+def delete_bin_query():
+    return f"""
+    MATCH (b:Bin) WHERE {db.get_id_method()}(b) = $element_id
+    WITH b, -coalesce(b.capacity, 0) AS d_capacity, -coalesce(b.occupied, 0) AS d_occupied
+    {rollup_clause()}
+    WITH b, b.code AS code
+    DETACH DELETE b
+    RETURN code
+    """
+
+
+ADJUST_BIN_QUERY = f"""
+    MATCH (b:Bin {{code: $code}})
+    WITH b, $capacity_delta AS d_capacity, $occupied_delta AS d_occupied
+    SET b.capacity = coalesce(b.capacity, 0) + d_capacity,
+        b.occupied = coalesce(b.occupied, 0) + d_occupied
+    {rollup_clause()}
+    RETURN b.capacity, b.occupied, b.code
+"""
+
+
+def save_bin(element_id, props):
+    """Grava as propriedades de um bin existente e propaga o delta aos ancestrais."""
+    rows, _ = db.cypher_query(save_bin_query(), {"element_id": element_id, "props": props})
+    notify_graph_change("bins")
+    if not rows:
+        return (0, 0)
+    notify_bin_levels([rows[0][2:]])
+    return tuple(rows[0][:2])
+
+
+def delete_bin(element_id):
+    """Remove um bin, descontando sua capacidade/ocupação dos ancestrais. Retorna o código ou None."""
+    rows, _ = db.cypher_query(delete_bin_query(), {"element_id": element_id})
+    # Bin removido: o índice de putaway precisa ser recarregado
+    notify_graph_change("bins", "layout")
+    return rows[0][0] if rows else None
+
+
+def adjust_bin(code, capacity_delta=0, occupied_delta=0):
+    """Soma deltas à capacidade/ocupação do bin `code`. Retorna (capacity, occupied)."""
+    rows, _ = db.cypher_query(ADJUST_BIN_QUERY, {
+        "code": code,
+        "capacity_delta": capacity_delta,
+        "occupied_delta": occupied_delta,
+    })
+    notify_graph_change("bins")
+    if not rows:
+        return None
+    capacity, occupied, code = rows[0]
+    notify_bin_levels([(code, capacity, occupied)])
+    return capacity, occupied
+
+
+# --------------------------------------------------------------
+# Reconstrução / verificação em lotes
+# --------------------------------------------------------------
+
+# (label, padrão que liga o nó `n` aos filhos `c`, propriedades dos filhos)
+LEVELS = (
+    ("Shelf", "(c:Bin)-[:CONTAINS]->(n)", "capacity", "occupied"),
+    ("Aisle", "(c:Shelf)-[:CONTAINS]->(n)", "capacity_sum", "occupied_sum"),
+    ("Zone", "(n)-[:CONTAINS]->(c:Aisle)", "capacity_sum", "occupied_sum"),
+    ("Warehouse", "(n)-[:CONTAINS]->(c:Zone)", "capacity_sum", "occupied_sum"),
+)
+
+
+def _level_query(label, pattern, capacity_prop, occupied_prop, write):
+    action = (
+        "SET n.capacity_sum = capacity, n.occupied_sum = occupied"
+        if write else
+        "WITH n, capacity, occupied "
+        "WHERE n.capacity_sum IS NULL OR n.occupied_sum IS NULL "
+        "OR abs(n.capacity_sum - capacity) > $tolerance "
+        "OR abs(n.occupied_sum - occupied) > $tolerance"
+    )
+    return f"""
+    MATCH (n:{label})
+    WHERE $after IS NULL OR n.uid > $after
+    WITH n ORDER BY n.uid LIMIT $chunk_size
+    OPTIONAL MATCH {pattern}
+    WITH n,
+         toFloat(sum(coalesce(c.{capacity_prop}, 0))) AS capacity,
+         toFloat(sum(coalesce(c.{occupied_prop}, 0))) AS occupied
+    {action}
+    RETURN n.uid, capacity, occupied, n.capacity_sum, n.occupied_sum
+    """
+
+
+def _walk_level(label, pattern, capacity_prop, occupied_prop, chunk_size, write):
+    query = _level_query(label, pattern, capacity_prop, occupied_prop, write)
+    # No modo de verificação a consulta só devolve divergências, então o fim
+    # do lote é obtido à parte.
+    last_query = f"""
+    MATCH (n:{label})
+    WHERE $after IS NULL OR n.uid > $after
+    WITH n ORDER BY n.uid LIMIT $chunk_size
+    RETURN max(n.uid)
+    """
+    after = None
+    while True:
+        params = {"after": after, "chunk_size": chunk_size, "tolerance": 1e-6}
+        with db.transaction:
+            rows, _ = db.cypher_query(query, params)
+            last_rows, _ = db.cypher_query(last_query, params)
+        yield rows
+        after = last_rows[0][0]
+        if after is None:
+            return
+
+
+def rebuild_counters(chunk_size=1000, progress=None):
+    """Recalcula os contadores de baixo para cima (Shelf → Warehouse), em lotes."""
+    totals = {}
+    for label, *level in LEVELS:
+        updated = 0
+        for rows in _walk_level(label, *level, chunk_size=chunk_size, write=True):
+            updated += len(rows)
+            if progress:
+                progress(label, updated)
+        totals[label] = updated
+    return totals
+
+
+def verify_counters(chunk_size=1000, limit=20):
+    """
+    Compara os contadores gravados com a soma real dos filhos.
+    Retorna {label: [(uid, esperado_cap, esperado_occ, atual_cap, atual_occ), ...]}.
+    """
+    mismatches = {}
+    for label, *level in LEVELS:
+        found = []
+        for rows in _walk_level(label, *level, chunk_size=chunk_size, write=False):
+            found.extend(tuple(r) for r in rows)
+        if found:
+            mismatches[label] = found[:limit] if limit else found
+    return mismatches
@@ -0,0 +1,328 @@
+# warehouse/generator.py
+"""
+Gerador de dados sintéticos em larga escala (comando `generate_warehouse`).
+
+Cria galpões × zonas × corredores × prateleiras × níveis × posições, SKUs e
+pedidos. A escrita usa UNWIND em transações de ~`batch_size` nós, em vez de
+save() + connect() por nó como os scripts de seed. Os lotes são independentes:
+cada um gera as próprias linhas a partir de random.Random(seed, fase, lote).
+Por isso podem rodar em paralelo (`workers`) e o resultado é o mesmo para o
+mesmo `seed`, em qualquer ordem de execução.
+"""
+import bisect
+import itertools
+import math
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from core.neo4j_driver import session as neo4j_session
+
+ZONE_TYPES_WITHOUT_AISLES = (("Recebimento", "receiving"), ("Expedição", "shipping"))
+
+STRUCTURE_QUERY = """
+    UNWIND $warehouses AS w
+    CREATE (wh:Warehouse {
+        uid: w.uid, name: w.name, addres: w.address, total_capacity: w.capacity,
+        created_by: 'generator', created_at: w.created_at,
+        capacity_sum: 0.0, occupied_sum: 0.0
+    })
+    WITH wh, w
+    UNWIND w.zones AS z
+    CREATE (wh)-[:CONTAINS]->(zn:Zone {
+        uid: z.uid, name: z.name, zone_type: z.zone_type,
+        capacity_sum: 0.0, occupied_sum: 0.0
+    })
+    WITH zn, z
+    UNWIND z.aisles AS a
+    CREATE (zn)-[:CONTAINS]->(:Aisle {uid: a.uid, code: a.code, capacity_sum: 0.0, occupied_sum: 0.0})
+"""
+
+SHELVES_QUERY = """
+    UNWIND $shelves AS row
+    MATCH (a:Aisle {uid: row.aisle})
+    CREATE (s:Shelf {uid: row.uid, code: row.code, levels: row.levels, capacity_sum: 0.0, occupied_sum: 0.0})
+    CREATE (s)-[:CONTAINS]->(a)
+    WITH s, row
+    UNWIND row.bins AS bin
+    CREATE (:Bin {uid: bin.uid, code: bin.code, capacity: $capacity, occupied: 0.0})-[:CONTAINS]->(s)
+"""
+
+PRODUCTS_QUERY = """
+    UNWIND $products AS row
+    MATCH (b:Bin {code: row.bin})
+    CREATE (:Product {uid: row.uid, id: row.uid, sku: row.sku, name: row.name, quantity: row.quantity, unit: 'UN'})
+        -[:STORED_IN]->(b)
+    SET b.occupied = b.occupied + row.quantity
+"""
+
+ORDERS_QUERY = """
+    UNWIND $orders AS row
+    CREATE (o:Order {
+        uid: row.uid, order_number: row.order_number, status: row.status,
+        created_at: row.created_at, completed_at: row.completed_at
+    })
+    WITH o, row
+    UNWIND row.items AS item
+    CREATE (o)-[:HAS_ITEM]->(:OrderItem {
+        uid: item.uid, product_sku: item.sku, quantity: item.quantity,
+        picked_quantity: item.picked, bin_code: item.bin
+    })
+"""
+
+EXISTING_QUERY = """
+    CALL { MATCH (w:Warehouse) WHERE w.name IN $names RETURN count(w) AS warehouses }
+    CALL { MATCH (b:Bin) WHERE b.code IN $codes RETURN count(b) AS bins }
+    RETURN warehouses, bins
+"""
+
+
+@dataclass(frozen=True)
+class Spec:
+    warehouses: int = 1
+    zones: int = 1            # zonas de armazenagem (com corredores) por galpão
+    aisles: int = 6           # corredores por zona
+    shelves: int = 5          # prateleiras por corredor
+    levels: int = 4
+    positions: int = 2        # posições por nível (A, B, ...; no máximo 26)
+    bin_capacity: float = 100.0
+    skus: int = 100
+    orders: int = 0
+    lines_mean: float = 3.0   # média de linhas por pedido
+    lines_max: int = 20
+    skew: float = 1.0         # expoente de Zipf da popularidade dos SKUs
+    days: int = 90            # janela de created_at dos pedidos
+    pending_share: float = 0.2
+    seed: int = 42
+    prefix: str = "GEN"
+
+    @property
+    def total_aisles(self):
+        return self.warehouses * self.zones * self.aisles
+
+    @property
+    def bins_per_shelf(self):
+        return self.levels * self.positions
+
+    @property
+    def bins_per_aisle(self):
+        return self.shelves * self.bins_per_shelf
+
+    @property
+    def total_bins(self):
+        return self.total_aisles * self.bins_per_aisle
+
+
+def aisle_code(index):
+    """0 -> A, 25 -> Z, 26 -> AA, ... (únicos entre todos os galpões gerados)."""
+    code = ""
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        code = chr(ord("A") + rest) + code
+    return code
+
+
+def bin_code(spec, index):
+    """Código do `index`-ésimo bin gerado, no formato Corredor-Prateleira-Nível-Posição."""
+    aisle, rest = divmod(index, spec.bins_per_aisle)
+    shelf, rest = divmod(rest, spec.bins_per_shelf)
+    level, position = divmod(rest, spec.positions)
+    return f"{aisle_code(aisle)}-{shelf + 1:02d}-{level + 1:02d}-{chr(ord('A') + position)}"
+
+
+def _rng(spec, phase, chunk):
+    return random.Random(f"{spec.seed}:{phase}:{chunk}")
+
+
+def _uid(rng):
+    return f"{rng.getrandbits(128):032x}"
+
+
+def _product_bin(spec, sku_index):
+    """
+    Bin do SKU: um passo coprimo com o total espalha os SKUs pelo galpão sem
+    repetir bin enquanto houver bins livres.
+    """
+    total = spec.total_bins
+    stride = max(1, int(total * 0.618))
+    while math.gcd(stride, total) != 1:
+        stride += 1
+    return bin_code(spec, (sku_index * stride) % total)
+
+
+def _structure_rows(spec):
+    rng = _rng(spec, "structure", 0)
+    warehouses, aisle_uids = [], []
+    created_at = time.time()
+    for w in range(spec.warehouses):
+        zones = []
+        for z in range(spec.zones):
+            aisles = []
+            for a in range(spec.aisles):
+                index = (w * spec.zones + z) * spec.aisles + a
+                uid = _uid(rng)
+                aisle_uids.append(uid)
+                aisles.append({"uid": uid, "code": aisle_code(index)})
+            zones.append({"uid": _uid(rng), "name": f"Armazenagem {z + 1}", "zone_type": "storage", "aisles": aisles})
+        for name, zone_type in ZONE_TYPES_WITHOUT_AISLES:
+            zones.append({"uid": _uid(rng), "name": name, "zone_type": zone_type, "aisles": []})
+        warehouses.append({
+            "uid": _uid(rng),
+            "name": f"{spec.prefix} CD {w + 1:02d}",
+            "address": f"Galpão sintético {w + 1}",
+            "capacity": spec.zones * spec.aisles * spec.bins_per_aisle * spec.bin_capacity,
+            "created_at": created_at,
+            "zones": zones,
+        })
+    return warehouses, aisle_uids
+
+
+def _shelf_rows(spec, aisle_uids, chunk, shelves_per_chunk):
+    rng = _rng(spec, "shelves", chunk)
+    rows = []
+    first = chunk * shelves_per_chunk
+    last = min(first + shelves_per_chunk, spec.total_aisles * spec.shelves)
+    for shelf_index in range(first, last):
+        aisle, shelf = divmod(shelf_index, spec.shelves)
+        base = shelf_index * spec.bins_per_shelf
+        rows.append({
+            "aisle": aisle_uids[aisle],
+            "uid": _uid(rng),
+            "code": f"{shelf + 1:02d}",
+            "levels": spec.levels,
+            "bins": [
+                {"uid": _uid(rng), "code": bin_code(spec, base + i)}
+                for i in range(spec.bins_per_shelf)
+            ],
+        })
+    return rows
+
+
+def _product_rows(spec, chunk, batch_size):
+    rng = _rng(spec, "products", chunk)
+    per_bin = math.ceil(spec.skus / spec.total_bins)
+    max_quantity = max(1, int(spec.bin_capacity // per_bin))
+    return [
+        {
+            "uid": _uid(rng),
+            "sku": f"{spec.prefix}-SKU-{i + 1:06d}",
+            "name": f"Produto sintético {i + 1}",
+            "quantity": rng.randint(1, max_quantity),
+            "bin": _product_bin(spec, i),
+        }
+        for i in range(chunk * batch_size, min((chunk + 1) * batch_size, spec.skus))
+    ]
+
+
+def _popularity(spec):
+    """Pesos acumulados de Zipf: o SKU de índice 0 é o mais pedido."""
+    return list(itertools.accumulate(1.0 / (rank + 1) ** spec.skew for rank in range(spec.skus)))
+
+
+def _order_rows(spec, chunk, batch_size, cumulative):
+    rng = _rng(spec, "orders", chunk)
+    now = time.time()
+    total_weight = cumulative[-1]
+    rows = []
+    for i in range(chunk * batch_size, min((chunk + 1) * batch_size, spec.orders)):
+        extra = rng.expovariate(1 / (spec.lines_mean - 1)) if spec.lines_mean > 1 else 0
+        lines = min(spec.lines_max, 1 + int(extra), spec.skus)
+        skus = set()
+        while len(skus) < lines:
+            skus.add(min(bisect.bisect_left(cumulative, rng.random() * total_weight), spec.skus - 1))
+
+        pending = rng.random() < spec.pending_share
+        created_at = now - rng.random() * spec.days * 86400
+        items = []
+        for sku_index in sorted(skus):
+            quantity = rng.randint(1, 5)
+            items.append({
+                "uid": _uid(rng),
+                "sku": f"{spec.prefix}-SKU-{sku_index + 1:06d}",
+                "quantity": quantity,
+                "picked": 0 if pending else quantity,
+                "bin": _product_bin(spec, sku_index),
+            })
+        rows.append({
+            "uid": _uid(rng),
+            "order_number": f"{spec.prefix}-{i + 1:08d}",
+            "status": "pending" if pending else "completed",
+            "created_at": created_at,
+            "completed_at": None if pending else created_at + rng.random() * 3600,
+            "items": items,
+        })
+    return rows
+
+
+def _write(query, **params):
+    with neo4j_session() as session:
+        session.execute_write(lambda tx: tx.run(query, **params).consume())
+
+
+def check_conflicts(spec):
+    """(galpões, bins) já existentes com os nomes/códigos que seriam gerados."""
+    names = [f"{spec.prefix} CD {w + 1:02d}" for w in range(spec.warehouses)]
+    codes = [bin_code(spec, 0), bin_code(spec, spec.total_bins - 1)] if spec.total_bins else []
+    with neo4j_session() as session:
+        record = session.run(EXISTING_QUERY, names=names, codes=codes).single()
+    return record[0], record[1]
+
+
+def generate(spec, batch_size=5000, workers=1, progress=None):
+    """
+    Gera os dados de `spec`. Cada fase (estrutura, prateleiras/bins, produtos,
+    pedidos) espera a anterior; os lotes de uma fase rodam em até `workers`
+    threads. Retorna {fase: (nós criados, segundos)}.
+    """
+    timings = {}
+
+    def run_phase(name, chunks, task, nodes):
+        start = time.perf_counter()
+        done = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for count in pool.map(task, range(chunks)):
+                done += count
+                if progress:
+                    progress(name, done, nodes)
+        timings[name] = (nodes, time.perf_counter() - start)
+
+    warehouses, aisle_uids = _structure_rows(spec)
+    start = time.perf_counter()
+    _write(STRUCTURE_QUERY, warehouses=warehouses)
+    structure_nodes = spec.warehouses * (1 + spec.zones + len(ZONE_TYPES_WITHOUT_AISLES)) + spec.total_aisles
+    timings["estrutura"] = (structure_nodes, time.perf_counter() - start)
+
+    shelves_per_chunk = max(1, batch_size // (spec.bins_per_shelf + 1))
+    total_shelves = spec.total_aisles * spec.shelves
+
+    def shelves_task(chunk):
+        rows = _shelf_rows(spec, aisle_uids, chunk, shelves_per_chunk)
+        _write(SHELVES_QUERY, shelves=rows, capacity=spec.bin_capacity)
+        return len(rows) * (spec.bins_per_shelf + 1)
+
+    run_phase("prateleiras/bins", math.ceil(total_shelves / shelves_per_chunk), shelves_task,
+              total_shelves * (spec.bins_per_shelf + 1))
+
+    def products_task(chunk):
+        rows = _product_rows(spec, chunk, batch_size)
+        _write(PRODUCTS_QUERY, products=rows)
+        return len(rows)
+
+    if spec.skus:
+        run_phase("produtos", math.ceil(spec.skus / batch_size), products_task, spec.skus)
+
+    if spec.orders and spec.skus:
+        cumulative = _popularity(spec)
+        # Pedidos têm ~lines_mean itens cada: o lote é medido em nós criados
+        orders_per_chunk = max(1, int(batch_size // (1 + spec.lines_mean)))
+
+        def orders_task(chunk):
+            rows = _order_rows(spec, chunk, orders_per_chunk, cumulative)
+            _write(ORDERS_QUERY, orders=rows)
+            return len(rows)
+
+        run_phase("pedidos", math.ceil(spec.orders / orders_per_chunk), orders_task, spec.orders)
+
+    return timings
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.signals import notify_graph_change
+from warehouse.counters import rebuild_counters, verify_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula (ou apenas verifica, com --verify) os contadores "
+        "capacity_sum/occupied_sum de Shelf, Aisle, Zone e Warehouse."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int, default=1000,
+            help="Quantidade de nós processados por transação (padrão: 1000).",
+        )
+        parser.add_argument(
+            "--verify", action="store_true",
+            help="Não grava nada; falha se algum contador divergir da soma real.",
+        )
+
+    def handle(self, *args, chunk_size, verify, **options):
+        if chunk_size < 1:
+            raise CommandError("--chunk-size deve ser maior que zero.")
+
+        if verify:
+            mismatches = verify_counters(chunk_size=chunk_size)
+            if not mismatches:
+                self.stdout.write(self.style.SUCCESS("✅ Contadores consistentes."))
+                return
+            for label, rows in mismatches.items():
+                for uid, capacity, occupied, stored_capacity, stored_occupied in rows:
+                    self.stdout.write(
+                        f"❌ {label} {uid}: esperado {capacity}/{occupied}, "
+                        f"gravado {stored_capacity}/{stored_occupied}"
+                    )
+            raise CommandError("Contadores de ocupação divergentes; rode sem --verify para reconstruir.")
+
+        def progress(label, done):
+            self.stdout.write(f"   {label}: {done} nós atualizados", ending="\r")
+
+        totals = rebuild_counters(chunk_size=chunk_size, progress=progress)
+        notify_graph_change("bins")
+        self.stdout.write("")
+        for label, count in totals.items():
+            self.stdout.write(self.style.SUCCESS(f"✅ {label}: {count} nós recalculados"))
@@ -6,11 +6,67 @@ from neomodel import(
   RelationshipTo,
   RelationshipFrom,
   UniqueIdProperty,
-  DateTimeProperty
+  DateTimeProperty,
+  ZeroOrMore
 )
+from neomodel.hooks import hooks
+from neomodel.relationship_manager import OUTGOING
 from datetime import datetime
+from . import counters
 
-class Warehouse(StructuredNode):
+
+class Containment(ZeroOrMore):
+  """
+  Relação CONTAINS da hierarquia. connect/disconnect gravam a relação e
+  ajustam capacity_sum/occupied_sum do pai e dos ancestrais no mesmo
+  statement (warehouse.counters.link).
+  """
+
+  def _link(self, node, connect):
+    self._check_node(node)
+    return counters.link(
+      self.source, node, self.definition['relation_type'],
+      self.definition['direction'] == OUTGOING, connect=connect,
+    )
+
+  def connect(self, node, properties=None):
+    if properties:
+      raise NotImplementedError("CONTAINS não tem propriedades.")
+    self._link(node, connect=True)
+    return True
+
+  def disconnect(self, node):
+    self._link(node, connect=False)
+
+  def disconnect_all(self):
+    for node in self.all():
+      self.disconnect(node)
+
+
+class OccupancyTotals:
+  """
+  Contadores pré-agregados (soma dos bins abaixo do nó), mantidos por
+  warehouse.counters. Nunca são regravados por save(), para que um update
+  comum não sobrescreva deltas aplicados em paralelo.
+  """
+  capacity_sum = FloatProperty(default=0.0)
+  occupied_sum = FloatProperty(default=0.0)
+
+  @classmethod
+  def deflate(cls, properties, obj=None, skip_empty=False):
+    deflated = super().deflate(properties, obj, skip_empty)
+    if obj is not None and hasattr(obj, 'element_id_property'):
+      deflated.pop('capacity_sum', None)
+      deflated.pop('occupied_sum', None)
+    return deflated
+
+  @property
+  def occupancy(self):
+    capacity = self.capacity_sum or 0
+    return round(((self.occupied_sum or 0) / capacity) * 100, 1) if capacity > 0 else 0
+
+
+class Warehouse(OccupancyTotals, StructuredNode):
   """ classe p/ galpão """
   uid = UniqueIdProperty()
   name = StringProperty(required=True, unique_index=True)
@@ -20,9 +76,9 @@ class Warehouse(StructuredNode):
   created_at = DateTimeProperty(default=datetime.utcnow)
   
   #relacionamentos:
-  zones = RelationshipTo('Zone', 'CONTAINS')
+  zones = RelationshipTo('Zone', 'CONTAINS', cardinality=Containment)
 
-class Zone(StructuredNode):
+class Zone(OccupancyTotals, StructuredNode):
   """ classe p/ zona dentro do galpão (ex: Recebimento, Expedição) """
   uid = UniqueIdProperty()
   name= StringProperty(required=True)
@@ -34,27 +90,27 @@ class Zone(StructuredNode):
   })
   
   #Relacionamentos
-  warehouse = RelationshipFrom('Warehouse', 'CONTAINS')
-  aisles = RelationshipTo('Aisle', 'CONTAINS')
+  warehouse = RelationshipFrom('Warehouse', 'CONTAINS', cardinality=Containment)
+  aisles = RelationshipTo('Aisle', 'CONTAINS', cardinality=Containment)
   
-class Aisle(StructuredNode):
+class Aisle(OccupancyTotals, StructuredNode):
   """ classe p/ corredor dentro de uma zona """
   uid = UniqueIdProperty()
   code = StringProperty(required=True) #ex: a, b
   
   #Relacionamentos
-  zone = RelationshipFrom('Zone', 'CONTAINS')
-  shelves = RelationshipFrom('Shelf', 'CONTAINS')
+  zone = RelationshipFrom('Zone', 'CONTAINS', cardinality=Containment)
+  shelves = RelationshipFrom('Shelf', 'CONTAINS', cardinality=Containment)
 
-class Shelf(StructuredNode):
+class Shelf(OccupancyTotals, StructuredNode):
   """ Prateleira """
   uid = UniqueIdProperty()
   code = StringProperty(required=True)  # Ex: 01, 02, 03
   levels = IntegerProperty(default=4)  # níveis
   
   #Relacionamentos
-  aisle = RelationshipFrom('Aisle', 'CONTAINS')
-  bins = RelationshipFrom('Bin', 'CONTAINS')
+  aisle = RelationshipFrom('Aisle', 'CONTAINS', cardinality=Containment)
+  bins = RelationshipFrom('Bin', 'CONTAINS', cardinality=Containment)
   
 class Bin(StructuredNode):
   """(bin/box) para armazenar produtos"""
@@ -63,15 +119,43 @@ class Bin(StructuredNode):
   capacity = FloatProperty(default=100.0)  # Capacidade em unidades
   occupied = FloatProperty(default=0.0)
     
-  shelf = RelationshipFrom('Shelf', 'CONTAINS')
+  shelf = RelationshipFrom('Shelf', 'CONTAINS', cardinality=Containment)
   products = RelationshipFrom('Product', 'STORED_IN')
 
+  @hooks
+  def save(self):
+    """Atualiza o bin e propaga o delta de capacidade/ocupação na mesma transação."""
+    if not hasattr(self, 'element_id_property'):
+      # Criação: o save do neomodel sem os hooks, já disparados aqui
+      return StructuredNode.save.__wrapped__(self)
+    props = self.deflate(self.__properties__, self)
+    counters.save_bin(self.element_id, props)
+    return self
+
+  @hooks
+  def delete(self):
+    """Remove o bin e desconta sua capacidade/ocupação dos ancestrais na mesma transação."""
+    self._pre_action_check('delete')
+    counters.delete_bin(self.element_id)
+    delattr(self, 'element_id_property')
+    self.deleted = True
+    return True
+
 class Product(StructuredNode):
   """Produto armazenado"""
   uid = UniqueIdProperty()
   sku = StringProperty(required=True, unique_index=True)
   name = StringProperty(required=True)
   quantity = IntegerProperty(default=0)
+  # Unidades reservadas para pedidos ainda não coletados (orders/picking.py)
+  reserved = IntegerProperty(default=0)
   unit = StringProperty(default='UN')  # UN, KG, L, etc
+  # Chave da API de produtos (products/views.py), gravada como `id`; igual ao
+  # uid, como no gerador. (`id` do neomodel é o id interno do nó.)
+  api_id = StringProperty(db_property='id', index=True)
     
-  location = RelationshipTo('Bin', 'STORED_IN')
\ No newline at end of file
+  location = RelationshipTo('Bin', 'STORED_IN')
+
+  def pre_save(self):
+    if self.api_id is None:
+      self.api_id = self.uid
\ No newline at end of file
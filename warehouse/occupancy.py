@@ -0,0 +1,126 @@
+# warehouse/occupancy.py
+from neomodel import db
+
+from core.neo4j_driver import afetch
+from core.snapshot import get_snapshot
+from .models import Warehouse
+
+# Ocupação lida dos contadores pré-agregados (ver warehouse/counters.py): uma
+# única consulta devolve os galpões pedidos e, se solicitado, as zonas e os
+# corredores de cada um. Nenhum Bin é visitado na leitura, e o número de round
+# trips é constante, independente do tamanho da hierarquia.
+OCCUPANCY_QUERY = """
+    MATCH (w:Warehouse)
+    WHERE $uids IS NULL OR w.uid IN $uids
+    CALL {
+        WITH w
+        OPTIONAL MATCH (w)-[:CONTAINS]->(z:Zone)
+        WHERE $depth > 0
+        OPTIONAL MATCH (z)-[:CONTAINS]->(a:Aisle)
+        WHERE $depth > 1
+        WITH z, a ORDER BY a.code
+        WITH z, collect(a {.uid, .code, .capacity_sum, .occupied_sum}) AS aisles
+        ORDER BY z.name
+        RETURN collect(z {.uid, .name, .zone_type, .capacity_sum, .occupied_sum, aisles: aisles}) AS zones
+    }
+    RETURN w, zones
+    ORDER BY w.name
+"""
+
+BREAKDOWN_LEVELS = {None: 0, "zones": 1, "aisles": 2}
+
+
+def occupancy_percent(occupied, capacity):
+    """Percentual de ocupação com uma casa decimal (0 quando não há capacidade)."""
+    return round((occupied / capacity) * 100, 1) if capacity > 0 else 0
+
+
+def _totals(node):
+    capacity = node.get("capacity_sum") or 0
+    occupied = node.get("occupied_sum") or 0
+    return {
+        "binCapacity": capacity,
+        "occupied": occupied,
+        "occupancy": occupancy_percent(occupied, capacity),
+    }
+
+
+def warehouse_occupancy(uids=None, breakdown=None):
+    """
+    Retorna a ocupação dos galpões (todos, ou apenas `uids`) em uma só consulta.
+
+    `breakdown` pode ser None, "zones" ou "aisles" para incluir os totais por
+    zona e, opcionalmente, por corredor dentro de cada zona.
+    """
+    depth = BREAKDOWN_LEVELS.get(breakdown, 0)
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        rows = _snapshot_rows(snapshot, uids, depth)
+    else:
+        rows, _ = db.cypher_query(OCCUPANCY_QUERY, {"uids": uids, "depth": depth})
+    return _serialize_rows(rows, depth)
+
+
+async def awarehouse_occupancy(uids=None, breakdown=None):
+    """Versão assíncrona de warehouse_occupancy (AsyncDriver; sem modo snapshot)."""
+    depth = BREAKDOWN_LEVELS.get(breakdown, 0)
+    records = await afetch(OCCUPANCY_QUERY, uids=uids, depth=depth)
+    return _serialize_rows([record.values() for record in records], depth)
+
+
+def _serialize_rows(rows, depth):
+    data = []
+    for w_node, zones in rows:
+        w = Warehouse.inflate(w_node)
+        item = {
+            "id": w.uid,
+            "name": w.name,
+            "address": getattr(w, "addres", ""),
+            "capacity": getattr(w, "total_capacity", 0),
+            "binCapacity": w.capacity_sum or 0,
+            "occupied": w.occupied_sum or 0,
+            "occupancy": w.occupancy,
+        }
+        if depth > 0:
+            item["zones"] = [_serialize_zone(zone, depth) for zone in zones]
+        data.append(item)
+
+    return data
+
+
+def _serialize_zone(zone, depth):
+    item = {
+        "id": zone["uid"],
+        "name": zone["name"],
+        "type": zone["zone_type"],
+        **_totals(zone),
+    }
+    if depth > 1:
+        item["aisles"] = [
+            {"id": aisle["uid"], "code": aisle["code"], **_totals(aisle)}
+            for aisle in zone["aisles"]
+        ]
+    return item
+
+
+def _snapshot_rows(snapshot, uids, depth):
+    """Mesmas linhas (w, zones) de OCCUPANCY_QUERY, lidas do snapshot em memória."""
+    keys = ("uid", "name", "zone_type", "code", "capacity_sum", "occupied_sum")
+    warehouses = [w for w in snapshot.nodes("Warehouse") if uids is None or w.get("uid") in uids]
+
+    rows = []
+    for w in sorted(warehouses, key=lambda node: node.get("name") or ""):
+        zones = []
+        if depth > 0:
+            for zone in snapshot.related(w, "CONTAINS", "out", "Zone"):
+                aisles = []
+                if depth > 1:
+                    aisles = [
+                        {key: aisle.get(key) for key in keys}
+                        for aisle in snapshot.related(zone, "CONTAINS", "out", "Aisle")
+                    ]
+                    aisles.sort(key=lambda aisle: aisle["code"] or "")
+                zones.append({**{key: zone.get(key) for key in keys}, "aisles": aisles})
+            zones.sort(key=lambda zone: zone["name"] or "")
+        rows.append((w, zones))
+    return rows
@@ -0,0 +1,220 @@
+# warehouse/putaway.py
+"""
+Alocação de bins para armazenagem (putaway) com índice de capacidade livre.
+
+O índice fica em memória no processo, separado por (galpão, tipo de zona).
+Em cada escopo, os bins ficam em baldes pela capacidade livre arredondada para
+baixo (`capacity - occupied`). Os baldes não vazios ficam numa lista ordenada,
+então o best-fit para N unidades é uma busca binária pelo primeiro balde ≥ N.
+
+O índice é carregado no primeiro uso. A partir daí, cada alteração de
+ocupação feita por este processo o atualiza (sinal `bin_levels_changed`), e
+ele é recarregado por inteiro a cada PUTAWAY_INDEX_TTL segundos ou quando a
+estrutura muda. Como outros processos também gravam, o índice é só uma
+sugestão. A reserva confere e grava a folga do bin num único statement, e
+se o bin já não couber tenta o próximo candidato.
+"""
+import bisect
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from neomodel import db
+
+from core.signals import notify_bin_levels, notify_graph_change
+from .counters import rollup_clause
+
+logger = logging.getLogger(__name__)
+
+INDEX_QUERY = """
+    MATCH (w:Warehouse)-[:CONTAINS]->(z:Zone)-[:CONTAINS]->(:Aisle)<-[:CONTAINS]-(:Shelf)<-[:CONTAINS]-(b:Bin)
+    RETURN w.uid, z.zone_type, b.code, coalesce(b.capacity, 0.0), coalesce(b.occupied, 0.0)
+"""
+
+# O SET inicial trava o bin antes da leitura da folga: duas reservas
+# concorrentes no mesmo bin são serializadas e a segunda vê a ocupação já
+# somada pela primeira.
+RESERVE_QUERY = f"""
+    MATCH (b:Bin {{code: $code}})
+    SET b.occupied = coalesce(b.occupied, 0.0)
+    WITH b, coalesce(b.capacity, 0.0) - b.occupied >= $quantity AS fits
+    CALL {{
+        WITH b, fits
+        WITH b WHERE fits
+        WITH b, 0.0 AS d_capacity, toFloat($quantity) AS d_occupied
+        SET b.occupied = b.occupied + d_occupied
+        {rollup_clause()}
+    }}
+    RETURN fits, b.capacity, b.occupied
+"""
+
+# Candidatos recusados pelo banco antes de desistir (índice desatualizado)
+MAX_ATTEMPTS = 5
+
+
+def _bucket(free):
+    return math.floor(free)
+
+
+class _Scope:
+    """Bins de um (galpão, tipo de zona), em baldes de capacidade livre."""
+
+    __slots__ = ("keys", "buckets")
+
+    def __init__(self):
+        self.keys = []      # baldes não vazios, em ordem crescente
+        self.buckets = {}   # balde -> {bin_code: folga}, em ordem de inserção
+
+    def add(self, code, free):
+        if free <= 0:
+            return  # bins cheios não são candidatos
+        key = _bucket(free)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = {}
+            bisect.insort(self.keys, key)
+        bucket[code] = free
+
+    def remove(self, code, free):
+        key = _bucket(free)
+        bucket = self.buckets.get(key)
+        if bucket is None or bucket.pop(code, None) is None:
+            return
+        if not bucket:
+            del self.buckets[key]
+            del self.keys[bisect.bisect_left(self.keys, key)]
+
+    def best_fit(self, quantity, exclude):
+        """Bin com a menor folga ≥ quantity (precisão de 1 unidade)."""
+        keys = self.keys
+        for i in range(bisect.bisect_left(keys, math.floor(quantity)), len(keys)):
+            for code, free in self.buckets[keys[i]].items():
+                if free >= quantity and code not in exclude:
+                    return code, free
+        return None
+
+
+class FreeCapacityIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._scopes = {}   # (warehouse_uid, zone_type) -> _Scope
+        self._bins = {}     # bin_code -> (escopo, folga)
+        self.loaded_at = None
+
+    @classmethod
+    def load(cls):
+        start = time.perf_counter()
+        index = cls()
+        rows, _ = db.cypher_query(INDEX_QUERY)
+        for warehouse_uid, zone_type, code, capacity, occupied in rows:
+            index._put(code, (warehouse_uid, zone_type), capacity - occupied)
+        index.loaded_at = time.monotonic()
+        logger.info(
+            "Índice de putaway carregado: %d bins em %d escopos (%.0f ms)",
+            len(index._bins), len(index._scopes), (time.perf_counter() - start) * 1000,
+        )
+        return index
+
+    def _put(self, code, scope, free):
+        self._scopes.setdefault(scope, _Scope()).add(code, free)
+        self._bins[code] = (scope, free)
+
+    def update(self, code, capacity, occupied):
+        """Atualiza a folga de um bin já indexado (bins novos entram na recarga)."""
+        with self._lock:
+            entry = self._bins.get(code)
+            if entry is None:
+                return
+            scope, free = entry
+            self._scopes[scope].remove(code, free)
+            self._put(code, scope, (capacity or 0.0) - (occupied or 0.0))
+
+    def discard(self, code):
+        with self._lock:
+            entry = self._bins.pop(code, None)
+            if entry is not None:
+                self._scopes[entry[0]].remove(code, entry[1])
+
+    def best_fit(self, warehouse_uid, zone_type, quantity, exclude=()):
+        """(bin_code, folga) do melhor bin do escopo para `quantity`, ou None."""
+        with self._lock:
+            scope = self._scopes.get((warehouse_uid, zone_type))
+            return scope.best_fit(quantity, exclude) if scope else None
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Índice do processo, (re)carregado se ausente ou vencido."""
+    global _index
+    index = _index
+    ttl = settings.PUTAWAY_INDEX_TTL
+    if index is not None and time.monotonic() - index.loaded_at < ttl:
+        return index
+    with _index_lock:
+        if _index is None or time.monotonic() - _index.loaded_at >= ttl:
+            _index = FreeCapacityIndex.load()
+        return _index
+
+
+def find_bin(warehouse_uid, quantity, zone_type="storage"):
+    """Sugestão do índice, sem reservar: (bin_code, folga) ou None."""
+    return get_index().best_fit(warehouse_uid, zone_type, quantity)
+
+
+def reserve_bin(warehouse_uid, quantity, zone_type="storage"):
+    """
+    Reserva `quantity` unidades no bin de melhor encaixe do escopo. Retorna
+    {"binCode", "capacity", "occupied", "free"} ou None se nenhum bin couber.
+    """
+    index = get_index()
+    refused = set()
+    for _ in range(MAX_ATTEMPTS):
+        found = index.best_fit(warehouse_uid, zone_type, quantity, refused)
+        if found is None:
+            return None
+        code = found[0]
+
+        rows, _ = db.cypher_query(RESERVE_QUERY, {"code": code, "quantity": float(quantity)})
+        if not rows:
+            index.discard(code)
+            refused.add(code)
+            continue
+
+        fits, capacity, occupied = rows[0]
+        if not fits:
+            # Outro processo ocupou o bin: corrige a folga e tenta o próximo
+            index.update(code, capacity, occupied)
+            refused.add(code)
+            continue
+
+        notify_bin_levels([(code, capacity, occupied)])
+        notify_graph_change("bins")
+        return {"binCode": code, "capacity": capacity, "occupied": occupied, "free": capacity - occupied}
+
+    logger.warning(
+        "Putaway: %d candidatos recusados para %s/%s (%s un.); índice desatualizado?",
+        MAX_ATTEMPTS, warehouse_uid, zone_type, quantity,
+    )
+    return None
+
+
+def on_bin_levels_changed(sender=None, bins=(), **kwargs):
+    """Receiver de core.signals.bin_levels_changed."""
+    index = _index
+    if index is None:
+        return
+    for code, capacity, occupied in bins:
+        index.update(code, capacity, occupied)
+
+
+def invalidate_index(sender=None, kinds=(), **kwargs):
+    """Receiver de core.signals.graph_changed: bins novos ou removidos exigem recarga."""
+    global _index
+    if "layout" in kinds:
+        with _index_lock:
+            _index = None
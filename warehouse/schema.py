@@ -0,0 +1,33 @@
+# warehouse/schema.py
+"""Índices e constraints dos nós de estrutura e de produto (ver core/schema.py)."""
+from core.schema import HotQuery, Index, Unique
+from .counters import ADJUST_BIN_QUERY
+from .occupancy import OCCUPANCY_QUERY
+from .putaway import RESERVE_QUERY
+
+CONSTRAINTS = [
+    Unique("Warehouse", "uid"),
+    Unique("Warehouse", "name"),
+    Unique("Zone", "uid"),
+    Unique("Aisle", "uid"),
+    Unique("Shelf", "uid"),
+    Unique("Bin", "uid"),
+    Unique("Bin", "code"),
+    Unique("Product", "uid"),
+    Unique("Product", "sku"),
+]
+
+INDEXES = [
+    # Estoque crítico do dashboard (quantity < 10)
+    Index("Product", "quantity"),
+]
+
+HOT_QUERIES = [
+    HotQuery("adjust_bin", ADJUST_BIN_QUERY, {"code": "A-01-01-A", "capacity_delta": 0.0, "occupied_delta": 1.0}),
+    HotQuery("putaway_reserve", RESERVE_QUERY, {"code": "A-01-01-A", "quantity": 1.0}),
+    # Poucos galpões: a varredura de Warehouse é esperada
+    HotQuery(
+        "warehouse_occupancy", OCCUPANCY_QUERY, {"uids": None, "depth": 2},
+        allow_scans=("Warehouse",),
+    ),
+]
@@ -29,4 +29,15 @@ class BinSerializer(serializers.Serializer):
   available = serializers.SerializerMethodField()
     
   def get_available(self, obj):
-    return obj.capacity - obj.occupied
\ No newline at end of file
+    return obj.capacity - obj.occupied
+
+class PutawaySerializer(serializers.Serializer):
+  warehouseId = serializers.CharField()
+  quantity = serializers.FloatField()
+  zoneType = serializers.ChoiceField(choices=['receiving', 'storage', 'picking', 'shipping'], default='storage')
+  dryRun = serializers.BooleanField(default=False)
+
+  def validate_quantity(self, value):
+    if value <= 0:
+      raise serializers.ValidationError("A quantidade deve ser maior que zero.")
+    return value
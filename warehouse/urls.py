@@ -1,8 +1,14 @@
 # warehouse/urls.py
 from django.urls import path
-from .views import WarehouseListCreateView, WarehouseDetailView
+from core.async_views import with_async_get
+from core.conditional import versioned_get
+from .views import WarehouseListCreateView, WarehouseDetailView, PutawayView, awarehouse_list
+
+# Galpões mostram a ocupação (bins) e, com ?breakdown, zonas e corredores (layout)
+WAREHOUSE_KINDS = ("warehouses", "bins", "layout")
 
 urlpatterns = [
-    path('', WarehouseListCreateView.as_view(), name='warehouse-list'),  # ✅ sem 'warehouses/'
-    path('<str:uid>/', WarehouseDetailView.as_view(), name='warehouse-detail'),
+    path('', versioned_get(with_async_get(WarehouseListCreateView.as_view(), awarehouse_list), WAREHOUSE_KINDS), name='warehouse-list'),  # ✅ sem 'warehouses/'
+    path('putaway/', PutawayView.as_view(), name='warehouse-putaway'),
+    path('<str:uid>/', versioned_get(WarehouseDetailView.as_view(), WAREHOUSE_KINDS), name='warehouse-detail'),
 ]
\ No newline at end of file
@@ -2,39 +2,20 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
+from django.http import JsonResponse
+from core.signals import notify_graph_change
 from .models import Warehouse, Bin, Product
-from .serializers import WarehouseSerializer, ProductSerializer
+from .occupancy import awarehouse_occupancy, warehouse_occupancy
+from .putaway import find_bin, reserve_bin
+from .serializers import WarehouseSerializer, ProductSerializer, PutawaySerializer
 
 
 class WarehouseListCreateView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        warehouses = Warehouse.nodes.all()
-        data = []
-        for w in warehouses:
-            total_capacity = 0
-            total_occupied = 0
-            for zone in w.zones:
-                for aisle in zone.aisles:
-                    for shelf in aisle.shelves:
-                        for b in shelf.bins:
-                            total_capacity += getattr(b, "capacity", 0) or 0
-                            total_occupied += getattr(b, "occupied", 0) or 0
-
-            occupancy = (
-                round((total_occupied / total_capacity) * 100, 1)
-                if total_capacity > 0 else 0
-            )
-
-            data.append({
-                "id": w.uid,
-                "name": w.name,
-                "address": getattr(w, "addres", ""),
-                "capacity": getattr(w, "total_capacity", 0),
-                "occupancy": occupancy,
-            })
-
+        breakdown = request.query_params.get("breakdown")
+        data = warehouse_occupancy(breakdown=breakdown)
         return Response(data, status=status.HTTP_200_OK)
 
     def post(self, request):
@@ -46,6 +27,7 @@ class WarehouseListCreateView(APIView):
                 total_capacity=serializer.validated_data.get("capacity", 0),
                 created_by="dev_user",
             ).save()
+            notify_graph_change("warehouses")
 
             return Response({
                 "id": warehouse.uid,
@@ -58,6 +40,12 @@ class WarehouseListCreateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+async def awarehouse_list(request):
+    """GET de WarehouseListCreateView para ASGI (ver core/async_views.py)."""
+    data = await awarehouse_occupancy(breakdown=request.GET.get("breakdown"))
+    return JsonResponse(data, safe=False)
+
+
 class WarehouseDetailView(APIView):
     permission_classes = [AllowAny]
 
@@ -68,33 +56,12 @@ class WarehouseDetailView(APIView):
             return None
 
     def get(self, request, uid):
-        w = self.get_object(uid)
-        if not w:
+        breakdown = request.query_params.get("breakdown")
+        data = warehouse_occupancy(uids=[uid], breakdown=breakdown)
+        if not data:
             return Response({"error": "Galpão não encontrado"}, status=404)
 
-        total_capacity = 0
-        total_occupied = 0
-        for zone in w.zones:
-            for aisle in zone.aisles:
-                for shelf in aisle.shelves:
-                    for b in shelf.bins:
-                        total_capacity += getattr(b, "capacity", 0) or 0
-                        total_occupied += getattr(b, "occupied", 0) or 0
-
-        occupancy = (
-            round((total_occupied / total_capacity) * 100, 1)
-            if total_capacity > 0 else 0
-        )
-
-        data = {
-            "id": w.uid,
-            "name": w.name,
-            "address": getattr(w, "addres", ""),
-            "capacity": getattr(w, "total_capacity", 0),
-            "occupancy": occupancy,
-        }
-
-        return Response(data, status=status.HTTP_200_OK)
+        return Response(data[0], status=status.HTTP_200_OK)
 
     # ✅ PERMITE DELETE
     def delete(self, request, uid):
@@ -103,6 +70,7 @@ class WarehouseDetailView(APIView):
             return Response({"error": "Galpão não encontrado"}, status=404)
 
         w.delete()
+        notify_graph_change("warehouses")
         return Response({"message": "Galpão removido com sucesso"}, status=200)
 
     # (OPCIONAL) PERMITE UPDATE via PUT
@@ -117,6 +85,33 @@ class WarehouseDetailView(APIView):
             w.addres = serializer.validated_data.get("address", "")
             w.total_capacity = serializer.validated_data.get("capacity", 0)
             w.save()
+            notify_graph_change("warehouses")
 
             return Response({"message": "Galpão atualizado com sucesso"}, status=200)
         return Response(serializer.errors, status=400)
+
+
+class PutawayView(APIView):
+    """
+    POST /api/warehouses/putaway/ -> reserva espaço para `quantity` unidades no
+    bin de melhor encaixe (menor folga suficiente) do tipo de zona do galpão.
+    Com `dryRun`, só devolve o bin sugerido, sem reservar.
+    """
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        serializer = PutawaySerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        if data["dryRun"]:
+            found = find_bin(data["warehouseId"], data["quantity"], data["zoneType"])
+            if found is None:
+                return Response({"error": "Nenhum bin com espaço suficiente"}, status=status.HTTP_409_CONFLICT)
+            return Response({"binCode": found[0], "free": found[1]}, status=status.HTTP_200_OK)
+
+        reservation = reserve_bin(data["warehouseId"], data["quantity"], data["zoneType"])
+        if reservation is None:
+            return Response({"error": "Nenhum bin com espaço suficiente"}, status=status.HTTP_409_CONFLICT)
+        return Response(reservation, status=status.HTTP_201_CREATED)